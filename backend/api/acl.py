@@ -0,0 +1,64 @@
+"""
+Per-user private event access lists.
+
+The ids of the events a user is invited to are cached as a packed array of
+64-bit integers and decoded into a frozenset on use. Entries are dropped
+whenever ``invited_users`` changes for that user (or the user is saved), and
+expire after ``EVENT_ACL_TIMEOUT`` seconds so processes with a local cache
+converge.
+"""
+from array import array
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+# Above this many invitations, visibility queries keep the EXISTS subquery
+# instead of inlining the ids into an IN (...) list.
+INLINE_ID_LIMIT = 1000
+
+
+def acl_cache():
+    return caches[getattr(settings, 'EVENT_ACL_CACHE', 'default')]
+
+
+def _key(user_id):
+    return f'acl:invited:{user_id}'
+
+
+def invited_event_ids(user):
+    """Return the frozenset of event ids the user is invited to"""
+    cache = acl_cache()
+    packed = cache.get(_key(user.pk))
+    if packed is None:
+        from .models import Event
+        ids = (
+            Event.invited_users.through.objects
+            .filter(user_id=user.pk).order_by('event_id').values_list('event_id', flat=True)
+        )
+        packed = array('q', ids).tobytes()
+        cache.set(_key(user.pk), packed, getattr(settings, 'EVENT_ACL_TIMEOUT', 60))
+
+    ids = array('q')
+    ids.frombytes(packed)
+    return frozenset(ids)
+
+
+def invalidate_users(user_ids):
+    """Forget the cached access lists of the given users"""
+    keys = [_key(user_id) for user_id in set(user_ids)]
+    if not keys:
+        return
+    acl_cache().delete_many(keys)
+    transaction.on_commit(lambda: acl_cache().delete_many(keys))
+
+
+def can_view(user, event):
+    """Whether the user may see the event, without loading related rows"""
+    if event.is_public:
+        return True
+    if not user.is_authenticated:
+        return False
+    if event.organizer_id == user.pk:
+        return True
+    return event.pk in invited_event_ids(user)
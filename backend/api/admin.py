@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import UserProfile, Event, RSVP, Review
+from .models import UserProfile, Event, EventDailyStats, EventRatingSummary, RSVP, Review
 
 
 @admin.register(UserProfile)
@@ -13,8 +13,9 @@ class UserProfileAdmin(admin.ModelAdmin):
 class EventAdmin(admin.ModelAdmin):
     list_display = ['title', 'organizer', 'location', 'start_time', 'is_public', 'created_at']
     search_fields = ['title', 'description', 'location', 'organizer__username']
-    list_filter = ['is_public', 'start_time', 'created_at']
+    list_filter = ['is_public', 'recurrence_frequency', 'start_time', 'created_at']
     filter_horizontal = ['invited_users']
+    raw_id_fields = ['series']
 
 
 @admin.register(RSVP)
@@ -29,3 +30,18 @@ class ReviewAdmin(admin.ModelAdmin):
     list_display = ['event', 'user', 'rating', 'created_at']
     search_fields = ['event__title', 'user__username', 'comment']
     list_filter = ['rating', 'created_at']
+
+
+@admin.register(EventRatingSummary)
+class EventRatingSummaryAdmin(admin.ModelAdmin):
+    list_display = ['event', 'review_count', 'rating_sum', 'updated_at']
+    search_fields = ['event__title']
+    raw_id_fields = ['event']
+
+
+@admin.register(EventDailyStats)
+class EventDailyStatsAdmin(admin.ModelAdmin):
+    list_display = ['event', 'organizer', 'day', 'going', 'maybe', 'not_going', 'reviews_written']
+    search_fields = ['event__title', 'organizer__username']
+    list_filter = ['day']
+    raw_id_fields = ['event', 'organizer']
@@ -0,0 +1,233 @@
+"""
+Async variants of the read-heavy endpoints, served under ``/api/async/``.
+
+They return the same bodies as their DRF counterparts but run their queries
+through Django's async ORM (``acount``, ``aiterator``, ``aget``), so under an
+ASGI server (e.g. ``uvicorn backend.asgi:application``) a worker is not tied
+up while a request waits on the database. The query-building pieces (filter
+backends, visibility, the fragment cache) are shared with the sync views and
+run via ``sync_to_async`` where they may touch the database or cache.
+"""
+import asyncio
+import functools
+import json
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import AnonymousUser, User
+from django.conf import settings
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+from django.views.decorators.http import require_safe
+from rest_framework import status
+from rest_framework.exceptions import (
+    APIException, AuthenticationFailed, NotAuthenticated, NotFound, PermissionDenied
+)
+from rest_framework.request import Request
+from rest_framework.views import exception_handler
+
+from .acl import can_view
+from .authentication import AsyncJWTAuthentication, acached_snapshot
+from .cache import fragment_versions
+from .conditional import aqueryset_validators, make_etag, page_fingerprint
+from .fastpath import REVIEW_COLUMNS, review_representations
+from .fieldsets import has_fieldsets
+from .models import Event, Review, UserProfile
+from .pubsub import COUNTS_COLUMNS, counts_message, event_channel, get_broker, stream_token_user_id
+from .pagination import StandardResultsSetPagination
+from .renderers import FastJSONRenderer
+from .serializers import ReviewSerializer, UserProfileSerializer, UserSerializer
+from .views import EventViewSet, narrow_event_children
+
+authenticator = AsyncJWTAuthentication()
+renderer = FastJSONRenderer()
+
+
+def render(data, status_code=status.HTTP_200_OK):
+    return HttpResponse(renderer.render(data), status=status_code, content_type=renderer.media_type)
+
+
+def add_validators(response, etag, last_modified):
+    """Same validator headers as ConditionalGetMixin.finalize_response"""
+    response['ETag'] = quote_etag(etag)
+    if last_modified:
+        response['Last-Modified'] = http_date(last_modified.timestamp())
+    patch_cache_control(response, private=True, no_cache=True)
+    patch_vary_headers(response, ['Authorization'])
+    return response
+
+
+def conditional(request, etag, last_modified):
+    """A 304 with validators if the client's copy is current, else None"""
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+    response = get_conditional_response(request._request, etag=quote_etag(etag), last_modified=timestamp)
+    return add_validators(response, etag, last_modified) if response is not None else None
+
+
+def async_api_view(view):
+    """
+    Wrap an async view: authenticate with JWT, hand it a DRF ``Request`` (for
+    ``query_params`` and serializer context) and turn API exceptions into the
+    same error bodies DRF sends.
+    """
+    @require_safe
+    @functools.wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        drf_request = Request(request)
+        try:
+            auth = await authenticator.aauthenticate(request)
+            drf_request.user = auth[0] if auth else AnonymousUser()
+            return await view(drf_request, *args, **kwargs)
+        except APIException as exc:
+            if isinstance(exc, (NotAuthenticated, AuthenticationFailed)):
+                exc.auth_header = authenticator.authenticate_header(request)
+            error = exception_handler(exc, {})
+            response = render(error.data, error.status_code)
+            for header, value in error.headers.items():
+                if header.lower() != 'content-type':
+                    response[header] = value
+            return response
+    return wrapper
+
+
+def event_view(request, action, **kwargs):
+    """An EventViewSet set up for ``action``, to reuse its queryset and filters"""
+    return EventViewSet(action=action, request=request, format_kwarg=None, args=(), kwargs=kwargs)
+
+
+async def get_event(request, pk):
+    """Fetch a visible event with the same checks as EventViewSet.get_object"""
+    view = event_view(request, 'retrieve', pk=pk)
+    queryset = await sync_to_async(view.get_queryset)()
+    event = await queryset.filter(pk=pk).afirst()
+    if event is None:
+        raise NotFound('No Event matches the given query.')
+    if not await sync_to_async(can_view)(request.user, event):
+        raise PermissionDenied()
+    return view, event
+
+
+@async_api_view
+async def event_list(request):
+    """Async GET /api/events/"""
+    view = event_view(request, 'list')
+
+    # Filter backends may validate choices against the database
+    queryset = await sync_to_async(lambda: view.filter_queryset(view.get_queryset()))()
+    paginator = view.paginator
+    page = await paginator.apaginate_queryset(queryset, request, view)
+    etag = make_etag(request, page_fingerprint(page, paginator.get_paginated_response([]).data))
+    not_modified = conditional(request, etag, None)
+    if not_modified:
+        return not_modified
+
+    data = await sync_to_async(view.serialize_events)(page)
+    return add_validators(render(paginator.get_paginated_response(data).data), etag, None)
+
+
+@async_api_view
+async def event_detail(request, pk):
+    """Async GET /api/events/{id}/"""
+    view, event = await get_event(request, pk)
+    etag = make_etag(request, *fragment_versions([event]), event.updated_at)
+    not_modified = conditional(request, etag, event.updated_at)
+    if not_modified:
+        return not_modified
+    data = await sync_to_async(view.serialize_events)([event])
+    return add_validators(render(data[0]), etag, event.updated_at)
+
+
+@async_api_view
+async def event_reviews(request, pk):
+    """Async GET /api/events/{id}/reviews/"""
+    if not request.user.is_authenticated:
+        raise NotAuthenticated()
+    _, event = await get_event(request, pk)
+    reviews = narrow_event_children(Review.objects.filter(event=event), request, ReviewSerializer)
+    fingerprint, last_modified = await aqueryset_validators(reviews)
+    last_modified = max(filter(None, [last_modified, event.updated_at]))
+    etag = make_etag(request, fingerprint, event.updated_at)
+    not_modified = conditional(request, etag, last_modified)
+    if not_modified:
+        return not_modified
+
+    paginator = StandardResultsSetPagination()
+    if has_fieldsets(request):
+        page = await paginator.apaginate_queryset(reviews, request)
+        data = ReviewSerializer(page, many=True, context={'request': request}).data
+    else:
+        rows = reviews.select_related(None).prefetch_related(None).values(*REVIEW_COLUMNS)
+        page = await paginator.apaginate_queryset(rows, request)
+        data = await sync_to_async(review_representations)(page, request.user)
+    return add_validators(render(paginator.get_paginated_response(data).data), etag, last_modified)
+
+
+@async_api_view
+async def current_user(request):
+    """Async GET /api/auth/me/"""
+    if not request.user.is_authenticated:
+        raise NotAuthenticated()
+
+    async def build():
+        profile = await UserProfile.objects.filter(user=request.user).afirst()
+        if profile is not None:
+            # Already loaded; saves the serializer a lazy (sync) fetch
+            profile.user = request.user
+        context = {'request': request}
+        return {
+            'user': UserSerializer(request.user, context=context).data,
+            'profile': UserProfileSerializer(profile, context=context).data if profile else None,
+        }
+
+    if has_fieldsets(request):
+        return render(await build())
+    return render(await acached_snapshot(request, build))
+
+
+def sse(message):
+    """Format a pub/sub message as one server-sent event"""
+    return f'event: {message["type"]}\ndata: {json.dumps(message, separators=(",", ":"))}\n\n'
+
+
+@async_api_view
+async def event_stream(request, pk):
+    """
+    Server-sent events for one event: a ``counts`` snapshot on connect, then
+    ``counts`` after every RSVP/review change and ``review`` for new reviews.
+    ``EventSource`` cannot send headers, so signed-in clients pass a stream
+    token from ``/api/events/{id}/stream/token/`` as ``?token=``; the access
+    token never goes into the URL (and access logs).
+    """
+    token = request.query_params.get('token')
+    if token:
+        user_id = stream_token_user_id(token, pk)
+        user = await User.objects.filter(pk=user_id, is_active=True).afirst() if user_id else None
+        if user is None:
+            raise AuthenticationFailed('Stream token is invalid or expired.')
+        request.user = user
+    await get_event(request, pk)
+    keepalive = getattr(settings, 'EVENT_STREAM_KEEPALIVE', 15)
+
+    async def events():
+        # Subscribe before reading the snapshot so no change falls in between
+        subscription = get_broker().subscribe(event_channel(pk))
+        try:
+            row = await Event.objects.filter(pk=pk).values(*COUNTS_COLUMNS).afirst()
+            if row is None:
+                return
+            yield 'retry: 5000\n\n' + sse(counts_message(row))
+            while True:
+                try:
+                    message = await asyncio.wait_for(subscription.get(), timeout=keepalive)
+                except asyncio.TimeoutError:
+                    # Comment line, keeps proxies from closing an idle stream
+                    yield ': keepalive\n\n'
+                    continue
+                yield sse(message)
+        finally:
+            subscription.close()
+
+    response = StreamingHttpResponse(events(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -0,0 +1,238 @@
+"""
+JWT authentication with an in-process cache of resolved users.
+
+``simplejwt`` loads the user row on every authenticated request. Here users
+are kept in a bounded LRU with a TTL, keyed by user id, together with the
+``/auth/me/`` snapshot (user + profile data).
+
+Each entry remembers the user's version token from the Django cache
+``AUTH_USER_VERSION_CACHE``; saving or deleting the user or their profile
+replaces the token, so with a shared cache backend every process drops its
+entry on the next request (deactivations and password changes included).
+With a per-process cache, other processes catch up within
+``AUTH_USER_CACHE_TTL`` seconds.
+"""
+import copy
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+
+class UserCache:
+    """
+    Thread-safe LRU of ``user_id -> {'user': ..., 'snapshots': {...}}`` with a TTL.
+
+    Fills are versioned: a value read from the database is only stored if no
+    invalidation happened since the read began, so a concurrent save cannot
+    be overwritten with the row as it was before. Entries also carry the
+    shared version token (``stamp``) read before the fill, and are ignored
+    once the token has moved on.
+    """
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.version = 0
+
+    def _entry(self, user_id, stamp):
+        entry = self._entries.get(user_id)
+        if entry is None:
+            return None
+        if entry['expires'] < time.monotonic() or entry['stamp'] != stamp:
+            del self._entries[user_id]
+            return None
+        self._entries.move_to_end(user_id)
+        return entry
+
+    def get(self, user_id, slot, stamp=None):
+        with self._lock:
+            entry = self._entry(user_id, stamp)
+            return entry.get(slot) if entry else None
+
+    def set(self, user_id, slot, value, version, stamp=None):
+        with self._lock:
+            if version != self.version:
+                return
+            entry = self._entry(user_id, stamp)
+            if entry is None:
+                entry = self._entries[user_id] = {'expires': time.monotonic() + self.ttl, 'stamp': stamp}
+                if len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+            entry[slot] = value
+
+    def invalidate(self, user_ids):
+        with self._lock:
+            self.version += 1
+            for user_id in user_ids:
+                self._entries.pop(str(user_id), None)
+
+    def clear(self):
+        with self._lock:
+            self.version += 1
+            self._entries.clear()
+
+
+user_cache = UserCache(
+    maxsize=getattr(settings, 'AUTH_USER_CACHE_SIZE', 10000),
+    ttl=getattr(settings, 'AUTH_USER_CACHE_TTL', 60),
+)
+
+
+def version_cache():
+    return caches[getattr(settings, 'AUTH_USER_VERSION_CACHE', 'default')]
+
+
+def _version_key(user_id):
+    return f'auth:v:{user_id}'
+
+
+def user_stamp(user_id):
+    """The user's shared version token, created if missing"""
+    cache, key = version_cache(), _version_key(user_id)
+    stamp = cache.get(key)
+    if stamp is None:
+        cache.add(key, uuid.uuid4().hex[:12], timeout=None)
+        stamp = cache.get(key)
+    return stamp
+
+
+async def auser_stamp(user_id):
+    """Async twin of ``user_stamp``"""
+    cache, key = version_cache(), _version_key(user_id)
+    stamp = await cache.aget(key)
+    if stamp is None:
+        await cache.aadd(key, uuid.uuid4().hex[:12], timeout=None)
+        stamp = await cache.aget(key)
+    return stamp
+
+
+def bump_user_stamps(user_ids):
+    """Move the shared version tokens on, dropping every process's entries"""
+    keys = [_version_key(user_id) for user_id in user_ids]
+    if keys:
+        version_cache().set_many({key: uuid.uuid4().hex[:12] for key in keys}, timeout=None)
+
+
+def invalidate_users(user_ids):
+    """Forget cached users and snapshots, now and again once the write commits"""
+    user_ids = list(user_ids)
+
+    def invalidate():
+        user_cache.invalidate(user_ids)
+        bump_user_stamps(user_ids)
+    invalidate()
+    transaction.on_commit(invalidate)
+
+
+def cached_snapshot(request, build):
+    """
+    The ``/auth/me/`` body for ``request.user``, built by ``build()`` on a miss.
+
+    Snapshots are stored per site root because profile picture URLs are absolute.
+    """
+    user_id, site = str(request.user.pk), request.build_absolute_uri('/')
+    stamp = user_stamp(user_id)
+    snapshots = user_cache.get(user_id, 'snapshots', stamp) or {}
+    if site in snapshots:
+        return snapshots[site]
+    version = user_cache.version
+    data = build()
+    user_cache.set(user_id, 'snapshots', {**snapshots, site: data}, version, stamp)
+    return data
+
+
+async def acached_snapshot(request, build):
+    """Async twin of ``cached_snapshot``; ``build`` is a coroutine function"""
+    user_id, site = str(request.user.pk), request.build_absolute_uri('/')
+    stamp = await auser_stamp(user_id)
+    snapshots = user_cache.get(user_id, 'snapshots', stamp) or {}
+    if site in snapshots:
+        return snapshots[site]
+    version = user_cache.version
+    data = await build()
+    user_cache.set(user_id, 'snapshots', {**snapshots, site: data}, version, stamp)
+    return data
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """``JWTAuthentication`` that resolves users through ``user_cache``"""
+
+    def get_user(self, validated_token):
+        user_id = self.get_user_id(validated_token)
+        stamp = user_stamp(user_id)
+        user = user_cache.get(user_id, 'user', stamp)
+        if user is None:
+            version = user_cache.version
+            user = self.fetch_user(user_id)
+            user_cache.set(user_id, 'user', user, version, stamp)
+        return self.check_user(copy.copy(user), validated_token)
+
+    def get_user_id(self, validated_token):
+        try:
+            return str(validated_token[api_settings.USER_ID_CLAIM])
+        except KeyError as e:
+            raise InvalidToken(_("Token contained no recognizable user identification")) from e
+
+    def fetch_user(self, user_id):
+        try:
+            return self.user_model.objects.get(**{api_settings.USER_ID_FIELD: user_id})
+        except self.user_model.DoesNotExist as e:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found") from e
+
+    def check_user(self, user, validated_token):
+        """The checks ``JWTAuthentication.get_user`` runs after the lookup"""
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+
+        return user
+
+
+class AsyncJWTAuthentication(CachedJWTAuthentication):
+    """
+    JWT authentication usable from async views.
+
+    Token parsing and signature checks are CPU-only and shared with the sync
+    class; cache misses are loaded through the async ORM.
+    """
+
+    async def aauthenticate(self, request):
+        """Async twin of ``authenticate``; works on a plain Django request."""
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        validated_token = self.get_validated_token(raw_token)
+        return await self.aget_user(validated_token), validated_token
+
+    async def aget_user(self, validated_token):
+        """Same as ``get_user``, with ``aget`` for cache misses"""
+        user_id = self.get_user_id(validated_token)
+        stamp = await auser_stamp(user_id)
+        user = user_cache.get(user_id, 'user', stamp)
+        if user is None:
+            version = user_cache.version
+            try:
+                user = await self.user_model.objects.aget(**{api_settings.USER_ID_FIELD: user_id})
+            except self.user_model.DoesNotExist as e:
+                raise AuthenticationFailed(_("User not found"), code="user_not_found") from e
+            user_cache.set(user_id, 'user', user, version, stamp)
+        return self.check_user(copy.copy(user), validated_token)
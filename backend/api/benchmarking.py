@@ -0,0 +1,84 @@
+"""
+Helpers shared by the benchmark management commands: latency statistics,
+per-thread SQL counting and comparison against a stored baseline report.
+"""
+import math
+import statistics
+from contextlib import contextmanager
+
+from django.db import connection
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of a list of numbers"""
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    index = max(0, min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(latencies, elapsed, errors):
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'throughput_rps': round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        'mean_ms': round(statistics.fmean(latencies) * 1000, 2) if latencies else 0.0,
+        'p50_ms': round(percentile(latencies, 50) * 1000, 2),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 2),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 2),
+    }
+
+
+class QueryCount:
+    queries = 0
+
+
+@contextmanager
+def count_queries():
+    """Count the SQL statements this thread's connection runs inside the block"""
+    counter = QueryCount()
+
+    def wrapper(execute, sql, params, many, context):
+        counter.queries += 1
+        return execute(sql, params, many, context)
+
+    with connection.execute_wrapper(wrapper):
+        yield counter
+
+
+# Relative change of a metric that counts as a regression; query counts are exact
+DEFAULT_TOLERANCE = 0.2
+HIGHER_IS_WORSE = ('p50_ms', 'p95_ms', 'p99_ms', 'queries_per_request', 'errors')
+
+
+def compare_reports(report, baseline, tolerance=DEFAULT_TOLERANCE):
+    """
+    Per-route differences between two reports from ``benchmark_endpoints``.
+
+    Returns ``(rows, regressions)``: a row per route and metric present in
+    both, and the subset that got worse by more than ``tolerance`` (any
+    increase in queries per request or errors counts).
+    """
+    rows, regressions = [], []
+    for route, stats in report['routes'].items():
+        before = baseline.get('routes', {}).get(route)
+        if not before or not before.get('requests'):
+            continue
+        for metric in HIGHER_IS_WORSE + ('throughput_rps',):
+            if metric not in stats or metric not in before:
+                continue
+            old, new = before[metric], stats[metric]
+            change = (new - old) / old if old else (0.0 if new == old else float('inf'))
+            if metric == 'throughput_rps':
+                worse = change < -tolerance
+            elif metric in ('queries_per_request', 'errors'):
+                worse = new > old
+            else:
+                worse = change > tolerance
+            row = {'route': route, 'metric': metric, 'baseline': old, 'current': new,
+                   'change_pct': round(change * 100, 1) if old else None}
+            rows.append(row)
+            if worse:
+                regressions.append(row)
+    return rows, regressions
@@ -0,0 +1,117 @@
+"""
+Versioned cache of serialized events.
+
+Each event's shared ``EventSerializer`` output is cached under a key that
+embeds a version token for the event and one for its organizer (whose
+details are nested). Writes replace the version tokens, so stale fragments
+are never read again and simply age out of the LRU cache. The per-user part
+(``user_rsvp_status``) is never cached; it is laid over the shared fragment
+from the page query's annotation.
+"""
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+PER_USER_FIELDS = ('user_rsvp_status',)
+
+
+def fragment_cache():
+    return caches[getattr(settings, 'EVENT_FRAGMENT_CACHE', 'default')]
+
+
+def _event_version_key(event_id):
+    return f'event:v:{event_id}'
+
+
+def _user_version_key(user_id):
+    return f'user:v:{user_id}'
+
+
+def _bump(keys):
+    if keys:
+        fragment_cache().set_many({key: uuid.uuid4().hex[:12] for key in keys}, timeout=None)
+
+
+def _bump_now_and_on_commit(keys):
+    # Bumping again after commit discards fragments that concurrent readers
+    # built from the pre-commit rows in the meantime.
+    keys = list(keys)
+    _bump(keys)
+    transaction.on_commit(lambda: _bump(keys))
+
+
+def invalidate_events(event_ids):
+    """Drop the cached representation of the given events"""
+    _bump_now_and_on_commit(_event_version_key(event_id) for event_id in set(event_ids))
+
+
+def invalidate_users(user_ids):
+    """Drop cached events whose nested organizer is one of the given users"""
+    _bump_now_and_on_commit(_user_version_key(user_id) for user_id in set(user_ids))
+
+
+def _fragment_keys(events):
+    """Map event id -> current fragment key, creating missing version tokens"""
+    cache = fragment_cache()
+    version_keys = set()
+    for event in events:
+        version_keys.add(_event_version_key(event.pk))
+        version_keys.add(_user_version_key(event.organizer_id))
+    versions = cache.get_many(version_keys)
+    missing = {key: uuid.uuid4().hex[:12] for key in version_keys if key not in versions}
+    if missing:
+        cache.set_many(missing, timeout=None)
+        versions.update(missing)
+    return {
+        event.pk: (
+            f'event:{event.pk}:{versions[_event_version_key(event.pk)]}'
+            f':{versions[_user_version_key(event.organizer_id)]}'
+        )
+        for event in events
+    }
+
+
+def fragment_versions(events):
+    """
+    The fragment key of each event, in order: it changes whenever the event or
+    its organizer is written, so validators that include it follow both.
+    """
+    keys = _fragment_keys(events)
+    return [keys[event.pk] for event in events]
+
+
+def cached_event_data(events, serialize_missing):
+    """
+    Return serialized events in the order given, built from cached fragments.
+
+    ``events`` only need ``pk``, ``organizer_id`` and the per-user annotations.
+    ``serialize_missing(ids)`` must return a dict of id -> serialized event for
+    fragments that are not cached yet; those are stored for the next request.
+    """
+    cache = fragment_cache()
+    keys = _fragment_keys(events)
+    fragments = cache.get_many(keys.values())
+
+    missing_ids = [event.pk for event in events if keys[event.pk] not in fragments]
+    if missing_ids:
+        fresh = serialize_missing(missing_ids)
+        to_store = {}
+        for event_id, data in fresh.items():
+            shared = dict(data)
+            for field in PER_USER_FIELDS:
+                if field in shared:
+                    shared[field] = None
+            to_store[keys[event_id]] = shared
+        cache.set_many(to_store)
+        fragments.update(to_store)
+
+    results = []
+    for event in events:
+        data = dict(fragments[keys[event.pk]])
+        for field in PER_USER_FIELDS:
+            if field in data:
+                data[field] = getattr(event, field, None)
+        results.append(data)
+    return results
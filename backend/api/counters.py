@@ -0,0 +1,171 @@
+"""
+Maintenance of the denormalized RSVP and review counters stored on Event,
+of the per-event rating histograms in EventRatingSummary and of the daily
+rollups in api.rollups.
+
+All writers of RSVP and Review rows should report their changes here inside
+the same transaction, so the counters move atomically with the rows they
+describe. Updates use F-expressions, never read-modify-write, and touch
+``updated_at`` so conditional GET validators see the change. Live stream
+subscribers get the new values once the transaction commits.
+"""
+from collections import defaultdict
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Window
+from django.db.models.functions import RowNumber
+from django.utils import timezone
+
+from .cache import invalidate_events
+from .models import Event, EventRatingSummary, Review
+from .pubsub import publish_counts
+from .rollups import record_daily
+
+
+RSVP_COUNTER_FIELDS = {
+    'going': 'going_count',
+    'maybe': 'maybe_count',
+    'not_going': 'not_going_count',
+}
+
+COUNTER_FIELDS = ['going_count', 'maybe_count', 'not_going_count', 'review_count', 'rating_sum']
+
+
+def apply_rsvp_deltas(deltas):
+    """
+    Apply accumulated RSVP counter changes.
+
+    ``deltas`` maps event_id -> {status: delta}. One UPDATE is issued per event.
+    """
+    for event_id, by_status in deltas.items():
+        updates = {
+            RSVP_COUNTER_FIELDS[status_value]: F(RSVP_COUNTER_FIELDS[status_value]) + delta
+            for status_value, delta in by_status.items()
+            if delta
+        }
+        if updates:
+            Event.objects.filter(pk=event_id).update(updated_at=timezone.now(), **updates)
+    record_daily(deltas)
+    invalidate_events(deltas)
+    publish_counts(deltas)
+
+
+def record_rsvp_change(old=None, new=None):
+    """
+    Record that an RSVP moved from ``old`` to ``new``.
+
+    Both arguments are ``(event_id, status)`` tuples, or None for a create/delete.
+    """
+    deltas = defaultdict(lambda: defaultdict(int))
+    if old is not None:
+        deltas[old[0]][old[1]] -= 1
+    if new is not None:
+        deltas[new[0]][new[1]] += 1
+    apply_rsvp_deltas(deltas)
+
+
+def record_review_change(old=None, new=None, review_id=None):
+    """
+    Record that a review moved from ``old`` to ``new``.
+
+    Both arguments are ``(event_id, rating)`` tuples, or None for a create/delete.
+    Pass ``review_id`` to keep the summaries' recent-review lists current.
+    """
+    deltas = defaultdict(lambda: [0, 0])
+    if old is not None:
+        deltas[old[0]][0] -= 1
+        deltas[old[0]][1] -= old[1]
+    if new is not None:
+        deltas[new[0]][0] += 1
+        deltas[new[0]][1] += new[1]
+    for event_id, (count_delta, sum_delta) in deltas.items():
+        if count_delta or sum_delta:
+            Event.objects.filter(pk=event_id).update(
+                updated_at=timezone.now(),
+                review_count=F('review_count') + count_delta,
+                rating_sum=F('rating_sum') + sum_delta,
+            )
+    update_rating_summaries(old, new, review_id)
+    daily = {
+        event_id: {'review_count': count_delta, 'rating_sum': sum_delta}
+        for event_id, (count_delta, sum_delta) in deltas.items()
+    }
+    if new is not None and old is None:
+        daily[new[0]]['reviews_written'] = 1
+    record_daily(daily)
+    invalidate_events(deltas)
+    publish_counts(deltas)
+
+
+def locked_rating_summary(event_id):
+    """The event's summary row, locked for update; created empty if missing"""
+    summary = EventRatingSummary.objects.select_for_update().filter(event_id=event_id).first()
+    if summary is not None:
+        return summary
+    try:
+        with transaction.atomic():
+            return EventRatingSummary.objects.create(event_id=event_id)
+    except IntegrityError:
+        # Created concurrently
+        return EventRatingSummary.objects.select_for_update().get(event_id=event_id)
+
+
+def recent_review_ids(event_id, exclude=None):
+    reviews = Review.objects.filter(event_id=event_id).order_by('-created_at', '-id')
+    if exclude is not None:
+        reviews = reviews.exclude(pk=exclude)
+    return list(reviews.values_list('id', flat=True)[:EventRatingSummary.RECENT_SIZE])
+
+
+def update_rating_summaries(old=None, new=None, review_id=None):
+    """
+    Apply a review change to the histograms of the events involved. Rows are
+    locked, so concurrent writers to one event queue up rather than lose
+    updates to the recent-review list.
+    """
+    for event_id in sorted({change[0] for change in (old, new) if change is not None}):
+        summary = locked_rating_summary(event_id)
+        for change, sign in ((old, -1), (new, 1)):
+            if change is not None and change[0] == event_id:
+                field = f'stars_{change[1]}'
+                setattr(summary, field, getattr(summary, field) + sign)
+                summary.review_count += sign
+                summary.rating_sum += sign * change[1]
+        if review_id is not None:
+            moved_in = new is not None and new[0] == event_id and (old is None or old[0] != event_id)
+            moved_out = old is not None and old[0] == event_id and (new is None or new[0] != event_id)
+            if moved_in:
+                summary.recent_review_ids = [review_id, *summary.recent_review_ids][:EventRatingSummary.RECENT_SIZE]
+            elif moved_out and review_id in summary.recent_review_ids:
+                # Refill from the table; deletes are reported before the row goes
+                summary.recent_review_ids = recent_review_ids(event_id, exclude=review_id)
+        summary.save()
+
+
+SUMMARY_FIELDS = ['stars_1', 'stars_2', 'stars_3', 'stars_4', 'stars_5',
+                  'review_count', 'rating_sum', 'recent_review_ids']
+
+
+def compute_rating_summaries(event_ids):
+    """Recompute the summaries of these events from the review table (unsaved)"""
+    summaries = {event_id: EventRatingSummary(event_id=event_id, recent_review_ids=[]) for event_id in event_ids}
+    by_rating = (
+        Review.objects.filter(event_id__in=event_ids).order_by()
+        .values('event_id', 'rating').annotate(n=Count('id'))
+    )
+    for row in by_rating:
+        summary = summaries[row['event_id']]
+        setattr(summary, f'stars_{row["rating"]}', row['n'])
+        summary.review_count += row['n']
+        summary.rating_sum += row['rating'] * row['n']
+    recent = (
+        Review.objects.filter(event_id__in=event_ids)
+        .annotate(rank=Window(RowNumber(), partition_by=F('event_id'),
+                              order_by=[F('created_at').desc(), F('id').desc()]))
+        .filter(rank__lte=EventRatingSummary.RECENT_SIZE)
+        .order_by('event_id', 'rank')
+        .values_list('event_id', 'id')
+    )
+    for event_id, review_id in recent:
+        summaries[event_id].recent_review_ids.append(review_id)
+    return list(summaries.values())
@@ -0,0 +1,109 @@
+"""
+Flat, table-shaped export and import of the event data.
+
+Exports stream ``values_list()`` rows through ``.iterator()`` so memory use is
+independent of table size; the same column layout is read back by the
+``import_events`` management command.
+"""
+import csv
+import json
+
+from django.db import connections, router
+from django.db.models.constants import OnConflict
+
+from .models import Event, RSVP, Review
+
+
+EXPORT_TABLES = {
+    'events': (Event, ['id', 'title', 'description', 'organizer_id', 'location', 'start_time',
+                       'end_time', 'is_public', 'created_at', 'updated_at', 'recurrence_frequency',
+                       'recurrence_interval', 'recurrence_until', 'recurrence_count', 'series_id',
+                       'original_start', 'sequence', 'recurrence_end']),
+    'invitations': (Event.invited_users.through, ['event_id', 'user_id']),
+    'rsvps': (RSVP, ['id', 'event_id', 'user_id', 'status', 'created_at', 'updated_at']),
+    'reviews': (Review, ['id', 'event_id', 'user_id', 'rating', 'comment', 'created_at', 'updated_at']),
+}
+
+# Tables in dependency order, for imports
+IMPORT_ORDER = ['events', 'invitations', 'rsvps', 'reviews']
+
+EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+
+def _plain(value):
+    return value.isoformat() if hasattr(value, 'isoformat') else value
+
+
+def iter_rows(table, chunk_size=2000):
+    """Yield the rows of an export table as tuples, in primary key order"""
+    model, columns = EXPORT_TABLES[table]
+    queryset = model.objects.order_by('pk').values_list(*columns)
+    for row in queryset.iterator(chunk_size=chunk_size):
+        yield tuple(_plain(value) for value in row)
+
+
+class _Echo:
+    """File-like object whose write() hands the line back to the caller"""
+
+    def write(self, value):
+        return value
+
+
+def stream_export(table, export_format, chunk_size=2000):
+    """Yield the encoded lines of an export, header first for CSV"""
+    _, columns = EXPORT_TABLES[table]
+    rows = iter_rows(table, chunk_size)
+    if export_format == 'csv':
+        writer = csv.writer(_Echo())
+        yield writer.writerow(columns)
+        for row in rows:
+            yield writer.writerow(row)
+    else:
+        for row in rows:
+            yield json.dumps(dict(zip(columns, row)), ensure_ascii=False) + '\n'
+
+
+def read_records(path):
+    """Yield dicts from an NDJSON or CSV file, chosen by file extension"""
+    with open(path, newline='', encoding='utf-8') as handle:
+        if path.lower().endswith('.csv'):
+            yield from csv.DictReader(handle)
+        else:
+            for line in handle:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def build_instance(table, record):
+    """Turn an exported record back into an unsaved model instance"""
+    model, columns = EXPORT_TABLES[table]
+    values = {}
+    for column in columns:
+        if column not in record:
+            continue
+        field = model._meta.get_field(column[:-3] if column.endswith('_id') else column)
+        value = record[column]
+        values[field.attname] = None if value in ('', None) and field.null else field.to_python(value)
+    return model(**values)
+
+
+def insert_rows(model, rows, ignore_conflicts=False):
+    """
+    Insert unsaved instances with exactly the values they carry.
+
+    ``bulk_create`` runs each field's ``pre_save()``, which overwrites
+    ``auto_now``/``auto_now_add`` timestamps, so rows are written as raw
+    inserts instead, as ``loaddata`` does; imported timestamps survive.
+    """
+    if not rows:
+        return
+    fields = [field for field in model._meta.concrete_fields if not (field.primary_key and rows[0].pk is None)]
+    connection = connections[router.db_for_write(model)]
+    step = connection.ops.bulk_batch_size(fields, rows) or len(rows)
+    on_conflict = OnConflict.IGNORE if ignore_conflicts else None
+    for start in range(0, len(rows), step):
+        model._base_manager._insert(rows[start:start + step], fields=fields, raw=True,
+                                    using=connection.alias, on_conflict=on_conflict)
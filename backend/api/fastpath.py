@@ -0,0 +1,128 @@
+"""
+Serializer-free representations for the hot read endpoints.
+
+The builders here produce the same dicts as ``EventSerializer`` and
+``ReviewSerializer`` (same keys, order and value formats) straight from
+``values()`` rows, skipping per-field ``to_representation`` dispatch and
+model instantiation. They only cover full representations; sparse fieldset
+requests keep using the serializers.
+"""
+from collections import defaultdict
+
+from rest_framework import serializers
+
+from .cache import cached_event_data
+from .metrics import timed
+from .models import Event, average_rating
+
+# DRF's own formatting, so timestamps match the serializers exactly
+_datetime = serializers.DateTimeField().to_representation
+
+USER_COLUMNS = ('id', 'username', 'email', 'first_name', 'last_name')
+
+EVENT_COLUMNS = (
+    'id', 'title', 'description', 'location', 'start_time', 'end_time', 'is_public',
+    'created_at', 'updated_at', 'going_count', 'maybe_count', 'not_going_count',
+    'review_count', 'rating_sum', 'recurrence_frequency', 'recurrence_interval', 'recurrence_until',
+    'recurrence_count', 'series_id', 'original_start', 'organizer_id',
+    *(f'organizer__{column}' for column in USER_COLUMNS[1:]),
+)
+
+REVIEW_COLUMNS = (
+    'id', 'event_id', 'rating', 'comment', 'created_at', 'updated_at', 'user_id',
+    *(f'user__{column}' for column in USER_COLUMNS[1:]),
+)
+
+
+def _user(row, prefix):
+    return {
+        'id': row[f'{prefix}_id'],
+        **{column: row[f'{prefix}__{column}'] for column in USER_COLUMNS[1:]},
+    }
+
+
+@timed('serialize')
+def event_representations(ids):
+    """
+    Return id -> ``EventSerializer`` data for the given events, in two queries.
+
+    ``user_rsvp_status`` is left as None; callers lay the per-user value over
+    it (see ``api.cache.cached_event_data``).
+    """
+    invited = defaultdict(list)
+    through = Event.invited_users.through.objects.filter(event_id__in=ids)
+    for event_id, user_id in through.order_by('user_id').values_list('event_id', 'user_id'):
+        invited[event_id].append(user_id)
+
+    results = {}
+    for row in Event.objects.filter(pk__in=ids).order_by().values(*EVENT_COLUMNS):
+        results[row['id']] = {
+            'id': row['id'],
+            'title': row['title'],
+            'description': row['description'],
+            'organizer': _user(row, 'organizer'),
+            'location': row['location'],
+            'start_time': _datetime(row['start_time']),
+            'end_time': _datetime(row['end_time']),
+            'is_public': row['is_public'],
+            'created_at': _datetime(row['created_at']),
+            'updated_at': _datetime(row['updated_at']),
+            'rsvp_count': row['going_count'],
+            'user_rsvp_status': None,
+            'average_rating': average_rating(row['rating_sum'], row['review_count']),
+            'invited_users': invited.get(row['id'], []),
+            'maybe_count': row['maybe_count'],
+            'not_going_count': row['not_going_count'],
+            'review_count': row['review_count'],
+            'recurrence_frequency': row['recurrence_frequency'],
+            'recurrence_interval': row['recurrence_interval'],
+            'recurrence_until': _datetime(row['recurrence_until']),
+            'recurrence_count': row['recurrence_count'],
+            'series_id': row['series_id'],
+            'original_start': _datetime(row['original_start']),
+        }
+    return results
+
+
+def overlay_occurrence(data, event):
+    """Lay a computed occurrence's own times over its series' representation"""
+    data.update(
+        start_time=_datetime(event.start_time), end_time=_datetime(event.end_time),
+        series_id=event.series_id, original_start=_datetime(event.original_start),
+    )
+    if not event.first_occurrence:
+        # The series row's counters belong to its first occurrence
+        data.update(rsvp_count=0, maybe_count=0, not_going_count=0, review_count=0, average_rating=None)
+    return data
+
+
+def review_representation(row, event):
+    """``ReviewSerializer`` data for a ``REVIEW_COLUMNS`` row and its event's data"""
+    return {
+        'id': row['id'],
+        'event': event,
+        'user': _user(row, 'user'),
+        'rating': row['rating'],
+        'comment': row['comment'],
+        'created_at': _datetime(row['created_at']),
+        'updated_at': _datetime(row['updated_at']),
+    }
+
+
+@timed('serialize')
+def review_representations(rows, user):
+    """
+    ``ReviewSerializer`` data for ``REVIEW_COLUMNS`` rows, in order.
+
+    Nested events come from the shared fragment cache, with the user's RSVP
+    status laid over them.
+    """
+    events = Event.objects.filter(pk__in={row['event_id'] for row in rows}).only('id', 'organizer_id')
+    if user.is_authenticated:
+        events = events.with_user_rsvp_status(user)
+    events = list(events)
+    event_data = dict(zip(
+        (event.pk for event in events),
+        cached_event_data(events, event_representations),
+    ))
+    return [review_representation(row, event_data[row['event_id']]) for row in rows]
@@ -0,0 +1,87 @@
+"""
+Sparse fieldsets: ``?fields=`` and ``?omit=`` on read requests.
+
+Both take comma-separated field names; nested fields use dots, e.g.
+``/api/rsvps/?fields=id,status,event.title,event.start_time``. Naming a
+nested object without sub-fields (``fields=event``) keeps all of it.
+"""
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework.permissions import SAFE_METHODS
+
+FIELDS_PARAM = 'fields'
+OMIT_PARAM = 'omit'
+
+
+def _parse(value):
+    return {tuple(part.strip().split('.')) for part in value.split(',') if part.strip()}
+
+
+def get_fieldsets(request):
+    """Return (only, omit) path sets for a request; ``only`` is None when unrestricted"""
+    if request is None or request.method not in SAFE_METHODS:
+        return None, set()
+    params = request.query_params
+    only = _parse(params.get(FIELDS_PARAM, '')) or None
+    return only, _parse(params.get(OMIT_PARAM, ''))
+
+
+def has_fieldsets(request):
+    only, omit = get_fieldsets(request)
+    return only is not None or bool(omit)
+
+
+def is_requested(request, path):
+    """Whether the field at ``path`` (a tuple of names) is part of the response"""
+    only, omit = get_fieldsets(request)
+    if any(path[:i] in omit for i in range(1, len(path) + 1)):
+        return False
+    if only is None:
+        return True
+    return any(entry[:len(path)] == path or path[:len(entry)] == entry for entry in only)
+
+
+def model_fields_for(request, serializer_class, prefix=(), always=()):
+    """
+    Names of the concrete model fields a serializer needs for this request.
+
+    Serializer fields that are computed from other columns declare them in a
+    ``field_sources`` mapping on the serializer class.
+    """
+    model = serializer_class.Meta.model
+    sources = getattr(serializer_class, 'field_sources', {})
+    names = set(always)
+    for name in serializer_class.Meta.fields:
+        if not is_requested(request, prefix + (name,)):
+            continue
+        for source in sources.get(name, [name]):
+            try:
+                field = model._meta.get_field(source)
+            except FieldDoesNotExist:
+                continue
+            if field.concrete and not field.many_to_many:
+                names.add(field.name)
+    return names
+
+
+class SparseFieldsetsMixin:
+    """Serializer mixin that drops fields the request did not ask for"""
+
+    def fieldset_path(self):
+        path = []
+        node = self
+        while node.parent is not None:
+            if node.field_name:
+                path.append(node.field_name)
+            node = node.parent
+        return tuple(reversed(path))
+
+    def get_fields(self):
+        fields = super().get_fields()
+        request = self.context.get('request')
+        if not has_fieldsets(request):
+            return fields
+        path = self.fieldset_path()
+        return {
+            name: field for name, field in fields.items()
+            if field.write_only or is_requested(request, path + (name,))
+        }
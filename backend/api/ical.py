@@ -0,0 +1,213 @@
+"""
+Per-user iCalendar (RFC 5545) feeds.
+
+A feed lists the events a user organizes, is invited to or has RSVP'd to
+(declined ones are left out), from one ``values()`` query. Calendar clients
+cannot send an Authorization header, so the feed URL carries a signed token
+instead; changing the password revokes it.
+
+Only events the user can still see (``Event.objects.visible_to``) are
+listed, so revoking an invitation removes a private event even if the user
+had RSVP'd to it.
+
+Recurring events are one VEVENT with an RRULE; their stored occurrences
+are VEVENTs with a RECURRENCE-ID, or plain events when the series itself is
+not in the feed. All times are UTC, so no VTIMEZONE is needed. Series repeat
+in the server's wall-clock time (api.recurrence): with a TIME_ZONE that
+observes daylight saving, clients expanding the UTC RRULE place occurrences
+after a transition an hour off.
+
+Each event becomes one VEVENT block, with SEQUENCE (``Event.sequence``) and
+LAST-MODIFIED so clients replace their copy when it changes. Blocks are
+cached per user together with a digest of the columns they were rendered
+from, so a poll only renders events whose title, times, location,
+description, sequence or RSVP status changed. The ETag is built from those
+digests: counter updates that touch ``Event.updated_at`` do not change it,
+and a matching ``If-None-Match`` is answered with 304 before anything is
+rendered.
+"""
+import hashlib
+from datetime import timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core import signing
+from django.core.cache import caches
+from django.db.models import OuterRef, Q, Subquery
+from django.utils import timezone
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from .authentication import user_cache, user_stamp
+from .models import RSVP, Event
+from .recurrence import ongoing_series
+
+TOKEN_SALT = 'api.ical.feed'
+
+FEED_COLUMNS = ('id', 'title', 'description', 'location', 'start_time', 'end_time', 'created_at',
+                'organizer_id', 'user_status', 'recurrence_frequency', 'recurrence_interval',
+                'recurrence_until', 'recurrence_count', 'series_id', 'original_start', 'sequence',
+                'updated_at')
+
+SERIES_ID = FEED_COLUMNS.index('series_id')
+UPDATED_AT = FEED_COLUMNS.index('updated_at')
+
+# Changing any of these bumps Event.sequence
+CALENDAR_FIELDS = ('title', 'description', 'location', 'start_time', 'end_time', 'recurrence_frequency',
+                   'recurrence_interval', 'recurrence_until', 'recurrence_count')
+
+# VEVENT STATUS for the user's RSVP; organized events are always confirmed
+STATUS = {'going': 'CONFIRMED', 'maybe': 'TENTATIVE', None: 'TENTATIVE'}
+
+
+def feed_cache():
+    return caches[getattr(settings, 'CALENDAR_FEED_CACHE', 'default')]
+
+
+def _password_tag(user):
+    return get_md5_hash_password(user.password)[:12]
+
+
+def make_feed_token(user):
+    return signing.dumps({'u': user.pk, 'p': _password_tag(user)}, salt=TOKEN_SALT, compress=True)
+
+
+def feed_user(token):
+    """The active user a feed token was issued to, or None"""
+    try:
+        payload = signing.loads(token, salt=TOKEN_SALT)
+        user_id = str(payload['u'])
+    except (signing.BadSignature, KeyError, TypeError):
+        return None
+    stamp = user_stamp(user_id)
+    user = user_cache.get(user_id, 'user', stamp)
+    if user is None:
+        version = user_cache.version
+        user = User.objects.filter(pk=user_id).first()
+        if user is None:
+            return None
+        user_cache.set(user_id, 'user', user, version, stamp)
+    if not user.is_active or payload.get('p') != _password_tag(user):
+        return None
+    return user
+
+
+def feed_rows(user):
+    """The user's calendar, as FEED_COLUMNS tuples in start time order"""
+    since = timezone.now() - timedelta(days=getattr(settings, 'CALENDAR_FEED_PAST_DAYS', 90))
+    status = RSVP.objects.filter(event=OuterRef('pk'), user_id=user.pk).values('status')[:1]
+    invited = Event.invited_users.through.objects.filter(user_id=user.pk).values('event_id')
+    answered = RSVP.objects.filter(user_id=user.pk).values('event_id')
+    current = Q(end_time__gte=since) | ongoing_series(since)
+    rows = list(
+        Event.objects.visible_to(user).annotate(user_status=Subquery(status))
+        .filter(Q(organizer_id=user.pk) | Q(pk__in=invited) | Q(pk__in=answered))
+        .filter(current)
+        .filter(Q(user_status__isnull=True) | Q(user_status__in=['going', 'maybe']) | Q(organizer_id=user.pk))
+        .order_by('start_time', 'id')
+        .values_list(*FEED_COLUMNS)
+    )
+    # Occurrences whose series is not in the feed stand alone
+    ids = {row[0] for row in rows}
+    return [
+        row if row[SERIES_ID] is None or row[SERIES_ID] in ids else (*row[:SERIES_ID], None, *row[SERIES_ID + 1:])
+        for row in rows
+    ]
+
+
+def escape_text(value):
+    return (value.replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,')
+            .replace('\r\n', '\\n').replace('\n', '\\n'))
+
+
+def fold(line):
+    """Split a content line into 75-octet pieces, never inside a UTF-8 sequence"""
+    encoded = line.encode()
+    if len(encoded) <= 75:
+        return line + '\r\n'
+    pieces, start, limit = [], 0, 75
+    while start < len(encoded):
+        end = min(start + limit, len(encoded))
+        # Back off continuation bytes (0b10xxxxxx)
+        while end < len(encoded) and encoded[end] & 0xC0 == 0x80:
+            end -= 1
+        pieces.append(encoded[start:end].decode())
+        start, limit = end, 74  # continuation lines start with a space
+    return '\r\n '.join(pieces) + '\r\n'
+
+
+def format_time(value):
+    return value.astimezone(dt_timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+
+def rrule(event):
+    parts = [f'FREQ={event["recurrence_frequency"].upper()}', f'INTERVAL={event["recurrence_interval"]}']
+    if event['recurrence_until'] is not None:
+        parts.append(f'UNTIL={format_time(event["recurrence_until"])}')
+    if event['recurrence_count'] is not None:
+        parts.append(f'COUNT={event["recurrence_count"]}')
+    return 'RRULE:' + ';'.join(parts)
+
+
+def render_event(row, user, domain):
+    event = dict(zip(FEED_COLUMNS, row))
+    status = 'CONFIRMED' if event['organizer_id'] == user.pk else STATUS[event['user_status']]
+    lines = ['BEGIN:VEVENT']
+    if event['series_id'] is not None:
+        lines += [f'UID:event-{event["series_id"]}@{domain}',
+                  f'RECURRENCE-ID:{format_time(event["original_start"])}']
+    else:
+        lines.append(f'UID:event-{event["id"]}@{domain}')
+    lines += [
+        f'DTSTAMP:{format_time(event["updated_at"])}',
+        f'CREATED:{format_time(event["created_at"])}',
+        f'LAST-MODIFIED:{format_time(event["updated_at"])}',
+        f'SEQUENCE:{event["sequence"]}',
+        f'DTSTART:{format_time(event["start_time"])}',
+        f'DTEND:{format_time(event["end_time"])}',
+    ]
+    if event['recurrence_frequency']:
+        lines.append(rrule(event))
+    lines += [
+        f'SUMMARY:{escape_text(event["title"])}',
+        f'LOCATION:{escape_text(event["location"])}',
+        f'DESCRIPTION:{escape_text(event["description"])}',
+        f'STATUS:{status}',
+        'END:VEVENT',
+    ]
+    return ''.join(fold(line) for line in lines)
+
+
+def row_digest(row):
+    # updated_at also moves with counter updates; edits that matter bump sequence
+    return hashlib.md5(repr(row[:UPDATED_AT] + row[UPDATED_AT + 1:]).encode()).hexdigest()
+
+
+def feed_etag(digests):
+    return hashlib.md5(','.join(digests).encode()).hexdigest()
+
+
+def feed_body(user, rows, digests, domain):
+    """
+    The VEVENT blocks for ``rows``, reusing cached blocks whose digest still
+    matches and rendering the rest.
+    """
+    cache = feed_cache()
+    key = f'ical:{user.pk}:{domain}'
+    cached = cache.get(key) or {}
+    blocks = {}
+    for row, digest in zip(rows, digests):
+        previous = cached.get(row[0])
+        if previous is None or previous[0] != digest:
+            previous = (digest, render_event(row, user, domain))
+        blocks[row[0]] = previous
+    cache.set(key, blocks, getattr(settings, 'CALENDAR_FEED_TIMEOUT', 24 * 60 * 60))
+    return [block for _, block in blocks.values()]
+
+
+def stream_feed(blocks, name):
+    yield ''.join(fold(line) for line in (
+        'BEGIN:VCALENDAR', 'VERSION:2.0', 'PRODID:-//Event Management System//Calendar Feed//EN',
+        'CALSCALE:GREGORIAN', 'METHOD:PUBLISH', f'X-WR-CALNAME:{escape_text(name)}',
+    ))
+    yield from blocks
+    yield 'END:VCALENDAR\r\n'
@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from api.models import Event
+from api.rollups import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = (
+        'Rebuild the daily organizer/event rollups from the RSVP and review tables. '
+        'RSVPs land on the day they last changed and reviews on the day they were written.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='Number of events to rebuild per transaction')
+        parser.add_argument('--organizer', type=int,
+                            help='Only rebuild the events of this organizer (user id)')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        if batch_size < 1:
+            raise CommandError('--batch-size must be positive')
+        events = Event.objects.order_by('pk')
+        if options['organizer'] is not None:
+            events = events.filter(organizer_id=options['organizer'])
+        checked = written = 0
+        last_id = 0
+
+        while True:
+            with transaction.atomic():
+                batch = list(events.filter(pk__gt=last_id).only('pk', 'organizer_id')[:batch_size])
+                if not batch:
+                    break
+                last_id = batch[-1].pk
+                written += rebuild_rollups(batch)
+            checked += len(batch)
+            if options['verbosity'] > 1:
+                self.stdout.write(f'Rebuilt up to event {last_id}')
+
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {written} daily rows for {checked} events.'))
@@ -0,0 +1,173 @@
+import asyncio
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from io import BytesIO
+from urllib.parse import urlsplit
+
+from django.contrib.auth.models import User
+from django.core.asgi import get_asgi_application
+from django.core.management.base import BaseCommand, CommandError
+from django.core.wsgi import get_wsgi_application
+from django.db import connections
+from django.db.backends.signals import connection_created
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api.benchmarking import summarize
+
+
+@contextmanager
+def database_latency(seconds):
+    """
+    Sleep before every SQL statement on every connection opened meanwhile,
+    to stand in for the round trip to a remote MySQL server.
+    """
+    def delay(execute, sql, params, many, context):
+        time.sleep(seconds)
+        return execute(sql, params, many, context)
+
+    def install(sender, connection, **kwargs):
+        connection.execute_wrappers.append(delay)
+
+    if seconds <= 0:
+        yield
+        return
+    connections.close_all()
+    connection_created.connect(install)
+    try:
+        yield
+    finally:
+        connection_created.disconnect(install)
+        connections.close_all()
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare a pool of WSGI worker threads with one ASGI event loop serving the same '
+        'number of concurrent clients on the event read endpoints'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', default='/events/',
+                            help='Endpoint under /api/ (the ASGI run uses /api/async/<path>)')
+        parser.add_argument('--user', help='Username to authenticate as (default: anonymous)')
+        parser.add_argument('--requests', type=int, default=400, help='Requests per server mode')
+        parser.add_argument('--concurrency', type=int, default=100, help='Concurrent clients')
+        parser.add_argument('--threads', type=int, default=8, help='WSGI worker threads')
+        parser.add_argument('--latency', type=float, default=20.0,
+                            help='Milliseconds added to every SQL statement (simulated DB round trip)')
+        parser.add_argument('--json', action='store_true', help='Emit a machine-readable report')
+
+    def handle(self, *args, **options):
+        path = '/' + options['path'].strip('/') + '/'
+        headers = {}
+        if options['user']:
+            try:
+                user = User.objects.get(username=options['user'])
+            except User.DoesNotExist:
+                raise CommandError(f'No user named {options["user"]!r}')
+            headers['authorization'] = f'Bearer {AccessToken.for_user(user)}'
+
+        report = {'path': path, 'latency_ms': options['latency'], 'concurrency': options['concurrency']}
+        with database_latency(options['latency'] / 1000):
+            report['wsgi'] = self.run_wsgi(f'/api{path}', headers, options)
+            report['asgi'] = self.run_asgi(f'/api/async{path}', headers, options)
+
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+        self.stdout.write(
+            f'{path}: {options["requests"]} requests per mode, {options["concurrency"]} clients, '
+            f'{options["latency"]:g} ms per query'
+        )
+        for mode, label in (('wsgi', f'WSGI, {options["threads"]} threads'), ('asgi', 'ASGI, 1 event loop')):
+            stats = report[mode]
+            self.stdout.write(
+                f'  {label:<22} {stats["throughput_rps"]:>8} req/s  p50 {stats["p50_ms"]} ms  '
+                f'p95 {stats["p95_ms"]} ms  p99 {stats["p99_ms"]} ms  errors {stats["errors"]}'
+            )
+
+    def run_wsgi(self, url, headers, options):
+        """Drive the WSGI handler with a fixed number of worker threads"""
+        application = get_wsgi_application()
+        parts = urlsplit(url)
+        environ = {
+            'REQUEST_METHOD': 'GET',
+            'PATH_INFO': parts.path,
+            'QUERY_STRING': parts.query,
+            'SERVER_NAME': 'localhost',
+            'SERVER_PORT': '80',
+            'wsgi.url_scheme': 'http',
+            **{f'HTTP_{name.upper().replace("-", "_")}': value for name, value in headers.items()},
+        }
+
+        workers = threading.BoundedSemaphore(options['threads'])
+
+        def call():
+            # Latency is what the client sees, including the wait for a free worker thread
+            started = time.perf_counter()
+            status_line = []
+            with workers:
+                b''.join(application(
+                    dict(environ, **{'wsgi.input': BytesIO()}),
+                    lambda status, response_headers, exc_info=None: status_line.append(status),
+                ))
+            return time.perf_counter() - started, status_line[0].startswith('200')
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as clients:
+            results = list(clients.map(lambda _: call(), range(options['requests'])))
+        elapsed = time.perf_counter() - started
+        return summarize([latency for latency, _ in results], elapsed, sum(not ok for _, ok in results))
+
+    def run_asgi(self, url, headers, options):
+        """Drive the ASGI handler from one event loop with many concurrent clients"""
+        application = get_asgi_application()
+        parts = urlsplit(url)
+        scope = {
+            'type': 'http',
+            'asgi': {'version': '3.0'},
+            'http_version': '1.1',
+            'method': 'GET',
+            'scheme': 'http',
+            'path': parts.path,
+            'raw_path': parts.path.encode(),
+            'query_string': parts.query.encode(),
+            'headers': [(name.encode(), value.encode()) for name, value in headers.items()],
+            'server': ('localhost', 80),
+            'client': ('127.0.0.1', 0),
+        }
+
+        async def call(gate):
+            async with gate:
+                started = time.perf_counter()
+                messages = []
+                inbox = [{'type': 'http.request', 'body': b'', 'more_body': False}]
+                finished = asyncio.Event()
+
+                async def receive():
+                    if inbox:
+                        return inbox.pop()
+                    # Like a server: report the disconnect once the response is out
+                    await finished.wait()
+                    return {'type': 'http.disconnect'}
+
+                async def send(message):
+                    messages.append(message)
+                    if message['type'] == 'http.response.body' and not message.get('more_body'):
+                        finished.set()
+
+                await application(dict(scope), receive, send)
+                status_code = next(m['status'] for m in messages if m['type'] == 'http.response.start')
+                return time.perf_counter() - started, status_code == 200
+
+        async def main():
+            gate = asyncio.Semaphore(options['concurrency'])
+            return await asyncio.gather(*(call(gate) for _ in range(options['requests'])))
+
+        started = time.perf_counter()
+        results = asyncio.run(main())
+        elapsed = time.perf_counter() - started
+        return summarize([latency for latency, _ in results], elapsed, sum(not ok for _, ok in results))
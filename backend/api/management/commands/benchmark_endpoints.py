@@ -0,0 +1,262 @@
+import json
+import os
+import platform
+import random
+import tempfile
+import threading
+import time
+from collections import namedtuple
+
+import django
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.test import Client
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api.benchmarking import DEFAULT_TOLERANCE, compare_reports, count_queries, summarize
+from api.models import Event
+from api.seeding import SEED_PASSWORD, TOPICS, seed_dataset
+
+# ``path`` may contain {event} (a visible event, a new one per request for
+# reviews so each client's POST is its first review there) and {topic}
+Route = namedtuple('Route', 'method path body ok', defaults=(None, (200,)))
+
+ROUTES = {
+    'auth_login': Route('POST', '/api/auth/login/', 'login'),
+    'auth_me': Route('GET', '/api/auth/me/'),
+    'events_list': Route('GET', '/api/events/'),
+    'events_search': Route('GET', '/api/events/?search={topic}'),
+    'event_detail': Route('GET', '/api/events/{event}/'),
+    'event_rsvp': Route('POST', '/api/events/{event}/rsvp/', 'rsvp', (200, 201)),
+    'event_rsvps': Route('GET', '/api/events/{event}/rsvps/'),
+    'event_review': Route('POST', '/api/events/{event}/review/', 'review', (201,)),
+    'event_reviews': Route('GET', '/api/events/{event}/reviews/'),
+    'rsvps_list': Route('GET', '/api/rsvps/'),
+    'reviews_list': Route('GET', '/api/reviews/'),
+    'profiles_list': Route('GET', '/api/profiles/'),
+    'async_events_list': Route('GET', '/api/async/events/'),
+    'async_event_detail': Route('GET', '/api/async/events/{event}/'),
+    'async_event_reviews': Route('GET', '/api/async/events/{event}/reviews/'),
+    'async_auth_me': Route('GET', '/api/async/auth/me/'),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Drive the API routes in-process with concurrent clients over a seeded dataset and '
+        'report p50/p95/p99 latency, throughput and queries per request, optionally '
+        'compared with a baseline report'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--routes', nargs='+', choices=sorted(ROUTES), metavar='ROUTE',
+                            help=f'Routes to run (default: all of {", ".join(ROUTES)})')
+        parser.add_argument('--requests', type=int, default=100, help='Measured requests per route')
+        parser.add_argument('--warmup', type=int, default=5, help='Unmeasured requests per route first')
+        parser.add_argument('--concurrency', type=int, default=4, help='Concurrent clients')
+        parser.add_argument('--in-place', action='store_true',
+                            help='Use the configured database instead of a scratch test database '
+                                 '(seeds it only if it has no seed users yet)')
+        dataset = parser.add_argument_group('dataset')
+        dataset.add_argument('--users', type=int, default=200)
+        dataset.add_argument('--events', type=int, default=2000)
+        dataset.add_argument('--private-ratio', type=float, default=0.2)
+        dataset.add_argument('--invites-per-private', type=int, default=20)
+        dataset.add_argument('--rsvps-per-event', type=int, default=10)
+        dataset.add_argument('--review-ratio', type=float, default=0.3,
+                             help='Share of attendees of past events who leave a review')
+        dataset.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--output', metavar='FILE', help='Write the JSON report to FILE')
+        parser.add_argument('--baseline', metavar='FILE', help='Compare with a report saved by --output')
+        parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                            help='Relative latency/throughput change counted as a regression')
+        parser.add_argument('--fail-on-regression', action='store_true',
+                            help='Exit with an error if the baseline comparison finds regressions')
+        parser.add_argument('--json', action='store_true', help='Print the JSON report')
+
+    def handle(self, *args, **options):
+        if options['requests'] < 1 or options['concurrency'] < 1:
+            raise CommandError('--requests and --concurrency must be positive')
+        baseline = None
+        if options['baseline']:
+            try:
+                with open(options['baseline']) as handle:
+                    baseline = json.load(handle)
+            except (OSError, ValueError) as exc:
+                raise CommandError(f'Cannot read baseline {options["baseline"]}: {exc}')
+
+        if options['in_place']:
+            report = self.benchmark(options)
+        else:
+            report = self.with_scratch_database(self.benchmark, options)
+
+        rows, regressions = [], []
+        if baseline is not None:
+            rows, regressions = compare_reports(report, baseline, options['tolerance'])
+            report['regressions'] = regressions
+        if options['output']:
+            with open(options['output'], 'w') as handle:
+                json.dump(report, handle, indent=2)
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+        else:
+            self.write_table(report)
+            if baseline is not None:
+                self.write_comparison(rows, regressions)
+        if regressions and options['fail_on_regression']:
+            raise CommandError(f'{len(regressions)} regression(s) against {options["baseline"]}')
+
+    def with_scratch_database(self, run, options):
+        """Run against a throwaway test database (test_<NAME>), destroyed afterwards"""
+        old_name = connection.settings_dict['NAME']
+        scratch_dir = None
+        if connection.vendor == 'sqlite':
+            # A file, not the default in-memory database: client threads each
+            # open their own connection and must see the same data
+            scratch_dir = tempfile.mkdtemp()
+            connection.settings_dict.setdefault('TEST', {})['NAME'] = os.path.join(scratch_dir, 'bench.sqlite3')
+            # Take the write lock at BEGIN so concurrent writers wait for each
+            # other instead of failing when a read transaction tries to upgrade
+            connection.settings_dict.setdefault('OPTIONS', {}).setdefault('transaction_mode', 'IMMEDIATE')
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            return run(options)
+        finally:
+            connections.close_all()
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            if scratch_dir:
+                os.rmdir(scratch_dir)
+
+    def seed(self, options):
+        # Keep --json output parseable
+        log = None if options['json'] else self.stdout
+        if User.objects.filter(username='seed_user_0').exists():
+            if log:
+                log.write('Using the seed users and events already in the database')
+            return None
+        dataset = seed_dataset(
+            users=options['users'], events=options['events'], private_ratio=options['private_ratio'],
+            invites_per_private=options['invites_per_private'], rsvps_per_event=options['rsvps_per_event'],
+            review_ratio=options['review_ratio'], seed=options['seed'],
+        )
+        if log:
+            log.write(f'Seeded {dataset["rows"]} rows in {dataset["seconds"]}s')
+        return dataset
+
+    def benchmark(self, options):
+        dataset = self.seed(options)
+        # Benchmark clients are separate users so their POSTs never collide with seeded rows
+        names = [f'bench_client_{i}' for i in range(options['concurrency'])]
+        password = User.objects.filter(username='seed_user_0').values_list('password', flat=True).first()
+        User.objects.bulk_create([User(username=name, password=password) for name in names],
+                                 ignore_conflicts=True)
+        clients = list(User.objects.filter(username__in=names).order_by('username'))
+        event_ids = list(
+            Event.objects.filter(is_public=True, title__startswith='[seed]').order_by('id').values_list('id', flat=True)
+        )
+        if not event_ids:
+            raise CommandError('The dataset has no public seed events')
+
+        report = {
+            'meta': {
+                'created_at': timezone.now().isoformat(),
+                'database': connection.vendor,
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'requests_per_route': options['requests'],
+                'concurrency': options['concurrency'],
+                'dataset': dataset,
+            },
+            'routes': {},
+        }
+        for name in options['routes'] or ROUTES:
+            # Warm-up reviews would use up events the measured run reviews
+            if options['warmup'] and ROUTES[name].body != 'review':
+                self.run_route(ROUTES[name], clients, event_ids, options['warmup'], options['seed'] + 1)
+            report['routes'][name] = self.run_route(
+                ROUTES[name], clients, event_ids, options['requests'], options['seed']
+            )
+        return report
+
+    def run_route(self, route, users, event_ids, total, seed):
+        """Send ``total`` requests spread over one thread per client user"""
+        results = []
+        lock = threading.Lock()
+        # A name that passes ALLOWED_HOSTS ('localhost' is allowed with DEBUG on)
+        host = next((h for h in settings.ALLOWED_HOSTS if h != '*' and not h.startswith('.')), 'localhost')
+        share, extra = divmod(total, len(users))
+
+        def client(index, user, count):
+            rng = random.Random(seed * 1000 + index)
+            http = Client(SERVER_NAME=host, raise_request_exception=False,
+                          HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}')
+            # Each review POST needs an event this client has not reviewed yet
+            unreviewed = iter(rng.sample(event_ids, len(event_ids)))
+            mine = []
+            try:
+                for _ in range(count):
+                    event_id = next(unreviewed, None) if route.body == 'review' else rng.choice(event_ids)
+                    path = route.path.format(event=event_id, topic=rng.choice(TOPICS))
+                    body = {
+                        None: None,
+                        'login': {'username': user.username, 'password': SEED_PASSWORD},
+                        'rsvp': {'status': rng.choice(['going', 'maybe', 'not_going'])},
+                        'review': {'rating': rng.randint(1, 5), 'comment': 'Benchmark review'},
+                    }[route.body]
+                    started = time.perf_counter()
+                    with count_queries() as counter:
+                        if route.method == 'GET':
+                            response = http.get(path)
+                        else:
+                            response = http.post(path, body, content_type='application/json')
+                        if response.streaming:
+                            b''.join(response.streaming_content)
+                    mine.append((time.perf_counter() - started, counter.queries,
+                                 response.status_code in route.ok))
+            finally:
+                connections.close_all()
+            with lock:
+                results.extend(mine)
+
+        threads = [
+            threading.Thread(target=client, args=(i, user, share + (i < extra)))
+            for i, user in enumerate(users)
+        ]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        stats = summarize([latency for latency, _, _ in results], elapsed, sum(not ok for _, _, ok in results))
+        stats['queries_per_request'] = round(sum(q for _, q, _ in results) / len(results), 2) if results else 0.0
+        return stats
+
+    def write_table(self, report):
+        meta = report['meta']
+        self.stdout.write(
+            f'{meta["requests_per_route"]} requests per route, {meta["concurrency"]} clients, {meta["database"]}'
+        )
+        self.stdout.write(f'  {"route":<22} {"req/s":>8} {"p50 ms":>8} {"p95 ms":>8} {"p99 ms":>8} '
+                          f'{"queries":>8} {"errors":>7}')
+        for name, stats in report['routes'].items():
+            self.stdout.write(
+                f'  {name:<22} {stats["throughput_rps"]:>8} {stats["p50_ms"]:>8} {stats["p95_ms"]:>8} '
+                f'{stats["p99_ms"]:>8} {stats["queries_per_request"]:>8} {stats["errors"]:>7}'
+            )
+
+    def write_comparison(self, rows, regressions):
+        if not rows:
+            self.stdout.write('No routes in common with the baseline')
+            return
+        for row in regressions:
+            change = f'{row["change_pct"]:+.1f}%' if row['change_pct'] is not None else 'new'
+            self.stdout.write(self.style.ERROR(
+                f'  regression: {row["route"]} {row["metric"]} {row["baseline"]} -> {row["current"]} ({change})'
+            ))
+        if not regressions:
+            self.stdout.write(self.style.SUCCESS(f'No regressions across {len(rows)} compared metrics'))
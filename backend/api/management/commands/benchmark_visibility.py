@@ -0,0 +1,132 @@
+import random
+import statistics
+import time
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from api.models import Event
+from api.pagination import MergedQuerysets
+
+
+def legacy_visibility(user):
+    """The original OR-join visibility filter, kept for comparison"""
+    return Event.objects.filter(
+        Q(is_public=True) |
+        Q(organizer=user) |
+        Q(invited_users=user)
+    ).distinct()
+
+
+class Command(BaseCommand):
+    help = ('Compare the index-served visibility branches the event list pages through with the '
+            'join-free OR filter and the legacy OR-join + DISTINCT plan; see EventQuerySet.visible_branches')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--events', type=int, default=1_000_000)
+        parser.add_argument('--invitations', type=int, default=10_000_000)
+        parser.add_argument('--users', type=int, default=100_000)
+        parser.add_argument('--private-ratio', type=float, default=0.2,
+                            help='Fraction of seeded events that are private')
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--skip-seed', action='store_true',
+                            help='Benchmark against the data already in the database')
+        parser.add_argument('--runs', type=int, default=5)
+        parser.add_argument('--page-size', type=int, default=10)
+
+    def handle(self, *args, **options):
+        if not options['skip_seed']:
+            self.seed(options)
+
+        probe = (
+            User.objects.annotate(n=Count('invited_events'))
+            .order_by('-n').only('id').first()
+        )
+        if probe is None:
+            self.stderr.write('No users to benchmark with.')
+            return
+
+        plans = {
+            'legacy (OR join + DISTINCT)': [legacy_visibility(probe)],
+            'join-free OR (id list or EXISTS)': [Event.objects.visible_to(probe)],
+            'merged index-served branches': Event.objects.visible_branches(probe),
+        }
+        for name, querysets in plans.items():
+            querysets = [queryset.order_by('-start_time') for queryset in querysets]
+            ordered = querysets[0] if len(querysets) == 1 else MergedQuerysets(querysets)
+            self.stdout.write(self.style.MIGRATE_HEADING(name))
+            for queryset in querysets:
+                self.stdout.write(queryset[:options['page_size']].explain())
+            for label, run in (
+                ('first page', lambda: list(ordered[:options['page_size']])),
+                ('count', lambda: ordered.count()),
+            ):
+                timings = []
+                for _ in range(options['runs']):
+                    started = time.perf_counter()
+                    run()
+                    timings.append((time.perf_counter() - started) * 1000)
+                self.stdout.write(
+                    f'  {label}: median {statistics.median(timings):.1f} ms, '
+                    f'max {max(timings):.1f} ms over {options["runs"]} runs'
+                )
+
+    def seed(self, options):
+        rng = random.Random(options['seed'])
+        batch_size = options['batch_size']
+        now = timezone.now()
+        started = time.perf_counter()
+
+        first_user = User.objects.order_by('-id').values_list('id', flat=True).first() or 0
+        users = [
+            User(username=f'bench_user_{first_user + i}', password='!')
+            for i in range(options['users'])
+        ]
+        for i in range(0, len(users), batch_size):
+            User.objects.bulk_create(users[i:i + batch_size])
+        user_ids = list(User.objects.filter(username__startswith='bench_user_').values_list('id', flat=True))
+
+        for offset in range(0, options['events'], batch_size):
+            events = []
+            for _ in range(min(batch_size, options['events'] - offset)):
+                start = now + timedelta(minutes=rng.randint(-525_600, 525_600))
+                events.append(Event(
+                    title='Benchmark event',
+                    description='',
+                    organizer_id=rng.choice(user_ids),
+                    location='Benchmark',
+                    start_time=start,
+                    end_time=start + timedelta(hours=2),
+                    is_public=rng.random() >= options['private_ratio'],
+                ))
+            with transaction.atomic():
+                Event.objects.bulk_create(events)
+        private_ids = list(
+            Event.objects.filter(is_public=False, title='Benchmark event').values_list('id', flat=True)
+        )
+
+        Invitation = Event.invited_users.through
+        per_event = max(1, options['invitations'] // max(1, len(private_ids)))
+        per_event = min(per_event, len(user_ids))
+        pending = []
+        for event_id in private_ids:
+            pending.extend(
+                Invitation(event_id=event_id, user_id=user_id)
+                for user_id in rng.sample(user_ids, per_event)
+            )
+            if len(pending) >= batch_size:
+                with transaction.atomic():
+                    Invitation.objects.bulk_create(pending, ignore_conflicts=True)
+                pending = []
+        if pending:
+            Invitation.objects.bulk_create(pending, ignore_conflicts=True)
+
+        self.stdout.write(
+            f'Seeded {len(users)} users, {options["events"]} events and '
+            f'{per_event * len(private_ids)} invitations in {time.perf_counter() - started:.1f}s'
+        )
@@ -0,0 +1,158 @@
+import json
+import re
+
+from django.contrib.auth.models import AnonymousUser, User
+from django.core.management.base import BaseCommand
+from django.db import connection
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from api.conditional import validators_query
+from api.models import RSVP, Event, Review
+from api.pagination import EventResultsSetPagination, StandardResultsSetPagination
+from api.serializers import ReviewSerializer, RSVPSerializer
+from api.views import EventViewSet, RSVPViewSet, ReviewViewSet, narrow_event_children
+
+
+def build_view(viewset_class, action, user, params=None, **kwargs):
+    """Instantiate a viewset the way the router would for a GET request"""
+    request = Request(APIRequestFactory().get('/', params or {}))
+    request.user = user
+    view = viewset_class(action=action, request=request, format_kwarg=None, kwargs=kwargs, args=())
+    view.headers = {}
+    return view
+
+
+def analyze_plan(plan):
+    """Return (full_scans, filesorts, indexes_used) for an EXPLAIN output"""
+    full_scans, filesorts, used = [], [], set()
+    vendor = connection.vendor
+    if vendor == 'mysql':
+        def walk(node):
+            if isinstance(node, dict):
+                table = node.get('table_name')
+                if table and node.get('access_type') == 'ALL':
+                    full_scans.append(table)
+                if node.get('key'):
+                    used.add(node['key'])
+                if node.get('using_filesort'):
+                    filesorts.append(node.get('table_name', 'query'))
+                for value in node.values():
+                    walk(value)
+            elif isinstance(node, list):
+                for value in node:
+                    walk(value)
+        walk(json.loads(plan))
+    elif vendor == 'sqlite':
+        for line in plan.splitlines():
+            scan = re.search(r'\bSCAN (\w+)', line)
+            if scan and 'INDEX' not in line:
+                full_scans.append(scan.group(1))
+            if 'TEMP B-TREE' in line:
+                filesorts.append(line.split('USE TEMP B-TREE FOR ')[-1].strip())
+            index = re.search(r'USING (?:COVERING )?INDEX (\w+)', line)
+            if index:
+                used.add(index.group(1))
+    else:
+        full_scans = re.findall(r'Seq Scan on (\w+)', plan)
+        filesorts = ['sort'] * plan.count('Sort Key')
+        used = set(re.findall(r'Index (?:Only )?Scan(?: Backward)? using (\w+)', plan))
+    return full_scans, filesorts, used
+
+
+class Command(BaseCommand):
+    help = 'EXPLAIN the querysets served by the event, RSVP and review endpoints and report weak plans'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help='Username to replay requests as (default: anonymous)')
+        parser.add_argument('--json', action='store_true', help='Emit a machine-readable report')
+
+    def handle(self, *args, **options):
+        user = AnonymousUser()
+        if options['user']:
+            user = User.objects.get(username=options['user'])
+
+        report = []
+        used_everywhere = set()
+        for name, queryset in self.scenarios(user):
+            plan = queryset.explain(format='json') if connection.vendor == 'mysql' else queryset.explain()
+            full_scans, filesorts, used = analyze_plan(plan)
+            used_everywhere |= used
+            report.append({
+                'query': name,
+                'full_scans': full_scans,
+                'filesorts': filesorts,
+                'indexes': sorted(used),
+                'plan': plan,
+            })
+
+        unused = sorted(set(self.candidate_indexes()) - used_everywhere)
+
+        if options['json']:
+            self.stdout.write(json.dumps({'queries': report, 'unused_indexes': unused}, indent=2))
+            return
+
+        for entry in report:
+            flagged = entry['full_scans'] or entry['filesorts']
+            style = self.style.WARNING if flagged else self.style.SUCCESS
+            self.stdout.write(style(entry['query']))
+            if entry['full_scans']:
+                self.stdout.write(f'  full scan: {", ".join(entry["full_scans"])}')
+            if entry['filesorts']:
+                self.stdout.write(f'  filesort: {", ".join(entry["filesorts"])}')
+            self.stdout.write(f'  indexes: {", ".join(entry["indexes"]) or "none"}')
+            if options['verbosity'] > 1:
+                self.stdout.write(entry['plan'])
+        if unused:
+            self.stdout.write(self.style.WARNING('Indexes not used by any replayed query:'))
+            for index in unused:
+                self.stdout.write(f'  {index}')
+
+    def scenarios(self, user):
+        """Yield (name, queryset) for the first page of each read endpoint"""
+        page_size = StandardResultsSetPagination.page_size
+        event = Event.objects.visible_to(user).order_by('-start_time').first()
+
+        for label, params in (
+            ('events list', {}),
+            ('events list ?is_public=true', {'is_public': 'true'}),
+            ('events list ?search=', {'search': 'event'}),
+            ('events list ?ordering=title', {'ordering': 'title'}),
+        ):
+            view = build_view(EventViewSet, 'list', user, params)
+            queryset = view.filter_queryset(view.get_queryset())
+            yield f'{label} (page)', queryset[:page_size]
+            yield f'{label} (count)', queryset.order_by().values('pk')
+            if not params:
+                cursor = queryset.order_by(*EventResultsSetPagination.keyset_ordering)
+                yield f'{label} (cursor)', cursor[:page_size]
+
+        if event is not None:
+            view = build_view(EventViewSet, 'retrieve', user, pk=event.pk)
+            yield 'event detail', view.get_queryset().filter(pk=event.pk)
+            reviews = narrow_event_children(event.reviews.all(), view.request, ReviewSerializer)
+            # Conditional GET validators run before every page (api.conditional)
+            yield 'event reviews (validators)', validators_query(reviews)
+            yield 'event reviews', reviews[:page_size]
+            rsvps = narrow_event_children(event.rsvps.all(), view.request, RSVPSerializer)
+            yield 'event rsvps (validators)', validators_query(rsvps)
+            yield 'event rsvps', rsvps
+
+        if user.is_authenticated:
+            view = build_view(RSVPViewSet, 'list', user)
+            yield 'rsvps list', view.filter_queryset(view.get_queryset())[:page_size]
+            view = build_view(ReviewViewSet, 'list', user)
+            yield 'reviews list', view.filter_queryset(view.get_queryset())[:page_size]
+            if event is not None:
+                view = build_view(ReviewViewSet, 'list', user, {'event_id': event.pk})
+                yield 'reviews list ?event_id=', view.filter_queryset(view.get_queryset())[:page_size]
+
+    def candidate_indexes(self):
+        """Secondary indexes on the api tables"""
+        with connection.cursor() as cursor:
+            for model in (Event, Event.invited_users.through, Review, RSVP):
+                table = model._meta.db_table
+                constraints = connection.introspection.get_constraints(cursor, table)
+                for name, info in constraints.items():
+                    if info['index'] and not info['primary_key']:
+                        yield name
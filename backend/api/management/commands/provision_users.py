@@ -0,0 +1,45 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.exports import read_records
+from api.provisioning import provision_users
+
+
+class Command(BaseCommand):
+    help = (
+        'Create users with profiles from an NDJSON or CSV file, hashing passwords '
+        'in a process pool and inserting in batches'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('file', help='NDJSON/CSV with username, email, password, first_name, '
+                                         'last_name, full_name, bio, location')
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='Users per bulk_create pair (and transaction)')
+        parser.add_argument('--workers', type=int, default=None,
+                            help='Hashing processes (default: one per CPU; 1 hashes inline)')
+        parser.add_argument('--json', action='store_true', help='Emit the full report as JSON')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be positive')
+        try:
+            records = read_records(options['file'])
+            report = provision_users(records, batch_size=options['batch_size'], workers=options['workers'])
+        except (OSError, ValueError) as exc:
+            raise CommandError(f'Cannot read {options["file"]}: {exc}')
+
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+        self.stdout.write(
+            f'users: {report["created"]} created in {report["seconds"]:.1f}s '
+            f'({report["users_per_second"]:.0f} users/s, {report["hash_wait_seconds"]:.1f}s waiting on hashes)'
+        )
+        self.stdout.write(
+            f'skipped: {len(report["existing"])} existing, {len(report["duplicates"])} repeated in file, '
+            f'{len(report["invalid"])} invalid'
+        )
+        for problem in report['invalid'][:20]:
+            self.stdout.write(f'  record {problem["index"]}: {json.dumps(problem["errors"])}')
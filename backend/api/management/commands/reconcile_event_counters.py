@@ -0,0 +1,105 @@
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+
+from api.cache import invalidate_events
+from api.counters import COUNTER_FIELDS, SUMMARY_FIELDS, compute_rating_summaries
+from api.models import Event, EventRatingSummary, RSVP, Review
+
+
+class Command(BaseCommand):
+    help = (
+        'Recompute the denormalized RSVP and review counters on Event and the rating '
+        'summaries, and repair any drift'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='Number of events to reconcile per transaction')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Report drifted events without writing')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        dry_run = options['dry_run']
+        checked = repaired = summaries_repaired = 0
+        last_id = 0
+
+        while True:
+            with transaction.atomic():
+                events = list(
+                    Event.objects.select_for_update()
+                    .filter(pk__gt=last_id)
+                    .order_by('pk')
+                    .only('pk', *COUNTER_FIELDS)[:batch_size]
+                )
+                if not events:
+                    break
+                last_id = events[-1].pk
+                ids = [event.pk for event in events]
+
+                rsvp_totals = {
+                    row['event_id']: row for row in
+                    RSVP.objects.filter(event_id__in=ids).order_by().values('event_id').annotate(
+                        going_count=Count('id', filter=Q(status='going')),
+                        maybe_count=Count('id', filter=Q(status='maybe')),
+                        not_going_count=Count('id', filter=Q(status='not_going')),
+                    )
+                }
+                review_totals = {
+                    row['event_id']: row for row in
+                    Review.objects.filter(event_id__in=ids).order_by().values('event_id').annotate(
+                        review_count=Count('id'),
+                        rating_sum=Sum('rating'),
+                    )
+                }
+
+                drifted = []
+                for event in events:
+                    expected = {field: 0 for field in COUNTER_FIELDS}
+                    expected.update({k: v for k, v in rsvp_totals.get(event.pk, {}).items() if k in expected})
+                    expected.update({k: v for k, v in review_totals.get(event.pk, {}).items() if k in expected})
+                    if any(getattr(event, field) != value for field, value in expected.items()):
+                        for field, value in expected.items():
+                            setattr(event, field, value)
+                        drifted.append(event)
+
+                if drifted and not dry_run:
+                    # Move updated_at and the fragment versions too, so cached
+                    # representations and conditional GETs see the repair
+                    now = timezone.now()
+                    for event in drifted:
+                        event.updated_at = now
+                    Event.objects.bulk_update(drifted, [*COUNTER_FIELDS, 'updated_at'])
+                    invalidate_events([event.pk for event in drifted])
+
+                stored = {
+                    summary.event_id: summary
+                    for summary in EventRatingSummary.objects.select_for_update().filter(event_id__in=ids)
+                }
+                drifted_summaries = [
+                    summary for summary in compute_rating_summaries(ids)
+                    if (summary.event_id in stored or summary.review_count)
+                    and any(getattr(summary, field) != getattr(stored.get(summary.event_id), field, None)
+                            for field in SUMMARY_FIELDS)
+                ]
+                if drifted_summaries and not dry_run:
+                    # MySQL's ON DUPLICATE KEY takes no conflict target
+                    EventRatingSummary.objects.bulk_create(
+                        drifted_summaries, update_conflicts=True,
+                        unique_fields=['event'] if connection.features.supports_update_conflicts_with_target else None,
+                        update_fields=SUMMARY_FIELDS + ['updated_at'],
+                    )
+
+            checked += len(events)
+            repaired += len(drifted)
+            summaries_repaired += len(drifted_summaries)
+            if options['verbosity'] > 1:
+                self.stdout.write(f'Checked up to event {last_id}: {len(drifted)} drifted')
+
+        verb = 'Found' if dry_run else 'Repaired'
+        self.stdout.write(self.style.SUCCESS(
+            f'Checked {checked} events. {verb} {repaired} with drifted counters '
+            f'and {summaries_repaired} with drifted rating summaries.'
+        ))
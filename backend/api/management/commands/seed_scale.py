@@ -0,0 +1,62 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.seeding import SEED_PASSWORD, seed_dataset
+
+
+class Command(BaseCommand):
+    help = (
+        'Deterministically generate users, profiles, events, invitations, RSVPs and reviews '
+        'at production scale with multi-row INSERTs'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100_000)
+        parser.add_argument('--events', type=int, default=1_000_000)
+        parser.add_argument('--private-ratio', type=float, default=0.2,
+                            help='Fraction of events that are private')
+        parser.add_argument('--invites-per-private', type=int, default=50,
+                            help='Mean invitees per private event (heavy-tailed)')
+        parser.add_argument('--rsvps-per-event', type=int, default=20,
+                            help='Mean RSVPs per event (heavy-tailed)')
+        parser.add_argument('--review-ratio', type=float, default=0.3,
+                            help='Share of attendees of past events who leave a review')
+        parser.add_argument('--days-past', type=int, default=365)
+        parser.add_argument('--days-future', type=int, default=180)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--prefix', default='seed',
+                            help='Username prefix and event title tag; must not be in use')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Rows per table per transaction')
+        parser.add_argument('--keep-constraints', action='store_true',
+                            help='Leave foreign key checks on while inserting')
+        parser.add_argument('--check-constraints', action='store_true',
+                            help='Verify foreign keys after loading')
+        parser.add_argument('--json', action='store_true', help='Emit the report as JSON')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be positive')
+        try:
+            report = seed_dataset(
+                users=options['users'], events=options['events'], private_ratio=options['private_ratio'],
+                invites_per_private=options['invites_per_private'], rsvps_per_event=options['rsvps_per_event'],
+                review_ratio=options['review_ratio'], days_past=options['days_past'],
+                days_future=options['days_future'], seed=options['seed'], batch_size=options['batch_size'],
+                prefix=options['prefix'], defer_constraints=not options['keep_constraints'],
+                check_constraints=options['check_constraints'],
+            )
+        except ValueError as exc:
+            raise CommandError(str(exc))
+
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+        for table, count in report.items():
+            if table.startswith(('api_', 'auth_')):
+                self.stdout.write(f'{table}: {count} rows')
+        self.stdout.write(
+            f'{report["rows"]} rows in {report["insert_seconds"]:.1f}s ({report["rows_per_second"]} rows/s), '
+            f'{report["seconds"]:.1f}s including the search index'
+        )
+        self.stdout.write(f'Users are {options["prefix"]}_user_<n> with password {SEED_PASSWORD!r}')
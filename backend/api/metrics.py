@@ -0,0 +1,276 @@
+"""
+Per-request cost accounting and Prometheus metrics.
+
+``RequestMetricsMiddleware`` collects, for each request, the number of SQL
+statements and time spent in the database, in serializers and in the JSON
+renderer, and reports them in a ``Server-Timing`` header. Phases overlap:
+queries run by a serializer count towards both ``db`` and ``serialize``.
+Serialization is timed once per response, where the view reads a top-level
+serializer's ``.data`` (``TimedSerializerMixin``) or builds the fast-path
+representations, not per row.
+
+The same SQL run ``REQUEST_METRICS_N_PLUS_ONE`` or more times in one request
+is logged as a likely N+1 pattern.
+
+Totals are aggregated per route into histograms kept in this process and
+served in the Prometheus text format by ``metrics_view`` (``/api/metrics/``).
+With several worker processes, scrape each one.
+"""
+import logging
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from ipaddress import ip_address, ip_network
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.http import HttpResponse, HttpResponseForbidden
+from rest_framework import serializers
+
+logger = logging.getLogger(__name__)
+
+_current = ContextVar('request_metrics', default=None)
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 200)
+PHASES = ('db', 'serialize', 'render')
+
+
+class RequestMetrics:
+    """What one request cost, filled in while it runs"""
+
+    def __init__(self):
+        self.queries = 0
+        self.seconds = dict.fromkeys(PHASES, 0.0)
+        self.statements = Counter()
+        self.active = set()
+
+    def repeated_statements(self, threshold):
+        return [(sql, count) for sql, count in self.statements.most_common() if count >= threshold]
+
+
+@contextmanager
+def timed(phase):
+    """Add the time spent in the block to ``phase`` of the current request, if any"""
+    metrics = _current.get()
+    # Nested calls (a serializer inside a serializer) are already being timed
+    if metrics is None or phase in metrics.active:
+        yield
+        return
+    metrics.active.add(phase)
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.seconds[phase] += time.perf_counter() - started
+        metrics.active.discard(phase)
+
+
+class TimedListSerializer(serializers.ListSerializer):
+    @property
+    def data(self):
+        with timed('serialize'):
+            return super().data
+
+
+class TimedSerializerMixin:
+    """
+    Serializer mixin adding ``.data`` to the ``serialize`` phase.
+
+    Views read ``.data`` once per response; rows and nested serializers go
+    through ``to_representation`` and are covered by that one measurement.
+    Set ``Meta.list_serializer_class = TimedListSerializer`` so ``many=True``
+    is timed the same way.
+    """
+
+    @property
+    def data(self):
+        with timed('serialize'):
+            return super().data
+
+
+def record_query(execute, sql, params, many, context):
+    """Connection execute wrapper; a no-op outside measured requests"""
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.seconds['db'] += time.perf_counter() - started
+        metrics.queries += 1
+        # Parameters are separate from the SQL, so this groups by query shape
+        metrics.statements[sql] += 1
+
+
+def instrument(connection, **kwargs):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Registry:
+    """Per-route aggregates, keyed by (route, method)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.durations = defaultdict(lambda: Histogram(DURATION_BUCKETS))
+            self.queries = defaultdict(lambda: Histogram(QUERY_BUCKETS))
+            self.phase_seconds = defaultdict(float)
+            self.n_plus_one = Counter()
+            self.responses = Counter()
+
+    def observe(self, route, method, status_code, duration, metrics, n_plus_one):
+        key = (route, method)
+        with self._lock:
+            self.durations[key].observe(duration)
+            self.queries[key].observe(metrics.queries)
+            for phase, seconds in metrics.seconds.items():
+                self.phase_seconds[key + (phase,)] += seconds
+            self.responses[key + (str(status_code),)] += 1
+            if n_plus_one:
+                self.n_plus_one[key] += 1
+
+    def exposition(self):
+        """The metrics in Prometheus text format 0.0.4"""
+        lines = []
+        with self._lock:
+            for name, help_text, histograms in (
+                ('api_request_duration_seconds', 'Time to produce the response', self.durations),
+                ('api_request_queries', 'SQL statements per request', self.queries),
+            ):
+                lines += [f'# HELP {name} {help_text}', f'# TYPE {name} histogram']
+                for (route, method), histogram in sorted(histograms.items()):
+                    labels = f'route="{escape(route)}",method="{method}"'
+                    for bound, count in zip(histogram.buckets, histogram.counts):
+                        lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {count}')
+                    lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {histogram.count}')
+                    lines.append(f'{name}_sum{{{labels}}} {histogram.sum}')
+                    lines.append(f'{name}_count{{{labels}}} {histogram.count}')
+
+            lines += ['# HELP api_request_phase_seconds_total Time spent per phase (phases overlap)',
+                      '# TYPE api_request_phase_seconds_total counter']
+            for (route, method, phase), seconds in sorted(self.phase_seconds.items()):
+                lines.append(f'api_request_phase_seconds_total{{route="{escape(route)}",method="{method}",'
+                             f'phase="{phase}"}} {seconds}')
+
+            lines += ['# HELP api_requests_total Responses by status code',
+                      '# TYPE api_requests_total counter']
+            for (route, method, code), count in sorted(self.responses.items()):
+                lines.append(f'api_requests_total{{route="{escape(route)}",method="{method}",'
+                             f'status="{code}"}} {count}')
+
+            lines += ['# HELP api_request_n_plus_one_total Requests that repeated one SQL statement',
+                      '# TYPE api_request_n_plus_one_total counter']
+            for (route, method), count in sorted(self.n_plus_one.items()):
+                lines.append(f'api_request_n_plus_one_total{{route="{escape(route)}",method="{method}"}} {count}')
+        return '\n'.join(lines) + '\n'
+
+
+def escape(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+registry = Registry()
+
+
+def route_name(request):
+    """The URL name the request resolved to, so ids do not split the series"""
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unmatched'
+    return match.view_name or match.route
+
+
+class RequestMetricsMiddleware:
+    """Measure each request, add ``Server-Timing`` and feed ``registry``"""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.threshold = getattr(settings, 'REQUEST_METRICS_N_PLUS_ONE', 5)
+        connection_created.connect(instrument, dispatch_uid='api.metrics.instrument')
+        # Stay async under ASGI so the async views do not get pushed onto a thread
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        metrics, token, started = self.start()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, metrics, started)
+
+    async def __acall__(self, request):
+        metrics, token, started = self.start()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, metrics, started)
+
+    def start(self):
+        # Connections opened before the middleware was loaded
+        for connection in connections.all(initialized_only=True):
+            instrument(connection)
+        metrics = RequestMetrics()
+        return metrics, _current.set(metrics), time.perf_counter()
+
+    def finish(self, request, response, metrics, started):
+        duration = time.perf_counter() - started
+        route = route_name(request)
+        if route == 'metrics':
+            return response
+        repeated = metrics.repeated_statements(self.threshold)
+        for sql, count in repeated:
+            logger.warning('Possible N+1 on %s %s: %d x %s', request.method, route, count, sql[:200])
+        registry.observe(route, request.method, response.status_code, duration, metrics, bool(repeated))
+
+        timings = [f'{phase};dur={metrics.seconds[phase] * 1000:.1f}' for phase in PHASES]
+        timings[0] += f';desc="{metrics.queries} queries"'
+        timings.append(f'total;dur={duration * 1000:.1f}')
+        response['Server-Timing'] = ', '.join(timings)
+        return response
+
+
+def client_allowed(request):
+    try:
+        address = ip_address(request.META.get('REMOTE_ADDR', ''))
+    except ValueError:
+        return False
+    return any(address in ip_network(network)
+               for network in getattr(settings, 'METRICS_ALLOWED_IPS', ['127.0.0.1', '::1']))
+
+
+def metrics_view(request):
+    """Prometheus scrape endpoint, limited to METRICS_ALLOWED_IPS"""
+    if not client_allowed(request):
+        return HttpResponseForbidden()
+    return HttpResponse(registry.exposition(), content_type='text/plain; version=0.0.4; charset=utf-8')
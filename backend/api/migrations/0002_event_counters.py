@@ -0,0 +1,63 @@
+# Generated by Django 5.2.6 on 2026-10-17 01:05
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+
+def populate_counters(apps, schema_editor):
+    Event = apps.get_model('api', 'Event')
+    RSVP = apps.get_model('api', 'RSVP')
+    Review = apps.get_model('api', 'Review')
+
+    def rsvp_count(status):
+        return Coalesce(Subquery(
+            RSVP.objects.filter(event=OuterRef('pk'), status=status).order_by()
+            .values('event').annotate(n=Count('id')).values('n'),
+            output_field=IntegerField(),
+        ), 0)
+
+    reviews = Review.objects.filter(event=OuterRef('pk')).order_by().values('event')
+    Event.objects.update(
+        going_count=rsvp_count('going'),
+        maybe_count=rsvp_count('maybe'),
+        not_going_count=rsvp_count('not_going'),
+        review_count=Coalesce(Subquery(reviews.annotate(n=Count('id')).values('n'), output_field=IntegerField()), 0),
+        rating_sum=Coalesce(Subquery(reviews.annotate(s=Sum('rating')).values('s'), output_field=IntegerField()), 0),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='going_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='maybe_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='not_going_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='rating_sum',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='review_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(populate_counters, migrations.RunPython.noop),
+    ]
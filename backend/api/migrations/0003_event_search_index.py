@@ -0,0 +1,37 @@
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'mysql':
+        schema_editor.execute(
+            'ALTER TABLE api_event ADD FULLTEXT INDEX idx_event_fulltext (title, description, location)'
+        )
+    elif vendor == 'sqlite':
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS api_event_fts "
+            "USING fts5(title, description, location, tokenize='unicode61')"
+        )
+        schema_editor.execute(
+            'INSERT INTO api_event_fts (rowid, title, description, location) '
+            'SELECT id, title, description, location FROM api_event'
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'mysql':
+        schema_editor.execute('ALTER TABLE api_event DROP INDEX idx_event_fulltext')
+    elif vendor == 'sqlite':
+        schema_editor.execute('DROP TABLE IF EXISTS api_event_fts')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0002_event_counters'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 5.2.6 on 2026-10-17 01:10
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0003_event_search_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['start_time'], name='idx_event_start_time'),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['is_public', 'start_time'], name='idx_event_public_start'),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['organizer', 'start_time'], name='idx_event_organizer_start'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['event', 'rating'], name='idx_review_event_rating'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['event', 'created_at'], name='idx_review_event_created'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['created_at'], name='idx_review_created'),
+        ),
+        migrations.AddIndex(
+            model_name='rsvp',
+            index=models.Index(fields=['event', 'status'], name='idx_rsvp_event_status'),
+        ),
+        migrations.AddIndex(
+            model_name='rsvp',
+            index=models.Index(fields=['event', 'created_at'], name='idx_rsvp_event_created'),
+        ),
+        migrations.AddIndex(
+            model_name='rsvp',
+            index=models.Index(fields=['user', 'created_at'], name='idx_rsvp_user_created'),
+        ),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 5.2.6 on 2026-10-17 02:08
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+RECENT_SIZE = 10
+
+
+def populate_summaries(apps, schema_editor):
+    Review = apps.get_model('api', 'Review')
+    EventRatingSummary = apps.get_model('api', 'EventRatingSummary')
+
+    # Reviews arrive grouped by event, so each summary is complete when the next starts
+    pending, summary = [], None
+    reviews = Review.objects.order_by('event_id', '-created_at', '-id').values_list('event_id', 'id', 'rating')
+    for event_id, review_id, rating in reviews.iterator(chunk_size=5000):
+        if summary is None or summary.event_id != event_id:
+            if len(pending) >= 1000:
+                EventRatingSummary.objects.bulk_create(pending)
+                pending = []
+            summary = EventRatingSummary(event_id=event_id, recent_review_ids=[])
+            pending.append(summary)
+        setattr(summary, f'stars_{rating}', getattr(summary, f'stars_{rating}') + 1)
+        summary.review_count += 1
+        summary.rating_sum += rating
+        if len(summary.recent_review_ids) < RECENT_SIZE:
+            summary.recent_review_ids.append(review_id)
+    EventRatingSummary.objects.bulk_create(pending)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0004_composite_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventRatingSummary',
+            fields=[
+                ('event', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='rating_summary', serialize=False, to='api.event')),
+                ('stars_1', models.IntegerField(default=0)),
+                ('stars_2', models.IntegerField(default=0)),
+                ('stars_3', models.IntegerField(default=0)),
+                ('stars_4', models.IntegerField(default=0)),
+                ('stars_5', models.IntegerField(default=0)),
+                ('review_count', models.IntegerField(default=0)),
+                ('rating_sum', models.IntegerField(default=0)),
+                ('recent_review_ids', models.JSONField(blank=True, default=list)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Event Rating Summary',
+                'verbose_name_plural': 'Event Rating Summaries',
+            },
+        ),
+        migrations.RunPython(populate_summaries, migrations.RunPython.noop),
+    ]
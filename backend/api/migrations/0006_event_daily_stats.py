@@ -0,0 +1,37 @@
+# Generated by Django 5.2.6 on 2026-10-17 02:14
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0005_event_rating_summary'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('going', models.IntegerField(default=0)),
+                ('maybe', models.IntegerField(default=0)),
+                ('not_going', models.IntegerField(default=0)),
+                ('reviews_written', models.IntegerField(default=0)),
+                ('review_count', models.IntegerField(default=0)),
+                ('rating_sum', models.IntegerField(default=0)),
+                ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to='api.event')),
+                ('organizer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_event_stats', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Event Daily Stats',
+                'verbose_name_plural': 'Event Daily Stats',
+                'indexes': [models.Index(fields=['organizer', 'day'], name='idx_dailystats_organizer_day')],
+                'unique_together': {('event', 'day')},
+            },
+        ),
+    ]
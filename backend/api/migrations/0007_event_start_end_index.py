@@ -0,0 +1,23 @@
+# Generated by Django 5.2.6 on 2026-10-17 02:22
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0006_event_daily_stats'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='event',
+            name='idx_event_start_time',
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['start_time', 'end_time'], name='idx_event_start_end'),
+        ),
+    ]
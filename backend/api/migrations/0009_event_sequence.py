@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-17 03:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0008_event_recurrence'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='sequence',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.6 on 2026-10-17 03:06
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0009_event_sequence'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['end_time', 'start_time'], name='idx_event_end_start'),
+        ),
+    ]
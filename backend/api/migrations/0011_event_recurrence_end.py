@@ -0,0 +1,31 @@
+# Generated by Django 5.2.6 on 2026-10-17 03:08
+
+from django.db import migrations, models
+from django.db.models import Q
+
+
+def populate_recurrence_end(apps, schema_editor):
+    from api.recurrence import last_occurrence_end
+
+    Event = apps.get_model('api', 'Event')
+    bounded = Event.objects.exclude(recurrence_frequency='').filter(
+        Q(recurrence_until__isnull=False) | Q(recurrence_count__isnull=False)
+    )
+    for event in bounded.iterator():
+        Event.objects.filter(pk=event.pk).update(recurrence_end=last_occurrence_end(event))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0010_event_end_start_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='recurrence_end',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(populate_recurrence_end, migrations.RunPython.noop),
+    ]
@@ -21,6 +21,77 @@ class UserProfile(models.Model):
         verbose_name_plural = "User Profiles"
 
 
+def average_rating(rating_sum, review_count):
+    """Mean rating from the denormalized counters, rounded for display"""
+    if review_count:
+        return round(rating_sum / review_count, 2)
+    return None
+
+
+class EventQuerySet(models.QuerySet):
+    """Query helpers shared by the event endpoints"""
+
+    def visible_to(self, user):
+        """
+        Restrict to events the user may see:
+        - All public events
+        - Private events where user is organizer or invited
+
+        One filter, for querysets that are filtered further or read whole.
+        Pages of the event list are read through visible_branches() instead.
+        """
+        branches = self.visible_branches(user)
+        if len(branches) == 1:
+            return branches[0]
+        return self.filter(models.Q(is_public=True) | self._private_visibility(user))
+
+    def visible_branches(self, user):
+        """
+        visible_to() as disjoint querysets, each served by an index:
+        - public events, by idx_event_public_start
+        - private events the user organizes or is invited to, by
+          idx_event_organizer_start and the primary key
+
+        The OR of visible_to() spans is_public, organizer_id and the event id,
+        which no single index covers, so its pages and counts walk the table.
+        Each branch here reads its first rows in start_time order straight
+        from an index; api.pagination.MergedQuerysets merges them into pages.
+
+        Invitations come from the user's cached access list (see api.acl);
+        users with very many invitations fall back to a correlated EXISTS.
+        Neither needs a join or DISTINCT, so no row is read twice.
+        """
+        if user.is_authenticated and user.is_staff:
+            return [self.all()]
+        if not user.is_authenticated:
+            return [self.filter(is_public=True)]
+        return [
+            self.filter(is_public=True),
+            self.filter(models.Q(is_public=False) & self._private_visibility(user)),
+        ]
+
+    def _private_visibility(self, user):
+        """The events the user organizes or is invited to"""
+        from .acl import INLINE_ID_LIMIT, invited_event_ids
+
+        invited_ids = invited_event_ids(user)
+        if len(invited_ids) <= INLINE_ID_LIMIT:
+            invited = models.Q(pk__in=sorted(invited_ids))
+        else:
+            invited = models.Exists(Event.invited_users.through.objects.filter(
+                event_id=models.OuterRef('pk'), user_id=user.pk
+            ))
+        return models.Q(organizer_id=user.pk) | invited
+
+    def with_user_rsvp_status(self, user):
+        """Annotate each event with the given user's RSVP status (or None)"""
+        return self.annotate(
+            user_rsvp_status=models.Subquery(
+                RSVP.objects.filter(event=models.OuterRef('pk'), user=user).values('status')[:1]
+            )
+        )
+
+
 class Event(models.Model):
     """Event model for managing events"""
     title = models.CharField(max_length=255)
@@ -34,13 +105,69 @@ class Event(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     invited_users = models.ManyToManyField(User, related_name='invited_events', blank=True)
 
+    # Recurrence rule; occurrences are expanded on demand by api.recurrence
+    RECURRENCE_CHOICES = [
+        ('daily', 'Daily'),
+        ('weekly', 'Weekly'),
+        ('monthly', 'Monthly'),
+    ]
+    recurrence_frequency = models.CharField(max_length=10, choices=RECURRENCE_CHOICES, blank=True, default='')
+    recurrence_interval = models.PositiveSmallIntegerField(default=1)
+    recurrence_until = models.DateTimeField(null=True, blank=True, help_text="Last possible occurrence start")
+    recurrence_count = models.PositiveIntegerField(null=True, blank=True, help_text="Number of occurrences")
+    # Set on the stored (overridden or RSVP'd) occurrences of a series
+    series = models.ForeignKey('self', on_delete=models.CASCADE, null=True, blank=True, related_name='occurrences')
+    original_start = models.DateTimeField(null=True, blank=True)
+    # End of the last occurrence, kept by save(); null while the series is unbounded
+    recurrence_end = models.DateTimeField(null=True, blank=True, editable=False)
+    # iCalendar SEQUENCE: bumped by EventViewSet when a calendar field changes
+    sequence = models.PositiveIntegerField(default=0, editable=False)
+
+    # Denormalized counters, maintained by api.counters alongside RSVP/Review writes
+    going_count = models.IntegerField(default=0, editable=False)
+    maybe_count = models.IntegerField(default=0, editable=False)
+    not_going_count = models.IntegerField(default=0, editable=False)
+    review_count = models.IntegerField(default=0, editable=False)
+    rating_sum = models.IntegerField(default=0, editable=False)
+
+    objects = EventQuerySet.as_manager()
+
     def __str__(self):
         return self.title
 
+    @property
+    def average_rating(self):
+        return average_rating(self.rating_sum, self.review_count)
+
+    @property
+    def is_recurring(self):
+        return bool(self.recurrence_frequency)
+
+    def save(self, *args, **kwargs):
+        from .recurrence import RULE_FIELDS, last_occurrence_end
+
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or set(update_fields) & {*RULE_FIELDS, 'end_time'}:
+            self.recurrence_end = last_occurrence_end(self)
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'recurrence_end'}
+        super().save(*args, **kwargs)
+
     class Meta:
         verbose_name = "Event"
         verbose_name_plural = "Events"
         ordering = ['-start_time']
+        indexes = [
+            # Also serves start_time-only lookups and start_time < until ranges (api.scheduling)
+            models.Index(fields=['start_time', 'end_time'], name='idx_event_start_end'),
+            # Events still running after an instant (api.scheduling windows)
+            models.Index(fields=['end_time', 'start_time'], name='idx_event_end_start'),
+            models.Index(fields=['is_public', 'start_time'], name='idx_event_public_start'),
+            models.Index(fields=['organizer', 'start_time'], name='idx_event_organizer_start'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['series', 'original_start'], name='uniq_event_series_occurrence'),
+        ]
 
 
 class RSVP(models.Model):
@@ -62,6 +189,11 @@ class RSVP(models.Model):
         verbose_name_plural = "RSVPs"
         unique_together = ['event', 'user']
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['event', 'status'], name='idx_rsvp_event_status'),
+            models.Index(fields=['event', 'created_at'], name='idx_rsvp_event_created'),
+            models.Index(fields=['user', 'created_at'], name='idx_rsvp_user_created'),
+        ]
 
     def __str__(self):
         return f"{self.user.username} - {self.event.title} ({self.status})"
@@ -84,6 +216,77 @@ class Review(models.Model):
         verbose_name_plural = "Reviews"
         unique_together = ['event', 'user']
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['event', 'rating'], name='idx_review_event_rating'),
+            models.Index(fields=['event', 'created_at'], name='idx_review_event_created'),
+            models.Index(fields=['created_at'], name='idx_review_created'),
+        ]
 
     def __str__(self):
         return f"{self.user.username} - {self.event.title} ({self.rating}/5)"
+
+
+class EventRatingSummary(models.Model):
+    """
+    Rating histogram and most recent review ids of one event, maintained by
+    api.counters in the same transaction as review writes, so rating widgets
+    read one row however many reviews there are.
+    """
+    RECENT_SIZE = 10
+
+    event = models.OneToOneField(Event, on_delete=models.CASCADE, primary_key=True, related_name='rating_summary')
+    stars_1 = models.IntegerField(default=0)
+    stars_2 = models.IntegerField(default=0)
+    stars_3 = models.IntegerField(default=0)
+    stars_4 = models.IntegerField(default=0)
+    stars_5 = models.IntegerField(default=0)
+    review_count = models.IntegerField(default=0)
+    rating_sum = models.IntegerField(default=0)
+    # Newest first, at most RECENT_SIZE
+    recent_review_ids = models.JSONField(default=list, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Event Rating Summary"
+        verbose_name_plural = "Event Rating Summaries"
+
+    def __str__(self):
+        return f"{self.event_id}: {self.review_count} reviews"
+
+    @property
+    def histogram(self):
+        return {rating: getattr(self, f'stars_{rating}') for rating in range(1, 6)}
+
+    @property
+    def average_rating(self):
+        return average_rating(self.rating_sum, self.review_count)
+
+
+class EventDailyStats(models.Model):
+    """
+    Per-day rollup of RSVP and review activity for one event, maintained by
+    api.rollups alongside the writes. Status and review columns hold the net
+    change on that day, so summing them over every day gives the current
+    totals; ``reviews_written`` counts new reviews only.
+    """
+    # Denormalized from the event so organizer dashboards never join
+    organizer = models.ForeignKey(User, on_delete=models.CASCADE, related_name='daily_event_stats')
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name='daily_stats')
+    day = models.DateField()
+    going = models.IntegerField(default=0)
+    maybe = models.IntegerField(default=0)
+    not_going = models.IntegerField(default=0)
+    reviews_written = models.IntegerField(default=0)
+    review_count = models.IntegerField(default=0)
+    rating_sum = models.IntegerField(default=0)
+
+    class Meta:
+        verbose_name = "Event Daily Stats"
+        verbose_name_plural = "Event Daily Stats"
+        unique_together = ['event', 'day']
+        indexes = [
+            models.Index(fields=['organizer', 'day'], name='idx_dailystats_organizer_day'),
+        ]
+
+    def __str__(self):
+        return f"{self.event_id} on {self.day}"
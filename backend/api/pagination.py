@@ -0,0 +1,299 @@
+import base64
+import heapq
+import json
+from collections import deque
+from functools import cmp_to_key
+from itertools import islice
+
+from django.core.paginator import InvalidPage
+from django.db.models import F, Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination keyed on a unique ordering such as (start_time, id).
+
+    Each page is fetched with a range condition on the key instead of an
+    OFFSET, so deep pages cost the same as the first one. No COUNT is run.
+    """
+    cursor_query_param = 'cursor'
+    page_size = 10
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    ordering = ('-created_at', '-id')
+    invalid_cursor_message = 'Invalid cursor'
+
+    def __init__(self, ordering=None, page_size=None):
+        if ordering is not None:
+            self.ordering = tuple(ordering)
+        if page_size is not None:
+            self.page_size = page_size
+
+    def paginate_queryset(self, queryset, request, view=None):
+        page_queryset = self.page_queryset(queryset, request)
+        return self.set_page(list(page_queryset))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """Async twin of paginate_queryset, fetching the page with aiterator()"""
+        page_queryset = self.page_queryset(queryset, request)
+        return self.set_page([obj async for obj in page_queryset.aiterator(chunk_size=self.page_size + 1)])
+
+    def page_queryset(self, queryset, request):
+        """The (unevaluated) query for the requested page, plus one lookahead row"""
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        position, reverse = self.decode_cursor(request, queryset.model)
+        self.position, self.reverse = position, reverse
+
+        ordering = [self.invert(field) for field in self.ordering] if reverse else list(self.ordering)
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            queryset = queryset.filter(self.keyset_filter(ordering, position))
+        return queryset[:self.page_size + 1]
+
+    def paginate_merged(self, queryset, extra, request):
+        """
+        Page over ``queryset`` merged with ``extra``: unsaved instances already
+        sorted by ``ordering``, which must be ascending. Only as much of
+        ``extra`` is consumed as the page needs, plus everything before the
+        cursor.
+        """
+        rows = list(self.page_queryset(queryset, request))
+        position, limit = self.position, self.page_size + 1
+        key = self.sort_key
+        if position is None:
+            extra = islice(extra, limit)
+        elif not self.reverse:
+            position = tuple(position)
+            extra = islice((item for item in extra if key(item) > position), limit)
+        else:
+            position = tuple(position)
+            before = deque(maxlen=limit)
+            for item in extra:
+                if key(item) >= position:
+                    break
+                before.append(item)
+            extra = reversed(before)
+        merged = heapq.merge(rows, extra, key=key, reverse=self.reverse)
+        return self.set_page(list(islice(merged, limit)))
+
+    def sort_key(self, instance):
+        return tuple(getattr(instance, field) for field in self.ordering)
+
+    def set_page(self, results):
+        """Drop the lookahead row and record which links the page gets"""
+        position, reverse = self.position, self.reverse
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+        if reverse:
+            results.reverse()
+
+        self.page = results
+        self.has_next = has_more if not reverse else position is not None
+        self.has_previous = has_more if reverse else position is not None
+        return results
+
+    def get_page_size(self, request):
+        if self.page_size_query_param:
+            try:
+                size = int(request.query_params[self.page_size_query_param])
+                if size > 0:
+                    return min(size, self.max_page_size)
+            except (KeyError, ValueError):
+                pass
+        return self.page_size
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    @staticmethod
+    def invert(field):
+        return field[1:] if field.startswith('-') else f'-{field}'
+
+    @staticmethod
+    def keyset_filter(ordering, position):
+        """Rows strictly after ``position`` in ``ordering``, as a row-value comparison"""
+        condition = Q()
+        for i, field in enumerate(ordering):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            step = Q(**{f'{name}__{lookup}': position[i]})
+            for prev_field, prev_value in zip(ordering[:i], position[:i]):
+                step &= Q(**{prev_field.lstrip('-'): prev_value})
+            condition |= step
+        return condition
+
+    def encode_cursor(self, instance, reverse):
+        position = []
+        for field in self.ordering:
+            name = field.lstrip('-')
+            # Pages may hold model instances or values() dicts
+            value = instance[name] if isinstance(instance, dict) else getattr(instance, name)
+            position.append(value.isoformat() if hasattr(value, 'isoformat') else value)
+        payload = json.dumps({'p': position, 'r': int(reverse)}, separators=(',', ':'))
+        token = base64.urlsafe_b64encode(payload.encode()).decode()
+        return replace_query_param(self.base_url, self.cursor_query_param, token)
+
+    def decode_cursor(self, request, model):
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None, False
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(token.encode()))
+            values = payload['p']
+            if len(values) != len(self.ordering):
+                raise ValueError
+            position = [
+                model._meta.get_field(field.lstrip('-')).to_python(value)
+                for field, value in zip(self.ordering, values)
+            ]
+            return position, bool(payload.get('r'))
+        except Exception:
+            raise NotFound(self.invalid_cursor_message)
+
+
+class MergedQuerysets:
+    """
+    Disjoint querysets read as one ordered list, for Django's Paginator.
+
+    A page asks each queryset for its first rows in ``ordering`` (an index
+    range scan with a LIMIT where an index matches) and merges them, so no
+    query has to test an OR across the querysets row by row. The count is the
+    sum of their counts.
+    """
+    ordered = True
+
+    def __init__(self, querysets):
+        ordering = list(querysets[0].query.order_by or querysets[0].model._meta.ordering)
+        if not {'pk', 'id', '-pk', '-id'} & set(ordering):
+            # Ties must break the same way for every LIMIT, or rows repeat across pages
+            ordering.append('-pk' if ordering and ordering[0].startswith('-') else 'pk')
+        self.descending = [field.startswith('-') for field in ordering]
+        self.querysets = [
+            queryset.order_by(*ordering).annotate(**{
+                f'merge_key_{index}': F(field.lstrip('-')) for index, field in enumerate(ordering)
+            })
+            for queryset in querysets
+        ]
+
+    def count(self):
+        return sum(queryset.count() for queryset in self.querysets)
+
+    def __len__(self):
+        return self.count()
+
+    def __iter__(self):
+        return iter(self[:])
+
+    def __getitem__(self, key):
+        if not isinstance(key, slice):
+            return self[key:key + 1][0]
+        start, stop = key.start or 0, key.stop
+        rows = [list(queryset[:stop]) for queryset in self.querysets]
+        merged = heapq.merge(*rows, key=cmp_to_key(self.compare))
+        return list(islice(merged, start, stop))
+
+    def compare(self, a, b):
+        for index, descending in enumerate(self.descending):
+            x, y = getattr(a, f'merge_key_{index}'), getattr(b, f'merge_key_{index}')
+            if x != y:
+                return (x < y) - (x > y) if descending else (x > y) - (x < y)
+        return 0
+
+
+class StandardResultsSetPagination(PageNumberPagination):
+    """
+    Page-number pagination, with keyset pagination on request.
+
+    Clients opt into cursors with ``?pagination=cursor`` (or by following a
+    ``cursor`` link); the cursor mode always orders by ``keyset_ordering``.
+    """
+    page_size = 10
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    pagination_query_param = 'pagination'
+    keyset_ordering = ('-created_at', '-id')
+
+    def use_keyset(self, request):
+        return (
+            request.query_params.get(self.pagination_query_param) == 'cursor'
+            or KeysetPagination.cursor_query_param in request.query_params
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = None
+        if self.use_keyset(request):
+            self.keyset = KeysetPagination(ordering=self.keyset_ordering, page_size=self.page_size)
+            return self.keyset.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """Async twin of paginate_queryset; the queries run through acount()/aiterator()"""
+        self.keyset = None
+        if self.use_keyset(request):
+            self.keyset = KeysetPagination(ordering=self.keyset_ordering, page_size=self.page_size)
+            return await self.keyset.apaginate_queryset(queryset, request, view)
+
+        self.request = request
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+        paginator = self.django_paginator_class(queryset, page_size)
+        # Prime the paginator's cached count so it never calls count() itself
+        paginator.count = await queryset.acount()
+        page_number = self.get_page_number(request, paginator)
+        try:
+            self.page = paginator.page(page_number)
+        except InvalidPage as exc:
+            raise NotFound(self.invalid_page_message.format(page_number=page_number, message=str(exc)))
+        self.page.object_list = [obj async for obj in self.page.object_list.aiterator(chunk_size=page_size)]
+        return list(self.page)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def get_next_link(self):
+        if getattr(self, 'keyset', None) is not None:
+            return self.keyset.get_next_link()
+        return super().get_next_link()
+
+    def get_previous_link(self):
+        if getattr(self, 'keyset', None) is not None:
+            return self.keyset.get_previous_link()
+        return super().get_previous_link()
+
+
+class EventResultsSetPagination(StandardResultsSetPagination):
+    keyset_ordering = ('-start_time', '-id')
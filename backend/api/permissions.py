@@ -1,5 +1,7 @@
 from rest_framework import permissions
 
+from .acl import can_view
+
 
 class IsOrganizerOrReadOnly(permissions.BasePermission):
     """
@@ -12,7 +14,7 @@ class IsOrganizerOrReadOnly(permissions.BasePermission):
             return True
 
         # Write permissions are only allowed to the organizer
-        return obj.organizer == request.user
+        return obj.organizer_id == request.user.pk
 
 
 class IsInvitedToPrivateEvent(permissions.BasePermission):
@@ -29,23 +31,8 @@ class IsInvitedToPrivateEvent(permissions.BasePermission):
         return request.user and request.user.is_authenticated
 
     def has_object_permission(self, request, view, obj):
-        # If event is public, allow access
-        if obj.is_public:
-            return True
-
-        # If user is not authenticated, deny access to private events
-        if not request.user.is_authenticated:
-            return False
-
-        # Allow access if user is the organizer
-        if obj.organizer == request.user:
-            return True
-
-        # Allow access if user is invited
-        if request.user in obj.invited_users.all():
-            return True
-
-        return False
+        # Public events, organizers and invitees (via the cached access list)
+        return can_view(request.user, obj)
 
 
 class IsOwnerOrReadOnly(permissions.BasePermission):
@@ -59,4 +46,4 @@ class IsOwnerOrReadOnly(permissions.BasePermission):
             return True
 
         # Write permissions are only allowed to the owner
-        return obj.user == request.user
+        return obj.user_id == request.user.pk
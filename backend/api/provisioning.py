@@ -0,0 +1,172 @@
+"""
+Bulk creation of users with their profiles.
+
+Passwords are hashed in a process pool (PBKDF2 is CPU-bound and holds the
+GIL), one batch ahead of the inserts, and each batch of users and profiles is
+written with a pair of ``bulk_create`` calls in one transaction. Usernames
+and emails that already exist are skipped using one lookup per batch.
+"""
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Q
+
+from .models import UserProfile
+from .serializers import ProvisionUserSerializer
+
+PROFILE_FIELDS = ('full_name', 'bio', 'location')
+
+
+class InlineExecutor:
+    """Executor stand-in that runs ``map`` in the calling process"""
+
+    def map(self, fn, *iterables, chunksize=1):
+        return map(fn, *iterables)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+def hash_executor(workers=None, mp_context=None):
+    """A process pool for hashing, or an in-process executor for ``workers`` <= 1"""
+    if workers is not None and workers <= 1:
+        return InlineExecutor()
+    return ProcessPoolExecutor(max_workers=workers, mp_context=mp_context)
+
+
+def validate_records(records, report):
+    """Yield (index, validated data) for valid, first-seen records; tally the rest"""
+    seen_usernames, seen_emails = set(), set()
+    for index, record in enumerate(records):
+        serializer = ProvisionUserSerializer(data=record)
+        if not serializer.is_valid():
+            report['invalid'].append({'index': index, 'errors': serializer.errors})
+            continue
+        data = serializer.validated_data
+        email = data.get('email', '')
+        if data['username'] in seen_usernames or (email and email in seen_emails):
+            report['duplicates'].append(data['username'])
+            continue
+        seen_usernames.add(data['username'])
+        if email:
+            seen_emails.add(email)
+        yield index, data
+
+
+def batches(iterable, size):
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def drop_existing(batch, report):
+    """Remove records whose username or email is taken, with one query"""
+    usernames = [data['username'] for _, data in batch]
+    emails = [data['email'] for _, data in batch if data.get('email')]
+    taken_usernames, taken_emails = set(), set()
+    for username, email in User.objects.filter(
+        Q(username__in=usernames) | Q(email__in=emails)
+    ).values_list('username', 'email'):
+        taken_usernames.add(username)
+        taken_emails.add(email)
+    kept = []
+    for index, data in batch:
+        if data['username'] in taken_usernames or (data.get('email') and data['email'] in taken_emails):
+            report['existing'].append(data['username'])
+        else:
+            kept.append((index, data))
+    return kept
+
+
+def insert_batch(batch, hashes):
+    """Write one batch of users and their profiles; returns the users created"""
+    users = [
+        User(
+            username=data['username'],
+            email=data.get('email', ''),
+            first_name=data.get('first_name', ''),
+            last_name=data.get('last_name', ''),
+            password=password_hash,
+        )
+        for (_, data), password_hash in zip(batch, hashes)
+    ]
+    with transaction.atomic():
+        User.objects.bulk_create(users)
+        if not connection.features.can_return_rows_from_bulk_insert:
+            # MySQL does not report the new primary keys
+            ids = dict(User.objects.filter(username__in=[u.username for u in users]).values_list('username', 'id'))
+            for user in users:
+                user.pk = ids[user.username]
+        UserProfile.objects.bulk_create([
+            UserProfile(user_id=user.pk, **{field: data.get(field) or '' for field in PROFILE_FIELDS})
+            for user, (_, data) in zip(users, batch)
+        ])
+    return users
+
+
+def provision_users(records, batch_size=1000, workers=None, mp_context=None):
+    """
+    Create users and profiles from dicts shaped like the register payload
+    (``username``, ``email``, ``password``, ``first_name``, ``last_name``,
+    ``full_name``, ``bio``, ``location``; no ``password2``). Records without a
+    password get an unusable one.
+
+    Returns a report with the created count, skipped and invalid records and
+    timings; ``hash_wait_seconds`` is time spent waiting on the pool after
+    the previous batch was written, i.e. hashing that was not overlapped.
+    """
+    report = {'created': 0, 'existing': [], 'duplicates': [], 'invalid': [],
+              'hash_wait_seconds': 0.0, 'insert_seconds': 0.0}
+    started = time.perf_counter()
+
+    with hash_executor(workers, mp_context) as executor:
+        def submit(batch):
+            passwords = [data.get('password') or None for _, data in batch]
+            return executor.map(make_password, passwords, chunksize=max(1, len(passwords) // 32))
+
+        pending = None
+        for batch in batches(validate_records(records, report), batch_size):
+            batch = drop_existing(batch, report)
+            if not batch:
+                continue
+            # Hash this batch while the previous one is inserted
+            hashes = submit(batch)
+            if pending is not None:
+                provision_batch(*pending, report)
+            pending = (batch, hashes)
+        if pending is not None:
+            provision_batch(*pending, report)
+
+    report['seconds'] = round(time.perf_counter() - started, 3)
+    report['users_per_second'] = round(report['created'] / max(report['seconds'], 1e-9), 1)
+    report['hash_wait_seconds'] = round(report['hash_wait_seconds'], 3)
+    report['insert_seconds'] = round(report['insert_seconds'], 3)
+    return report
+
+
+def provision_batch(batch, hashes, report):
+    """Collect a batch's hashes and insert it, rechecking once on a conflict"""
+    waited = time.perf_counter()
+    hashes = list(hashes)
+    inserting = time.perf_counter()
+    report['hash_wait_seconds'] += inserting - waited
+    try:
+        created = insert_batch(batch, hashes)
+    except IntegrityError:
+        # Someone registered one of these names since the lookup; check again
+        batch_hashes = dict(zip((index for index, _ in batch), hashes))
+        batch = drop_existing(batch, report)
+        created = insert_batch(batch, [batch_hashes[index] for index, _ in batch]) if batch else []
+    report['insert_seconds'] += time.perf_counter() - inserting
+    report['created'] += len(created)
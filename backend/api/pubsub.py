@@ -0,0 +1,315 @@
+"""
+Publish/subscribe bus for live event updates.
+
+Writers publish small JSON-able messages from sync code on any thread;
+async subscribers (the SSE stream views) read them from a bounded queue.
+The broker is chosen with ``EVENT_PUBSUB_BACKEND`` (a dotted path) and
+``EVENT_PUBSUB_OPTIONS``:
+
+- ``LocalBroker`` (default) delivers within the current process only.
+- ``FileBroker`` appends messages to a shared, size-bounded spool file that
+  every subscribing worker process tails, a stand-in for a real bus when
+  running several workers. It only writes for channels some process has a
+  live subscriber on.
+
+Stream URLs are opened by ``EventSource``, which cannot send headers, so
+signed-in clients authenticate with a signed stream token bound to one user
+and one event that expires after ``EVENT_STREAM_TOKEN_MAX_AGE`` seconds.
+"""
+import asyncio
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from urllib.parse import quote, unquote
+
+from django.conf import settings
+from django.core import signing
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+from .models import Event, average_rating
+
+
+STREAM_TOKEN_SALT = 'api.pubsub.stream'
+
+
+def make_stream_token(user, event_id):
+    return signing.dumps({'u': user.pk, 'e': event_id}, salt=STREAM_TOKEN_SALT, compress=True)
+
+
+def stream_token_user_id(token, event_id):
+    """The id of the user a live stream token for ``event_id`` was issued to, or None"""
+    try:
+        payload = signing.loads(token, salt=STREAM_TOKEN_SALT,
+                                max_age=getattr(settings, 'EVENT_STREAM_TOKEN_MAX_AGE', 60))
+    except signing.BadSignature:
+        return None
+    if not isinstance(payload, dict) or payload.get('e') != event_id:
+        return None
+    return payload.get('u')
+
+
+class Subscription:
+    """One subscriber's queue, bound to the event loop that created it"""
+
+    def __init__(self, broker, channel, maxsize):
+        self.broker = broker
+        self.channel = channel
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize)
+
+    def deliver(self, message):
+        # Runs on the subscriber's loop. A client that falls behind loses the
+        # oldest messages; each one carries absolute values, not increments.
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(message)
+
+    async def get(self):
+        return await self.queue.get()
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class LocalBroker:
+    """Fan-out to subscribers in this process"""
+
+    def __init__(self, queue_size=100):
+        self.queue_size = queue_size
+        self._lock = threading.Lock()
+        self._subscribers = defaultdict(set)
+
+    def subscribe(self, channel):
+        """Must be called from a running event loop"""
+        subscription = Subscription(self, channel, self.queue_size)
+        with self._lock:
+            self._subscribers[channel].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.channel)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.channel]
+
+    def has_subscribers(self, channel):
+        """Whether publishing to ``channel`` can reach anyone"""
+        return bool(self._subscribers.get(channel))
+
+    def publish(self, channel, message):
+        self.dispatch(channel, message)
+
+    def dispatch(self, channel, message):
+        """Hand a message to this process's subscribers on their own loops"""
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, ()))
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.deliver, message)
+            except RuntimeError:
+                # The subscriber's loop has shut down
+                self.unsubscribe(subscription)
+
+
+class FileBroker(LocalBroker):
+    """
+    Multi-process fan-out through an append-only spool file.
+
+    ``publish`` appends one JSON line (a single ``O_APPEND`` write, so lines
+    from different processes do not interleave); a tailer thread in each
+    subscribing process follows the file from its end and dispatches new
+    lines locally.
+
+    Subscribing processes keep a marker file per channel in
+    ``<path>.subscribers/``, refreshed every ``heartbeat`` seconds, so writers
+    skip channels nobody listens to. Once the spool passes ``max_bytes`` the
+    writer renames it to ``<path>.1``; tailers finish the old file and move
+    on, so disk use stays under twice ``max_bytes``.
+    """
+
+    def __init__(self, path=None, poll_interval=0.2, heartbeat=5, max_bytes=8 * 1024 * 1024, **kwargs):
+        super().__init__(**kwargs)
+        self.path = path or os.path.join(settings.BASE_DIR, 'event-updates.log')
+        self.marker_dir = self.path + '.subscribers'
+        self.poll_interval = poll_interval
+        self.heartbeat = heartbeat
+        self.max_bytes = max_bytes
+        self._tailer = None
+        self._live, self._listed_at = frozenset(), None
+
+    def _marker(self, channel):
+        return os.path.join(self.marker_dir, f'{quote(channel, safe="")}@{os.getpid()}')
+
+    def _mark(self, channels):
+        os.makedirs(self.marker_dir, exist_ok=True)
+        for channel in channels:
+            with open(self._marker(channel), 'a'):
+                pass
+            os.utime(self._marker(channel))
+
+    def live_channels(self):
+        """Channels with a fresh marker in any process, listed at most once per poll interval"""
+        now = time.monotonic()
+        if self._listed_at is None or now - self._listed_at >= self.poll_interval:
+            cutoff = time.time() - 3 * self.heartbeat
+            live = set()
+            try:
+                with os.scandir(self.marker_dir) as entries:
+                    for entry in entries:
+                        try:
+                            fresh = entry.stat().st_mtime >= cutoff
+                        except OSError:
+                            continue
+                        if fresh:
+                            live.add(unquote(entry.name.rpartition('@')[0]))
+            except FileNotFoundError:
+                pass
+            self._live, self._listed_at = frozenset(live), now
+        return self._live
+
+    def has_subscribers(self, channel):
+        return super().has_subscribers(channel) or channel in self.live_channels()
+
+    def publish(self, channel, message):
+        line = json.dumps({'channel': channel, 'message': message}, separators=(',', ':')) + '\n'
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+        try:
+            os.write(fd, line.encode())
+            size = os.fstat(fd).st_size
+        finally:
+            os.close(fd)
+        if size > self.max_bytes:
+            try:
+                os.replace(self.path, self.path + '.1')
+            except FileNotFoundError:
+                pass  # Rotated by another writer
+
+    def subscribe(self, channel):
+        self._mark([channel])
+        with self._lock:
+            if self._tailer is None:
+                self._tailer = threading.Thread(target=self._tail, name='event-updates-tail', daemon=True)
+                self._tailer.start()
+        return super().subscribe(channel)
+
+    def unsubscribe(self, subscription):
+        super().unsubscribe(subscription)
+        if not super().has_subscribers(subscription.channel):
+            try:
+                os.remove(self._marker(subscription.channel))
+            except OSError:
+                pass
+
+    def _open(self, at_end):
+        try:
+            handle = open(self.path, 'rb')
+        except OSError:
+            return None
+        if at_end:
+            handle.seek(0, os.SEEK_END)
+        return handle
+
+    def _tail(self):
+        # Start at the current end: subscribers only want messages from now on
+        handle = self._open(at_end=True)
+        partial, beat = b'', time.monotonic()
+        while True:
+            time.sleep(self.poll_interval)
+            if time.monotonic() - beat >= self.heartbeat:
+                with self._lock:
+                    channels = list(self._subscribers)
+                self._mark(channels)
+                beat = time.monotonic()
+
+            if handle is not None:
+                if os.fstat(handle.fileno()).st_size < handle.tell():
+                    # Truncated in place
+                    handle.seek(0)
+                    partial = b''
+                partial = self._dispatch_lines(partial + handle.read())
+            try:
+                current = os.stat(self.path).st_ino
+            except OSError:
+                continue
+            if handle is None or current != os.fstat(handle.fileno()).st_ino:
+                # Rotated or created: drain what the old file still holds, then follow the new one
+                if handle is not None:
+                    self._dispatch_lines(partial + handle.read())
+                    handle.close()
+                handle, partial = self._open(at_end=False), b''
+
+    def _dispatch_lines(self, data):
+        """Dispatch the complete lines in ``data``; returns the trailing partial line"""
+        *lines, partial = data.split(b'\n')
+        for line in lines:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            self.dispatch(record['channel'], record['message'])
+        return partial
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    """The process-wide broker configured by ``EVENT_PUBSUB_BACKEND``"""
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                path = getattr(settings, 'EVENT_PUBSUB_BACKEND', 'api.pubsub.LocalBroker')
+                _broker = import_string(path)(**getattr(settings, 'EVENT_PUBSUB_OPTIONS', {}))
+    return _broker
+
+
+def event_channel(event_id):
+    return f'event:{event_id}'
+
+
+def counts_message(row):
+    """Live counters of an event, named as in EventSerializer"""
+    return {
+        'type': 'counts',
+        'event_id': row['id'],
+        'rsvp_count': row['going_count'],
+        'maybe_count': row['maybe_count'],
+        'not_going_count': row['not_going_count'],
+        'review_count': row['review_count'],
+        'average_rating': average_rating(row['rating_sum'], row['review_count']),
+    }
+
+
+COUNTS_COLUMNS = ('id', 'going_count', 'maybe_count', 'not_going_count', 'review_count', 'rating_sum')
+
+
+def publish_counts(event_ids):
+    """Once the transaction commits, push the events' new counters to subscribers"""
+    event_ids = list(event_ids)
+
+    def send():
+        broker = get_broker()
+        wanted = [event_id for event_id in event_ids if broker.has_subscribers(event_channel(event_id))]
+        if wanted:
+            for row in Event.objects.filter(pk__in=wanted).values(*COUNTS_COLUMNS):
+                broker.publish(event_channel(row['id']), counts_message(row))
+    transaction.on_commit(send)
+
+
+def publish_review(review):
+    """Once the transaction commits, announce a new review to subscribers"""
+    channel = event_channel(review.event_id)
+    message = {'type': 'review', 'event_id': review.event_id, 'id': review.pk, 'rating': review.rating}
+
+    def send():
+        broker = get_broker()
+        if broker.has_subscribers(channel):
+            broker.publish(channel, message)
+    transaction.on_commit(send)
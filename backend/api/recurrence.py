@@ -0,0 +1,200 @@
+"""
+Recurring events.
+
+A series is one Event row with a recurrence rule (daily, weekly or monthly,
+every ``recurrence_interval`` periods, bounded by ``recurrence_until`` and/or
+``recurrence_count``). Its own start and end times are the first occurrence.
+Later occurrences are not stored: they are computed for the window a
+response covers, so listing a year of a daily series reads one row.
+
+An occurrence is stored only once it needs a row of its own, i.e. when it
+is RSVP'd to or the organizer overrides it. It is then an ordinary Event
+(``series`` and ``original_start`` set, no rule) copied from the series, so
+RSVPs, reviews, counters and permissions work on it unchanged, and it
+replaces the computed occurrence at ``original_start``.
+
+``Event.recurrence_end`` holds the end of a bounded series' last occurrence
+(``last_occurrence_end``), so windows skip finished series in SQL. Changing
+a series' start or rule deletes the stored occurrences it no longer
+produces (``prune_occurrences``).
+
+Occurrences keep their wall-clock time in the current time zone, so a
+weekly 19:00 meetup stays at 19:00 across DST changes. Monthly rules skip
+months without the start's day of month, as RFC 5545 does.
+"""
+import copy
+import heapq
+from datetime import timedelta
+
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .counters import COUNTER_FIELDS
+from .models import Event
+
+PERIOD_DAYS = {'daily': 1, 'weekly': 7}
+
+# Widest window a single list request may expand
+MAX_WINDOW = timedelta(days=366)
+
+# Fields that decide when a series' occurrences start
+RULE_FIELDS = ('start_time', 'recurrence_frequency', 'recurrence_interval', 'recurrence_until', 'recurrence_count')
+
+
+def _wall_times(wall, frequency, interval, first):
+    """Candidate local start times from the ``first``-th period on"""
+    n = first
+    while True:
+        if frequency == 'monthly':
+            month = wall.month - 1 + n * interval
+            try:
+                yield wall.replace(year=wall.year + month // 12, month=month % 12 + 1)
+            except ValueError:
+                pass  # No such day this month
+        else:
+            yield wall + timedelta(days=n * interval * PERIOD_DAYS[frequency])
+        n += 1
+
+
+def occurrence_starts(event, since=None, until=None):
+    """
+    Start times of the event's occurrences that overlap [since, until),
+    earliest first. Without ``until`` an unbounded series never ends.
+    """
+    duration = event.end_time - event.start_time
+    if not event.recurrence_frequency:
+        if (since is None or event.end_time > since) and (until is None or event.start_time < until):
+            yield event.start_time
+        return
+
+    zone = timezone.get_current_timezone()
+    wall = timezone.localtime(event.start_time, zone).replace(tzinfo=None)
+    first = 0
+    # Daily and weekly rules can jump straight to the window; monthly ones
+    # are short enough to walk, and skipped months must not count
+    if since is not None and event.recurrence_frequency in PERIOD_DAYS:
+        gap = timezone.localtime(since - duration, zone).replace(tzinfo=None) - wall
+        first = max(0, gap.days // (event.recurrence_interval * PERIOD_DAYS[event.recurrence_frequency]))
+
+    produced = first
+    for wall_start in _wall_times(wall, event.recurrence_frequency, event.recurrence_interval, first):
+        if event.recurrence_count is not None and produced >= event.recurrence_count:
+            return
+        produced += 1
+        start = timezone.make_aware(wall_start, zone)
+        if event.recurrence_until is not None and start > event.recurrence_until:
+            return
+        if until is not None and start >= until:
+            return
+        if since is not None and start + duration <= since:
+            continue
+        yield start
+
+
+def last_occurrence_end(event):
+    """End of the series' last occurrence; None for unbounded series and single events"""
+    if not event.recurrence_frequency or (event.recurrence_until is None and event.recurrence_count is None):
+        return None
+    last = event.start_time
+    for last in occurrence_starts(event):
+        pass
+    return last + (event.end_time - event.start_time)
+
+
+def is_occurrence(event, start):
+    """Whether the event (or series) has an occurrence starting at ``start``"""
+    return any(value == start for value in occurrence_starts(event, start, start + timedelta(microseconds=1)))
+
+
+def occurrence(series, start):
+    """An unsaved stand-in for the computed occurrence of ``series`` at ``start``"""
+    instance = copy.copy(series)
+    instance.start_time = start
+    instance.end_time = start + (series.end_time - series.start_time)
+    instance.original_start = start
+    instance.series_id = series.pk
+    instance.computed_occurrence = True
+    instance.first_occurrence = start == series.start_time
+    # RSVPs and reviews on the series row belong to its first occurrence only
+    if not instance.first_occurrence:
+        for field in COUNTER_FIELDS:
+            setattr(instance, field, 0)
+        if hasattr(series, 'user_rsvp_status'):
+            instance.user_rsvp_status = None
+    return instance
+
+
+def ongoing_series(since):
+    """Series with an occurrence ending after ``since``, or no last occurrence"""
+    return ~Q(recurrence_frequency='') & (Q(recurrence_end__isnull=True) | Q(recurrence_end__gt=since))
+
+
+def window_filter(since, until):
+    """Events (series included) that may have an occurrence in [since, until)"""
+    single = Q(recurrence_frequency='', start_time__lt=until, end_time__gt=since)
+    return single | (Q(start_time__lt=until) & ongoing_series(since))
+
+
+def computed_occurrences(series_list, since, until):
+    """
+    The computed occurrences of the given series in [since, until) ordered by
+    (start_time, series id), skipping the ones that have been stored.
+    """
+    if not series_list:
+        return iter(())
+    longest = max(event.end_time - event.start_time for event in series_list)
+    stored = set(
+        Event.objects.filter(
+            series_id__in=[event.pk for event in series_list],
+            original_start__gt=since - longest, original_start__lt=until,
+        ).values_list('series_id', 'original_start')
+    )
+
+    def expand(series):
+        for start in occurrence_starts(series, since, until):
+            if (series.pk, start) not in stored:
+                yield occurrence(series, start)
+
+    return heapq.merge(*(expand(series) for series in series_list), key=lambda event: (event.start_time, event.pk))
+
+
+def materialize_occurrence(series, start):
+    """
+    ``(event, created)`` for the stored occurrence of ``series`` at
+    ``start``, created on first use. The first occurrence is the series row
+    itself; ``(None, False)`` if the series has no such occurrence.
+    """
+    if start is None or not series.recurrence_frequency or not is_occurrence(series, start):
+        return None, False
+    if start == series.start_time:
+        return series, False
+    stored = Event.objects.filter(series=series, original_start=start).first()
+    if stored is not None:
+        return stored, False
+    try:
+        with transaction.atomic():
+            stored = Event.objects.create(
+                title=series.title, description=series.description, organizer_id=series.organizer_id,
+                location=series.location, start_time=start, end_time=start + (series.end_time - series.start_time),
+                is_public=series.is_public, series=series, original_start=start,
+            )
+            invitees = list(series.invited_users.values_list('pk', flat=True))
+            if invitees:
+                stored.invited_users.add(*invitees)
+    except IntegrityError:
+        # Stored concurrently
+        return Event.objects.get(series=series, original_start=start), False
+    return stored, True
+
+
+def prune_occurrences(series):
+    """
+    Delete the stored occurrences of ``series`` that its current start and
+    rule no longer produce, with their RSVPs and reviews. Returns how many.
+    """
+    stored = Event.objects.filter(series=series)
+    if series.recurrence_frequency:
+        stale = [pk for pk, start in stored.values_list('pk', 'original_start') if not is_occurrence(series, start)]
+        stored = stored.filter(pk__in=stale)
+    return stored.delete()[1].get(Event._meta.label, 0)
@@ -0,0 +1,132 @@
+"""
+Daily rollups of RSVP and review activity for organizer dashboards.
+
+``EventDailyStats`` holds one row per (event, day) with the organizer copied
+from the event. api.counters reports every RSVP and review change here in the
+writer's transaction; the change lands on today's row (in the current time
+zone) as an F-expression increment, so concurrent writers never lose
+updates. ``rebuild_rollups`` regenerates rows from the RSVP and review tables
+for the ``backfill_rollups`` command.
+
+Rebuilt history is approximate: an RSVP is counted on the day it last
+changed and a review on the day it was written, because earlier states are
+not stored. Totals over all days are exact either way.
+"""
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import RSVP, Event, EventDailyStats, Review, average_rating
+
+ROLLUP_FIELDS = ['going', 'maybe', 'not_going', 'reviews_written', 'review_count', 'rating_sum']
+
+MAX_DAYS = 366
+
+
+def record_daily(deltas):
+    """
+    Add changes to today's rollup rows.
+
+    ``deltas`` maps event_id -> {field: delta} over ROLLUP_FIELDS. The common
+    case is one UPDATE per event; the first write of the day also looks up the
+    organizer and inserts the row.
+    """
+    day = timezone.localdate()
+    for event_id, changes in deltas.items():
+        changes = {field: delta for field, delta in changes.items() if delta}
+        if not changes:
+            continue
+        rows = EventDailyStats.objects.filter(event_id=event_id, day=day)
+        updates = {field: F(field) + delta for field, delta in changes.items()}
+        if rows.update(**updates):
+            continue
+        organizer_id = Event.objects.filter(pk=event_id).values_list('organizer_id', flat=True).first()
+        if organizer_id is None:
+            continue
+        try:
+            with transaction.atomic():
+                EventDailyStats.objects.create(event_id=event_id, organizer_id=organizer_id, day=day, **changes)
+        except IntegrityError:
+            # Inserted concurrently
+            rows.update(**updates)
+
+
+def compute_rollups(events):
+    """Rollup rows for these events rebuilt from RSVPs and reviews (unsaved)"""
+    organizers = {event.pk: event.organizer_id for event in events}
+    rows = defaultdict(lambda: dict.fromkeys(ROLLUP_FIELDS, 0))
+    by_status = (
+        RSVP.objects.filter(event_id__in=organizers).order_by()
+        .values('event_id', 'status', day=TruncDate('updated_at')).annotate(n=Count('id'))
+    )
+    for row in by_status:
+        rows[row['event_id'], row['day']][row['status']] += row['n']
+    by_day = (
+        Review.objects.filter(event_id__in=organizers).order_by()
+        .values('event_id', day=TruncDate('created_at')).annotate(n=Count('id'), total=Sum('rating'))
+    )
+    for row in by_day:
+        counters = rows[row['event_id'], row['day']]
+        counters['reviews_written'] = counters['review_count'] = row['n']
+        counters['rating_sum'] = row['total']
+    return [
+        EventDailyStats(event_id=event_id, organizer_id=organizers[event_id], day=day, **counters)
+        for (event_id, day), counters in sorted(rows.items())
+    ]
+
+
+def rebuild_rollups(events):
+    """Replace the rollups of these events; returns the number of rows written"""
+    rollups = compute_rollups(events)
+    EventDailyStats.objects.filter(event_id__in=[event.pk for event in events]).delete()
+    EventDailyStats.objects.bulk_create(rollups)
+    return len(rollups)
+
+
+def organizer_stats(organizer_id, days=30):
+    """
+    Dashboard figures for one organizer: all-time totals from the event
+    counters, and per-day and per-event activity over the last ``days`` days
+    from the rollups. Three indexed aggregate queries.
+    """
+    until = timezone.localdate()
+    since = until - timedelta(days=days - 1)
+
+    totals = Event.objects.filter(organizer_id=organizer_id).aggregate(
+        events_hosted=Count('id'),
+        going=Sum('going_count', default=0),
+        maybe=Sum('maybe_count', default=0),
+        not_going=Sum('not_going_count', default=0),
+        review_count=Sum('review_count', default=0),
+        rating_sum=Sum('rating_sum', default=0),
+    )
+    events_hosted = totals.pop('events_hosted')
+    totals['average_rating'] = average_rating(totals['rating_sum'], totals['review_count'])
+
+    window = EventDailyStats.objects.filter(organizer_id=organizer_id, day__gte=since, day__lte=until).order_by()
+    # Aliased, since annotations may not shadow the model's own fields
+    sums = {f'sum_{field}': Sum(field) for field in ROLLUP_FIELDS}
+    daily = [
+        {'day': row['day'].isoformat(), **{field: row[f'sum_{field}'] for field in ROLLUP_FIELDS}}
+        for row in window.values('day').annotate(**sums).order_by('day')
+    ]
+    events = []
+    for row in window.values('event_id').annotate(**sums).order_by('event_id'):
+        counters = {field: row[f'sum_{field}'] for field in ROLLUP_FIELDS}
+        events.append({'event_id': row['event_id'], **counters,
+                       'average_rating': average_rating(counters['rating_sum'], counters['review_count'])})
+    reviews_written = sum(row['reviews_written'] for row in daily)
+
+    return {
+        'organizer_id': organizer_id,
+        'events_hosted': events_hosted,
+        'totals': totals,
+        'window': {'since': since.isoformat(), 'until': until.isoformat(), 'days': days},
+        'review_velocity': round(reviews_written / days, 3),
+        'daily': daily,
+        'events': events,
+    }
@@ -0,0 +1,89 @@
+"""
+Schedule conflicts between the events a user has RSVP'd to.
+
+Both checks read the user's RSVP'd events inside the window: ``start_time <
+until`` is a range on ``idx_event_start_end`` and ``end_time > since`` one on
+``idx_event_end_start``. A new RSVP is compared against events that overlap
+it (``start < end`` and ``end > start``); a whole schedule is grouped with
+one sort-and-sweep, so a user with thousands of RSVPs costs O(n log n) rather
+than a comparison per pair. Events that only touch (one ends as the next
+starts) do not conflict.
+
+An RSVP on a recurring series belongs to its first occurrence only (see
+api.recurrence), which is the series row's own start and end; later
+occurrences someone RSVPs to are stored rows with their own RSVPs. So the
+rows read here are the user's busy times as they are, with no expansion.
+"""
+from rest_framework import serializers
+
+from .models import Event
+
+# DRF's own formatting, so timestamps match the serializers exactly
+_datetime = serializers.DateTimeField().to_representation
+
+SCHEDULE_COLUMNS = ('id', 'title', 'location', 'start_time', 'end_time')
+
+# RSVP statuses that put an event on someone's schedule by default
+BUSY_STATUSES = ('going',)
+
+
+def overlap_groups(intervals):
+    """
+    Group ``(start, end, key)`` intervals into maximal runs of overlapping
+    ones, returning only runs of two or more as lists of keys.
+    """
+    groups, current, current_end = [], [], None
+    for start, end, key in sorted(intervals, key=lambda interval: (interval[0], interval[1])):
+        if current and start < current_end:
+            current.append(key)
+            current_end = max(current_end, end)
+            continue
+        if len(current) > 1:
+            groups.append(current)
+        current, current_end = [key], end
+    if len(current) > 1:
+        groups.append(current)
+    return groups
+
+
+def scheduled_events(user, statuses=BUSY_STATUSES, since=None, until=None):
+    """The user's RSVP'd events overlapping [since, until), earliest first"""
+    events = Event.objects.filter(rsvps__user_id=user.pk, rsvps__status__in=statuses)
+    if until is not None:
+        events = events.filter(start_time__lt=until)
+    if since is not None:
+        events = events.filter(end_time__gt=since)
+    return events.order_by('start_time', 'end_time', 'id')
+
+
+def schedule_rows(events):
+    return list(events.values_list(*SCHEDULE_COLUMNS, 'rsvps__status'))
+
+
+def schedule_entry(row):
+    event_id, title, location, start_time, end_time, rsvp_status = row
+    return {
+        'id': event_id, 'title': title, 'location': location,
+        'start_time': _datetime(start_time), 'end_time': _datetime(end_time), 'rsvp_status': rsvp_status,
+    }
+
+
+def schedule(user, statuses=BUSY_STATUSES, since=None, until=None):
+    """The user's events in the window and the groups of them that overlap"""
+    rows = schedule_rows(scheduled_events(user, statuses, since, until))
+    spans = {row[0]: (row[3], row[4]) for row in rows}
+    conflicts = [
+        {
+            'event_ids': group,
+            'start_time': _datetime(min(spans[event_id][0] for event_id in group)),
+            'end_time': _datetime(max(spans[event_id][1] for event_id in group)),
+        }
+        for group in overlap_groups((start, end, event_id) for event_id, (start, end) in spans.items())
+    ]
+    return {'events': [schedule_entry(row) for row in rows], 'conflicts': conflicts}
+
+
+def conflicting_events(user, event, statuses=BUSY_STATUSES):
+    """The user's other RSVP'd events that overlap ``event``"""
+    events = scheduled_events(user, statuses, since=event.start_time, until=event.end_time).exclude(pk=event.pk)
+    return [schedule_entry(row) for row in schedule_rows(events)]
@@ -0,0 +1,124 @@
+"""
+Full-text search for events.
+
+The backend is picked from the database vendor: a FULLTEXT index on MySQL, an
+FTS5 shadow table (kept in sync by signals) on SQLite, and plain icontains
+matching anywhere else. ``EVENT_SEARCH_BACKEND`` in settings overrides the
+choice with a dotted path.
+"""
+import re
+from functools import reduce
+from operator import and_, or_
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+from rest_framework.filters import BaseFilterBackend
+
+MAX_SEARCH_TERMS = 10
+
+
+def tokenize(query):
+    """Split a search query into lower-cased word terms"""
+    return re.findall(r'\w+', query.lower())[:MAX_SEARCH_TERMS]
+
+
+class LikeSearchBackend:
+    """Fallback backend: every term must appear in one of the fields"""
+    fields = ('title', 'description', 'location')
+
+    def search(self, queryset, terms, fields=None):
+        fields = fields or self.fields
+        condition = reduce(and_, (
+            reduce(or_, (Q(**{f'{field}__icontains': term}) for field in fields))
+            for term in terms
+        ))
+        return queryset.filter(condition).annotate(search_rank=Value(0.0, output_field=FloatField()))
+
+    def index_event(self, event):
+        pass
+
+    def remove_event(self, event_id):
+        pass
+
+    def rebuild(self):
+        pass
+
+
+class MySQLFullTextBackend(LikeSearchBackend):
+    """MATCH ... AGAINST over the idx_event_fulltext FULLTEXT index"""
+    match_sql = 'MATCH (api_event.title, api_event.description, api_event.location) AGAINST (%s IN BOOLEAN MODE)'
+
+    def search(self, queryset, terms, fields=None):
+        against = ' '.join(f'+{term}*' for term in terms)
+        rank = RawSQL(self.match_sql, (against,), output_field=FloatField())
+        return queryset.annotate(search_rank=rank).filter(search_rank__gt=0)
+
+
+class SQLiteFTS5Backend(LikeSearchBackend):
+    """FTS5 shadow table ``api_event_fts`` whose rowid is the event id"""
+    table = 'api_event_fts'
+
+    def search(self, queryset, terms, fields=None):
+        match = ' '.join(f'"{term}"*' for term in terms)
+        matches = RawSQL(f'SELECT rowid FROM {self.table} WHERE {self.table} MATCH %s', (match,))
+        # bm25() is lower for better matches, so negate it to rank descending
+        rank = RawSQL(
+            f'SELECT -bm25({self.table}) FROM {self.table} '
+            f'WHERE {self.table} MATCH %s AND rowid = api_event.id',
+            (match,),
+            output_field=FloatField(),
+        )
+        return queryset.filter(id__in=matches).annotate(search_rank=rank)
+
+    def index_event(self, event):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.table} WHERE rowid = %s', [event.pk])
+            cursor.execute(
+                f'INSERT INTO {self.table} (rowid, title, description, location) VALUES (%s, %s, %s, %s)',
+                [event.pk, event.title, event.description, event.location],
+            )
+
+    def remove_event(self, event_id):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.table} WHERE rowid = %s', [event_id])
+
+    def rebuild(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.table}')
+            cursor.execute(
+                f'INSERT INTO {self.table} (rowid, title, description, location) '
+                f'SELECT id, title, description, location FROM api_event'
+            )
+
+
+VENDOR_BACKENDS = {
+    'mysql': MySQLFullTextBackend,
+    'sqlite': SQLiteFTS5Backend,
+}
+
+
+def get_search_backend():
+    path = getattr(settings, 'EVENT_SEARCH_BACKEND', None)
+    if path:
+        return import_string(path)()
+    return VENDOR_BACKENDS.get(connection.vendor, LikeSearchBackend)()
+
+
+class EventSearchFilter(BaseFilterBackend):
+    """
+    ``?search=`` filter backed by the configured full-text backend.
+
+    Results are ranked by relevance unless the client asks for an explicit
+    ``ordering``. Terms are prefix-matched.
+    """
+    search_param = 'search'
+
+    def filter_queryset(self, request, queryset, view):
+        terms = tokenize(request.query_params.get(self.search_param, ''))
+        if not terms:
+            return queryset
+        queryset = get_search_backend().search(queryset, terms, getattr(view, 'search_fields', None))
+        return queryset.order_by('-search_rank', '-start_time', '-id')
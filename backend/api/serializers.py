@@ -1,17 +1,21 @@
 from rest_framework import serializers
 from django.contrib.auth.models import User
-from .models import UserProfile, Event, RSVP, Review
+from django.contrib.auth.validators import UnicodeUsernameValidator
+from .models import UserProfile, Event, EventRatingSummary, RSVP, Review
+from .fieldsets import SparseFieldsetsMixin
+from .metrics import TimedListSerializer, TimedSerializerMixin
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(TimedSerializerMixin, SparseFieldsetsMixin, serializers.ModelSerializer):
     """Serializer for User model"""
     class Meta:
         model = User
+        list_serializer_class = TimedListSerializer
         fields = ['id', 'username', 'email', 'first_name', 'last_name']
         read_only_fields = ['id']
 
 
-class UserProfileSerializer(serializers.ModelSerializer):
+class UserProfileSerializer(TimedSerializerMixin, SparseFieldsetsMixin, serializers.ModelSerializer):
     """Serializer for UserProfile model"""
     user = UserSerializer(read_only=True)
     username = serializers.CharField(source='user.username', read_only=True)
@@ -19,6 +23,7 @@ class UserProfileSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = UserProfile
+        list_serializer_class = TimedListSerializer
         fields = ['id', 'user', 'username', 'email', 'full_name', 'bio', 
                   'location', 'profile_picture', 'created_at', 'updated_at']
         read_only_fields = ['id', 'created_at', 'updated_at']
@@ -68,7 +73,7 @@ class RegisterSerializer(serializers.ModelSerializer):
         return user
 
 
-class EventSerializer(serializers.ModelSerializer):
+class EventSerializer(TimedSerializerMixin, SparseFieldsetsMixin, serializers.ModelSerializer):
     """Serializer for Event model"""
     organizer = UserSerializer(read_only=True)
     organizer_id = serializers.IntegerField(write_only=True, required=False)
@@ -76,18 +81,33 @@ class EventSerializer(serializers.ModelSerializer):
     user_rsvp_status = serializers.SerializerMethodField()
     average_rating = serializers.SerializerMethodField()
     invited_users = serializers.PrimaryKeyRelatedField(many=True, queryset=User.objects.all(), required=False)
+    series_id = serializers.IntegerField(read_only=True)
+
+    # Model columns behind the computed fields, for sparse fieldset querysets
+    field_sources = {
+        'rsvp_count': ['going_count'],
+        'average_rating': ['review_count', 'rating_sum'],
+    }
 
     class Meta:
         model = Event
+        list_serializer_class = TimedListSerializer
         fields = ['id', 'title', 'description', 'organizer', 'organizer_id', 'location', 
                   'start_time', 'end_time', 'is_public', 'created_at', 'updated_at',
-                  'rsvp_count', 'user_rsvp_status', 'average_rating', 'invited_users']
-        read_only_fields = ['id', 'created_at', 'updated_at', 'organizer']
+                  'rsvp_count', 'user_rsvp_status', 'average_rating', 'invited_users',
+                  'maybe_count', 'not_going_count', 'review_count',
+                  'recurrence_frequency', 'recurrence_interval', 'recurrence_until', 'recurrence_count',
+                  'series_id', 'original_start']
+        read_only_fields = ['id', 'created_at', 'updated_at', 'organizer',
+                            'maybe_count', 'not_going_count', 'review_count', 'original_start']
 
     def get_rsvp_count(self, obj):
-        return obj.rsvps.filter(status='going').count()
+        return obj.going_count
 
     def get_user_rsvp_status(self, obj):
+        # Prefer the value annotated by EventQuerySet.with_user_rsvp_status
+        if hasattr(obj, 'user_rsvp_status'):
+            return obj.user_rsvp_status
         request = self.context.get('request')
         if request and request.user.is_authenticated:
             rsvp = obj.rsvps.filter(user=request.user).first()
@@ -95,19 +115,33 @@ class EventSerializer(serializers.ModelSerializer):
         return None
 
     def get_average_rating(self, obj):
-        reviews = obj.reviews.all()
-        if reviews.exists():
-            return round(sum(r.rating for r in reviews) / reviews.count(), 2)
-        return None
+        return obj.average_rating
 
     def validate(self, attrs):
         if attrs.get('end_time') and attrs.get('start_time'):
             if attrs['end_time'] <= attrs['start_time']:
                 raise serializers.ValidationError({"end_time": "End time must be after start time."})
+
+        def current(field):
+            return attrs[field] if field in attrs else getattr(self.instance, field, None)
+
+        if current('recurrence_frequency'):
+            if current('series_id') is not None:
+                raise serializers.ValidationError(
+                    {"recurrence_frequency": "An occurrence of a series cannot recur itself."})
+            if current('recurrence_interval') == 0:
+                raise serializers.ValidationError({"recurrence_interval": "Interval must be at least 1."})
+            if current('recurrence_until') is not None and current('recurrence_count') is not None:
+                raise serializers.ValidationError(
+                    {"recurrence_count": "Set either recurrence_until or recurrence_count, not both."})
+            if current('recurrence_until') is not None and current('recurrence_until') < current('start_time'):
+                raise serializers.ValidationError({"recurrence_until": "Must not be before the start time."})
+            if current('recurrence_count') == 0:
+                raise serializers.ValidationError({"recurrence_count": "Count must be at least 1."})
         return attrs
 
 
-class RSVPSerializer(serializers.ModelSerializer):
+class RSVPSerializer(TimedSerializerMixin, SparseFieldsetsMixin, serializers.ModelSerializer):
     """Serializer for RSVP model"""
     user = UserSerializer(read_only=True)
     event = EventSerializer(read_only=True)
@@ -115,6 +149,7 @@ class RSVPSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = RSVP
+        list_serializer_class = TimedListSerializer
         fields = ['id', 'event', 'event_id', 'user', 'status', 'created_at', 'updated_at']
         read_only_fields = ['id', 'created_at', 'updated_at', 'user', 'event']
 
@@ -124,7 +159,28 @@ class RSVPSerializer(serializers.ModelSerializer):
         return value
 
 
-class ReviewSerializer(serializers.ModelSerializer):
+class BulkRSVPItemSerializer(serializers.Serializer):
+    """Serializer for one (event_id, status) pair of a bulk RSVP request"""
+    event_id = serializers.IntegerField()
+    status = serializers.ChoiceField(choices=RSVP.STATUS_CHOICES)
+
+
+class ProvisionUserSerializer(serializers.Serializer):
+    """
+    One user of a bulk provisioning request. Uniqueness is checked per batch
+    by api.provisioning, so there are no per-row lookups here.
+    """
+    username = serializers.CharField(max_length=150, validators=[UnicodeUsernameValidator()])
+    email = serializers.EmailField(required=False, allow_blank=True)
+    password = serializers.CharField(required=False, allow_blank=True, write_only=True)
+    first_name = serializers.CharField(max_length=150, required=False, allow_blank=True)
+    last_name = serializers.CharField(max_length=150, required=False, allow_blank=True)
+    full_name = serializers.CharField(max_length=255)
+    bio = serializers.CharField(required=False, allow_blank=True)
+    location = serializers.CharField(max_length=255, required=False, allow_blank=True)
+
+
+class ReviewSerializer(TimedSerializerMixin, SparseFieldsetsMixin, serializers.ModelSerializer):
     """Serializer for Review model"""
     user = UserSerializer(read_only=True)
     event = EventSerializer(read_only=True)
@@ -132,6 +188,7 @@ class ReviewSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Review
+        list_serializer_class = TimedListSerializer
         fields = ['id', 'event', 'event_id', 'user', 'rating', 'comment', 'created_at', 'updated_at']
         read_only_fields = ['id', 'created_at', 'updated_at', 'user', 'event']
 
@@ -139,3 +196,17 @@ class ReviewSerializer(serializers.ModelSerializer):
         if value < 1 or value > 5:
             raise serializers.ValidationError("Rating must be between 1 and 5.")
         return value
+
+
+class EventRatingSummarySerializer(TimedSerializerMixin, SparseFieldsetsMixin, serializers.ModelSerializer):
+    """Serializer for an event's rating histogram"""
+    event_id = serializers.IntegerField(read_only=True)
+    average_rating = serializers.FloatField(read_only=True)
+    histogram = serializers.DictField(child=serializers.IntegerField(), read_only=True)
+
+    class Meta:
+        model = EventRatingSummary
+        list_serializer_class = TimedListSerializer
+        fields = ['event_id', 'review_count', 'rating_sum', 'average_rating', 'histogram',
+                  'recent_review_ids', 'updated_at']
+        read_only_fields = fields
@@ -0,0 +1,88 @@
+from django.contrib.auth.models import User
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from . import acl
+from .authentication import invalidate_users as invalidate_cached_users
+from .cache import invalidate_events, invalidate_users
+from .models import Event, RSVP, Review, UserProfile
+from .pubsub import publish_review
+from .search import get_search_backend
+
+
+@receiver(post_save, sender=Event)
+def index_event_for_search(sender, instance, **kwargs):
+    """Keep the full-text shadow table in sync with event edits"""
+    get_search_backend().index_event(instance)
+
+
+@receiver(post_delete, sender=Event)
+def remove_event_from_search(sender, instance, **kwargs):
+    get_search_backend().remove_event(instance.pk)
+
+
+@receiver(post_save, sender=Event)
+@receiver(post_delete, sender=Event)
+def invalidate_event_fragment(sender, instance, **kwargs):
+    invalidate_events([instance.pk])
+
+
+@receiver(post_save, sender=RSVP)
+@receiver(post_delete, sender=RSVP)
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def invalidate_parent_event_fragment(sender, instance, **kwargs):
+    invalidate_events([instance.event_id])
+
+
+@receiver(post_save, sender=Review)
+def announce_new_review(sender, instance, created, **kwargs):
+    if created:
+        publish_review(instance)
+
+
+@receiver(m2m_changed, sender=Event.invited_users.through)
+def invalidate_invitee_fragments(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+    if not reverse:
+        event_ids = [instance.pk]
+    elif action == 'pre_clear':
+        event_ids = list(instance.invited_events.values_list('pk', flat=True))
+    else:
+        event_ids = list(pk_set)
+    invalidate_events(event_ids)
+    # The invitee list is part of the event, so move its validator too
+    Event.objects.filter(pk__in=event_ids).update(updated_at=timezone.now())
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_organizer_fragments(sender, instance, **kwargs):
+    invalidate_users([instance.pk])
+    acl.invalidate_users([instance.pk])
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_authenticated_user(sender, instance, **kwargs):
+    invalidate_cached_users([instance.pk])
+
+
+@receiver(post_save, sender=UserProfile)
+@receiver(post_delete, sender=UserProfile)
+def invalidate_user_snapshot(sender, instance, **kwargs):
+    invalidate_cached_users([instance.user_id])
+
+
+@receiver(m2m_changed, sender=Event.invited_users.through)
+def invalidate_invitee_acls(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+    if reverse:
+        acl.invalidate_users([instance.pk])
+    elif action == 'pre_clear':
+        acl.invalidate_users(instance.invited_users.values_list('pk', flat=True))
+    else:
+        acl.invalidate_users(pk_set)
@@ -1,10 +1,44 @@
-from django.test import TestCase
+import asyncio
+from asgiref.sync import sync_to_async
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.http import HttpResponse
 from django.contrib.auth.models import User
 from django.utils import timezone
-from datetime import timedelta
-from rest_framework.test import APITestCase, APIClient
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.db.models import Prefetch
+from django.test.utils import CaptureQueriesContext
+from datetime import datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from io import BytesIO, StringIO
+import json
+import multiprocessing
+import os
+import shutil
+import tempfile
+from unittest import mock
+from rest_framework.test import APITestCase, APIClient, APIRequestFactory
 from rest_framework import status
-from .models import UserProfile, Event, RSVP, Review
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework_simplejwt.tokens import AccessToken
+from .models import UserProfile, Event, EventDailyStats, EventRatingSummary, RSVP, Review
+from .acl import invited_event_ids
+from .authentication import CachedJWTAuthentication, bump_user_stamps
+from .benchmarking import compare_reports, percentile
+from . import metrics
+from .metrics import RequestMetricsMiddleware, registry
+from .provisioning import provision_users
+from .recurrence import occurrence_starts, window_filter
+from .scheduling import overlap_groups
+from .seeding import seed_dataset
+from .permissions import IsInvitedToPrivateEvent, IsOrganizerOrReadOnly
+from .pubsub import FileBroker, make_stream_token
+from .renderers import FastJSONParser, FastJSONRenderer
+from .serializers import EventSerializer, ReviewSerializer, RSVPSerializer
+from .views import RSVPViewSet
 
 
 class UserProfileModelTest(TestCase):
@@ -312,3 +346,1622 @@ class AuthenticationAPITest(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertIn('access', response.data)
         self.assertIn('refresh', response.data)
+
+
+class EventCounterTest(APITestCase):
+    """Test cases for the denormalized RSVP and review counters"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.organizer = User.objects.create_user(username='organizer', password='testpass123')
+        self.event = Event.objects.create(
+            title='Test Event',
+            description='Description',
+            organizer=self.organizer,
+            location='Location',
+            start_time=timezone.now() + timedelta(days=1),
+            end_time=timezone.now() + timedelta(days=1, hours=2),
+            is_public=True
+        )
+        self.client.force_authenticate(user=self.user)
+
+    def test_rsvp_updates_counters(self):
+        """Test RSVP writes move the stored status counters"""
+        self.client.post(f'/api/events/{self.event.id}/rsvp/', {'status': 'going'}, format='json')
+        response = self.client.post(f'/api/events/{self.event.id}/rsvp/', {'status': 'maybe'}, format='json')
+        self.assertEqual(response.data['event']['rsvp_count'], 0)
+        self.assertEqual(response.data['event']['maybe_count'], 1)
+
+        rsvp = RSVP.objects.get(event=self.event, user=self.user)
+        self.client.delete(f'/api/rsvps/{rsvp.id}/')
+        self.event.refresh_from_db()
+        self.assertEqual((self.event.going_count, self.event.maybe_count), (0, 0))
+
+    def test_review_updates_counters(self):
+        """Test review writes move the stored rating counters"""
+        response = self.client.post(
+            f'/api/events/{self.event.id}/review/', {'rating': 4, 'comment': 'Good'}, format='json'
+        )
+        self.assertEqual(response.data['event']['average_rating'], 4)
+        self.client.patch(f'/api/reviews/{response.data["id"]}/', {'rating': 2}, format='json')
+        self.event.refresh_from_db()
+        self.assertEqual((self.event.review_count, self.event.rating_sum), (1, 2))
+
+    def test_stale_instances_do_not_double_count(self):
+        """Test updates and deletes take the old values from the locked row"""
+        self.client.post(f'/api/events/{self.event.id}/rsvp/', {'status': 'going'}, format='json')
+        stale = RSVP.objects.get(event=self.event, user=self.user)
+        self.client.post(f'/api/events/{self.event.id}/rsvp/', {'status': 'maybe'}, format='json')
+
+        view = RSVPViewSet(request=None, format_kwarg=None)
+        serializer = RSVPSerializer(stale, data={'status': 'not_going'}, partial=True)
+        serializer.is_valid(raise_exception=True)
+        view.perform_update(serializer)
+        self.event.refresh_from_db()
+        self.assertEqual((self.event.going_count, self.event.maybe_count, self.event.not_going_count), (0, 0, 1))
+
+        again = RSVP.objects.get(pk=stale.pk)
+        view.perform_destroy(stale)
+        view.perform_destroy(again)
+        self.event.refresh_from_db()
+        self.assertEqual((self.event.going_count, self.event.maybe_count, self.event.not_going_count), (0, 0, 0))
+
+    def test_reconcile_repairs_drift(self):
+        """Test the reconcile command repairs counters written around the API"""
+        RSVP.objects.create(event=self.event, user=self.user, status='going')
+        Review.objects.create(event=self.event, user=self.user, rating=5, comment='Great')
+        call_command('reconcile_event_counters', stdout=StringIO())
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.going_count, 1)
+        self.assertEqual((self.event.review_count, self.event.rating_sum), (1, 5))
+
+
+class EventQueryCountTest(APITestCase):
+    """Test cases for the annotated event list/detail queries"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.invitee = User.objects.create_user(username='invitee', password='testpass123')
+        for i in range(12):
+            event = Event.objects.create(
+                title=f'Event {i}',
+                description='Description',
+                organizer=self.user,
+                location='Location',
+                start_time=timezone.now() + timedelta(days=i + 1),
+                end_time=timezone.now() + timedelta(days=i + 1, hours=2),
+                is_public=True
+            )
+            event.invited_users.add(self.invitee)
+            RSVP.objects.create(event=event, user=self.user, status='maybe')
+        self.client.force_authenticate(user=self.user)
+
+    def test_list_query_count_is_constant(self):
+        """Test a cold page costs access list + count and page per branch + missing rows + invitees"""
+        with self.assertNumQueries(7):
+            response = self.client.get('/api/events/')
+        self.assertEqual(len(response.data['results']), 10)
+        self.assertEqual(response.data['results'][0]['user_rsvp_status'], 'maybe')
+        self.assertEqual(response.data['results'][0]['invited_users'], [self.invitee.id])
+
+    def test_warm_list_is_assembled_from_cached_fragments(self):
+        """Test a warm page only runs the count and page queries of each branch"""
+        first = self.client.get('/api/events/')
+        with self.assertNumQueries(4):
+            second = self.client.get('/api/events/')
+        self.assertEqual(second.data, first.data)
+
+
+class EventFragmentCacheTest(APITestCase):
+    """Test cases for fragment cache invalidation"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.other = User.objects.create_user(username='other', password='testpass123')
+        self.event = Event.objects.create(
+            title='Cached Event',
+            description='Description',
+            organizer=self.other,
+            location='Location',
+            start_time=timezone.now() + timedelta(days=1),
+            end_time=timezone.now() + timedelta(days=1, hours=2),
+            is_public=True
+        )
+        self.client.force_authenticate(user=self.user)
+        self.url = f'/api/events/{self.event.id}/'
+        self.client.get(self.url)
+
+    def test_event_edit_invalidates(self):
+        """Test saving an event replaces its cached fragment"""
+        self.event.title = 'Renamed'
+        self.event.save()
+        self.assertEqual(self.client.get(self.url).data['title'], 'Renamed')
+
+    def test_rsvp_and_invitation_invalidate(self):
+        """Test RSVPs and invitee changes show up immediately"""
+        self.client.post(f'{self.url}rsvp/', {'status': 'going'}, format='json')
+        self.event.invited_users.add(self.user)
+        data = self.client.get(self.url).data
+        self.assertEqual(data['rsvp_count'], 1)
+        self.assertEqual(data['user_rsvp_status'], 'going')
+        self.assertEqual(data['invited_users'], [self.user.id])
+
+    def test_per_user_status_is_not_shared(self):
+        """Test one user's RSVP status never leaks into another's response"""
+        self.client.post(f'{self.url}rsvp/', {'status': 'maybe'}, format='json')
+        self.client.get(self.url)
+        self.client.force_authenticate(user=self.other)
+        self.assertIsNone(self.client.get(self.url).data['user_rsvp_status'])
+
+    def test_organizer_rename_invalidates(self):
+        """Test nested organizer details follow user edits"""
+        self.other.username = 'renamed'
+        self.other.save()
+        self.assertEqual(self.client.get(self.url).data['organizer']['username'], 'renamed')
+
+    def test_organizer_rename_changes_validators(self):
+        """Test an organizer rename turns 304s into fresh lists and details"""
+        etags = {url: self.client.get(url)['ETag'] for url in (self.url, '/api/events/')}
+        self.other.username = 'renamed'
+        self.other.save()
+        for url, etag in etags.items():
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            organizer = response.data['organizer'] if url == self.url else response.data['results'][0]['organizer']
+            self.assertEqual(organizer['username'], 'renamed')
+
+    def test_counter_repair_invalidates(self):
+        """Test reconcile_event_counters replaces the fragment and the validators it repairs"""
+        RSVP.objects.bulk_create([RSVP(event=self.event, user=self.other, status='going')])
+        etag = self.client.get(self.url)['ETag']
+        call_command('reconcile_event_counters', stdout=StringIO())
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['rsvp_count'], 1)
+
+
+class EventVisibilityTest(APITestCase):
+    """Test cases for private event visibility"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.organizer = User.objects.create_user(username='organizer', password='testpass123')
+        self.invitee = User.objects.create_user(username='invitee', password='testpass123')
+        self.other = User.objects.create_user(username='other', password='testpass123')
+        self.private_event = Event.objects.create(
+            title='Private Event',
+            description='Description',
+            organizer=self.organizer,
+            location='Location',
+            start_time=timezone.now() + timedelta(days=1),
+            end_time=timezone.now() + timedelta(days=1, hours=2),
+            is_public=False
+        )
+        self.private_event.invited_users.add(self.invitee, self.other)
+        self.private_event.invited_users.remove(self.other)
+
+    def test_invited_user_sees_private_event_once(self):
+        """Test invitees see a private event without duplicate rows"""
+        self.client.force_authenticate(user=self.invitee)
+        response = self.client.get('/api/events/')
+        self.assertEqual([e['id'] for e in response.data['results']], [self.private_event.id])
+
+    def test_uninvited_user_cannot_see_private_event(self):
+        """Test private events are hidden from everyone else"""
+        self.client.force_authenticate(user=self.other)
+        response = self.client.get('/api/events/')
+        self.assertEqual(response.data['count'], 0)
+        response = self.client.get(f'/api/events/{self.private_event.id}/')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_pages_merge_public_and_private_events(self):
+        """Test pages interleave public events with the private events a user may see"""
+        now = timezone.now()
+        for day in range(1, 6):
+            Event.objects.create(
+                title=f'Public {day}', description='Description', organizer=self.other, location='Location',
+                start_time=now + timedelta(days=day, hours=1), end_time=now + timedelta(days=day, hours=2),
+                is_public=True
+            )
+        own = Event.objects.create(
+            title='Own Private', description='Description', organizer=self.invitee, location='Location',
+            start_time=now + timedelta(days=3, hours=12), end_time=now + timedelta(days=3, hours=13),
+            is_public=False
+        )
+        expected = list(Event.objects.visible_to(self.invitee).order_by('-start_time').values_list('id', flat=True))
+        self.assertEqual(len(expected), 7)
+        self.assertIn(own.id, expected)
+
+        self.client.force_authenticate(user=self.invitee)
+        pages = [self.client.get('/api/events/', {'page': page, 'page_size': 3}) for page in (1, 2, 3)]
+        self.assertEqual([page.data['count'] for page in pages], [7, 7, 7])
+        self.assertEqual([e['id'] for page in pages for e in page.data['results']], expected)
+        response = self.client.get('/api/events/', {'ordering': 'title', 'page_size': 4, 'page': 2})
+        self.assertEqual([e['title'] for e in response.data['results']],
+                         ['Public 3', 'Public 4', 'Public 5'])
+
+    def test_access_list_follows_invitation_changes(self):
+        """Test cached access lists are dropped when invitations change"""
+        self.client.force_authenticate(user=self.invitee)
+        url = f'/api/events/{self.private_event.id}/'
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_200_OK)
+        self.invitee.invited_events.remove(self.private_event)
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_404_NOT_FOUND)
+        self.private_event.invited_users.add(self.invitee)
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_200_OK)
+        self.private_event.invited_users.clear()
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_permission_checks_use_the_access_list(self):
+        """Test object permissions run no queries once the access list is cached"""
+        request = APIRequestFactory().post('/')
+        request.user = self.invitee
+        event = Event.objects.get(pk=self.private_event.pk)
+        invited_event_ids(self.invitee)
+        with self.assertNumQueries(0):
+            self.assertTrue(IsInvitedToPrivateEvent().has_object_permission(request, None, event))
+            self.assertFalse(IsOrganizerOrReadOnly().has_object_permission(request, None, event))
+
+
+class KeysetPaginationTest(APITestCase):
+    """Test cases for cursor pagination"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        start = timezone.now() + timedelta(days=1)
+        for i in range(25):
+            Event.objects.create(
+                title=f'Event {i}',
+                description='Description',
+                organizer=self.user,
+                location='Location',
+                # Pairs of events share a start time to exercise the id tie-breaker
+                start_time=start + timedelta(hours=i // 2),
+                end_time=start + timedelta(hours=i // 2 + 1),
+                is_public=True
+            )
+        self.client.force_authenticate(user=self.user)
+
+    def test_cursor_pages_cover_all_events(self):
+        """Test following next links visits every event once, in order"""
+        expected = list(Event.objects.order_by('-start_time', '-id').values_list('id', flat=True))
+        seen = []
+        url = '/api/events/?pagination=cursor'
+        while url:
+            response = self.client.get(url)
+            self.assertNotIn('count', response.data)
+            seen.extend(e['id'] for e in response.data['results'])
+            url = response.data['next']
+        self.assertEqual(seen, expected)
+
+    def test_previous_link_returns_prior_page(self):
+        """Test previous links walk back to the same page"""
+        first = self.client.get('/api/events/?pagination=cursor')
+        second = self.client.get(first.data['next'])
+        back = self.client.get(second.data['previous'])
+        self.assertEqual(
+            [e['id'] for e in back.data['results']],
+            [e['id'] for e in first.data['results']]
+        )
+        self.assertIsNone(back.data['previous'])
+
+    def test_page_number_mode_is_default(self):
+        """Test page-number responses are unchanged without the opt-in"""
+        response = self.client.get('/api/events/?page=3')
+        self.assertEqual(response.data['count'], 25)
+        self.assertEqual(len(response.data['results']), 5)
+
+
+class EventSearchTest(APITestCase):
+    """Test cases for full-text event search"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.other = User.objects.create_user(username='other', password='testpass123')
+
+        def make_event(title, description, is_public=True):
+            return Event.objects.create(
+                title=title,
+                description=description,
+                organizer=self.other,
+                location='Location',
+                start_time=timezone.now() + timedelta(days=1),
+                end_time=timezone.now() + timedelta(days=1, hours=2),
+                is_public=is_public
+            )
+
+        self.python_meetup = make_event('Python Meetup', 'Talks about python and python tooling')
+        self.jazz_night = make_event('Jazz Night', 'Live music, some python trivia')
+        self.private_python = make_event('Private Python Workshop', 'Invite only', is_public=False)
+        self.client.force_authenticate(user=self.user)
+
+    def test_search_ranks_and_prefix_matches(self):
+        """Test prefix terms match and stronger matches rank first"""
+        response = self.client.get('/api/events/', {'search': 'pyth'})
+        ids = [e['id'] for e in response.data['results']]
+        self.assertEqual(ids, [self.python_meetup.id, self.jazz_night.id])
+
+    def test_search_respects_visibility_and_edits(self):
+        """Test private events stay hidden and edits are re-indexed"""
+        self.private_python.invited_users.add(self.user)
+        self.jazz_night.title = 'Blues Night'
+        self.jazz_night.save()
+        response = self.client.get('/api/events/', {'search': 'blues'})
+        self.assertEqual([e['id'] for e in response.data['results']], [self.jazz_night.id])
+        response = self.client.get('/api/events/', {'search': 'workshop'})
+        self.assertEqual([e['id'] for e in response.data['results']], [self.private_python.id])
+
+
+class IndexAdvisorTest(TestCase):
+    """Test cases for the index_advisor command"""
+
+    def test_reports_every_endpoint_query(self):
+        """Test the advisor replays the viewset querysets and emits JSON"""
+        user = User.objects.create_user(username='testuser', password='testpass123')
+        Event.objects.create(
+            title='Test Event',
+            description='Description',
+            organizer=user,
+            location='Location',
+            start_time=timezone.now() + timedelta(days=1),
+            end_time=timezone.now() + timedelta(days=1, hours=2),
+        )
+        out = StringIO()
+        call_command('index_advisor', user='testuser', json=True, stdout=out)
+        report = json.loads(out.getvalue())
+        queries = [entry['query'] for entry in report['queries']]
+        self.assertIn('events list (page)', queries)
+        self.assertIn('event reviews (validators)', queries)
+        self.assertIn('rsvps list', queries)
+        self.assertIn('reviews list ?event_id=', queries)
+
+
+class BulkRSVPAPITest(APITestCase):
+    """Test cases for the bulk RSVP endpoint"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.organizer = User.objects.create_user(username='organizer', password='testpass123')
+        self.events = [
+            Event.objects.create(
+                title=f'Event {i}',
+                description='Description',
+                organizer=self.organizer,
+                location='Location',
+                start_time=timezone.now() + timedelta(days=1),
+                end_time=timezone.now() + timedelta(days=1, hours=2),
+                is_public=i != 3
+            )
+            for i in range(4)
+        ]
+        RSVP.objects.create(event=self.events[1], user=self.user, status='going')
+        RSVP.objects.create(event=self.events[2], user=self.user, status='maybe')
+        call_command('reconcile_event_counters', stdout=StringIO())
+        self.client.force_authenticate(user=self.user)
+
+    def test_bulk_rsvp_reports_each_item(self):
+        """Test creates, updates, no-ops and errors are reported per item"""
+        items = [
+            {'event_id': self.events[0].id, 'status': 'going'},
+            {'event_id': self.events[1].id, 'status': 'maybe'},
+            {'event_id': self.events[2].id, 'status': 'maybe'},
+            {'event_id': self.events[3].id, 'status': 'going'},
+            {'event_id': self.events[0].id, 'status': 'maybe'},
+            {'event_id': self.events[0].id, 'status': 'bogus'},
+        ]
+        response = self.client.post('/api/rsvps/bulk/', {'rsvps': items}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = response.data['results']
+        self.assertEqual(
+            [r.get('result') for r in results[:3]],
+            ['created', 'updated', 'unchanged']
+        )
+        self.assertEqual(results[3]['error'], 'Event not found')
+        self.assertIn('error', results[4])
+        self.assertIn('errors', results[5])
+
+        self.assertEqual(RSVP.objects.get(event=self.events[1], user=self.user).status, 'maybe')
+        self.assertFalse(RSVP.objects.filter(event=self.events[3]).exists())
+        self.events[1].refresh_from_db()
+        self.assertEqual((self.events[1].going_count, self.events[1].maybe_count), (0, 1))
+        self.events[0].refresh_from_db()
+        self.assertEqual(self.events[0].going_count, 1)
+
+
+class ExportImportTest(APITestCase):
+    """Test cases for streaming export and the import_events command"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.tmpdir = tempfile.mkdtemp()
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tmpdir, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.client = APIClient()
+        self.admin = User.objects.create_user(username='admin', password='testpass123', is_staff=True)
+        self.event = Event.objects.create(
+            title='Exported, "quoted" Event',
+            description='Description',
+            organizer=self.admin,
+            location='Location',
+            start_time=timezone.now() + timedelta(days=1),
+            end_time=timezone.now() + timedelta(days=1, hours=2),
+            is_public=False
+        )
+        self.event.invited_users.add(self.admin)
+        Review.objects.create(event=self.event, user=self.admin, rating=4, comment='Good')
+        self.client.force_authenticate(user=self.admin)
+
+    def download(self, table, fmt):
+        response = self.client.get(f'/api/export/{table}/', {'fmt': fmt})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return b''.join(response.streaming_content).decode()
+
+    def test_export_requires_staff(self):
+        """Test non-staff users cannot dump tables"""
+        self.client.force_authenticate(user=User.objects.create_user(username='plain', password='x'))
+        response = self.client.get('/api/export/events/')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_round_trip(self):
+        """Test exported NDJSON and CSV files import back into an empty database"""
+        files = {}
+        for table, fmt in (('events', 'csv'), ('invitations', 'ndjson'), ('reviews', 'ndjson')):
+            path = os.path.join(self.tmpdir, f'{table}.{fmt}')
+            with open(path, 'w', encoding='utf-8') as handle:
+                handle.write(self.download(table, fmt))
+            files[table] = path
+        original_created = self.event.created_at
+        review_created = Review.objects.get().created_at
+        Event.objects.all().delete()
+        self.assertEqual(invited_event_ids(self.admin), frozenset())
+
+        call_command('import_events', stdout=StringIO(), **files)
+        event = Event.objects.get(pk=self.event.pk)
+        self.assertEqual(event.title, 'Exported, "quoted" Event')
+        self.assertFalse(event.is_public)
+        self.assertEqual(event.created_at, original_created)
+        self.assertEqual(Review.objects.get().created_at, review_created)
+        self.assertEqual(list(event.invited_users.all()), [self.admin])
+        self.assertEqual((event.review_count, event.rating_sum), (1, 4))
+        # Rollups are rebuilt and the cached access list dropped
+        self.assertEqual(EventDailyStats.objects.get(event=event).reviews_written, 1)
+        self.assertEqual(invited_event_ids(self.admin), frozenset([event.pk]))
+
+
+class ConditionalGetTest(APITestCase):
+    """Test cases for ETag / Last-Modified handling"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.event = Event.objects.create(
+            title='Test Event',
+            description='Description',
+            organizer=self.user,
+            location='Location',
+            start_time=timezone.now() + timedelta(days=1),
+            end_time=timezone.now() + timedelta(days=1, hours=2),
+            is_public=True
+        )
+        self.client.force_authenticate(user=self.user)
+
+    def test_matching_etag_skips_the_page(self):
+        """Test a repeat list request with If-None-Match gets a bare 304"""
+        first = self.client.get('/api/events/')
+        self.assertIn('ETag', first)
+        # A COUNT and a page per visibility branch; nothing over the whole set
+        with self.assertNumQueries(4):
+            second = self.client.get('/api/events/', HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(second.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        first = self.client.get('/api/events/', {'pagination': 'cursor'})
+        with self.assertNumQueries(1):
+            second = self.client.get('/api/events/', {'pagination': 'cursor'}, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(second.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_page_etag_follows_the_page(self):
+        """Test list ETags change with the rows and links of the page served"""
+        etag = self.client.get('/api/events/', {'page_size': 1})['ETag']
+        Event.objects.create(
+            title='Earlier Event', description='Description', organizer=self.user, location='Location',
+            start_time=timezone.now() + timedelta(hours=1), end_time=timezone.now() + timedelta(hours=2),
+        )
+        # Same row, but the count and next link changed
+        response = self.client.get('/api/events/', {'page_size': 1}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn('Last-Modified', response)
+
+    def test_writes_change_the_etag(self):
+        """Test RSVPs, reviews and invitations invalidate the validators"""
+        for url in (f'/api/events/{self.event.id}/', '/api/events/', f'/api/events/{self.event.id}/reviews/'):
+            etag = self.client.get(url)['ETag']
+            self.client.post(f'/api/events/{self.event.id}/rsvp/', {'status': 'maybe'}, format='json')
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_200_OK)
+            RSVP.objects.all().delete()
+
+        etag = self.client.get(f'/api/events/{self.event.id}/reviews/')['ETag']
+        Review.objects.create(event=self.event, user=self.user, rating=3, comment='Fine')
+        response = self.client.get(f'/api/events/{self.event.id}/reviews/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        etag = self.client.get(f'/api/events/{self.event.id}/')['ETag']
+        self.event.invited_users.add(User.objects.create_user(username='invitee', password='x'))
+        response = self.client.get(f'/api/events/{self.event.id}/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_etag_is_per_user(self):
+        """Test another user's cached copy is not revalidated"""
+        etag = self.client.get(f'/api/events/{self.event.id}/')['ETag']
+        self.client.force_authenticate(user=User.objects.create_user(username='other', password='x'))
+        response = self.client.get(f'/api/events/{self.event.id}/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+class SparseFieldsetsTest(APITestCase):
+    """Test ?fields= and ?omit= on read endpoints"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        for i in range(3):
+            event = Event.objects.create(
+                title=f'Event {i}',
+                description='Description',
+                organizer=self.user,
+                location='Location',
+                start_time=timezone.now() + timedelta(days=i + 1),
+                end_time=timezone.now() + timedelta(days=i + 1, hours=2),
+                is_public=True
+            )
+        self.client.force_authenticate(user=self.user)
+        for event in Event.objects.all():
+            self.client.post(f'/api/events/{event.id}/rsvp/', {'status': 'going'}, format='json')
+
+    def test_fields_selects_nested_keys(self):
+        """Test only the requested fields, including nested ones, are returned"""
+        with self.assertNumQueries(3):
+            response = self.client.get('/api/rsvps/', {'fields': 'id,status,event.title'})
+        results = response.data['results']
+        self.assertEqual(len(results), 3)
+        for item in results:
+            self.assertEqual(set(item), {'id', 'status', 'event'})
+            self.assertEqual(set(item['event']), {'title'})
+
+    def test_omit_drops_fields(self):
+        """Test omitted fields are left out and the rest are unchanged"""
+        full = self.client.get('/api/events/').data['results']
+        sparse = self.client.get('/api/events/', {'omit': 'organizer,invited_users,description'}).data['results']
+        for whole, part in zip(full, sparse):
+            self.assertEqual(set(whole) - set(part), {'organizer', 'invited_users', 'description'})
+            self.assertEqual({key: whole[key] for key in part}, part)
+
+    def test_fields_on_event_detail(self):
+        """Test computed fields still read their source columns"""
+        event = Event.objects.first()
+        response = self.client.get(f'/api/events/{event.id}/', {'fields': 'rsvp_count,user_rsvp_status'})
+        self.assertEqual(response.data, {'rsvp_count': 1, 'user_rsvp_status': 'going'})
+
+
+class FastJSONTest(APITestCase):
+    """Test the orjson renderer/parser and the values() list fast paths"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='testuser', password='testpass123', first_name='Zoë', email='t@example.com'
+        )
+        self.other = User.objects.create_user(username='other', password='testpass123')
+        for i in range(3):
+            event = Event.objects.create(
+                title=f'Event {i}\u2028ünïcode',
+                description='Description',
+                organizer=self.other if i else self.user,
+                location='Location',
+                start_time=timezone.now() + timedelta(days=i + 1),
+                end_time=timezone.now() + timedelta(days=i + 1, hours=2),
+                is_public=bool(i)
+            )
+            event.invited_users.add(self.other, self.user)
+        self.client.force_authenticate(user=self.user)
+        event = Event.objects.order_by('pk').last()
+        self.client.post(f'/api/events/{event.id}/rsvp/', {'status': 'maybe'}, format='json')
+        self.client.post(f'/api/events/{event.id}/review/', {'rating': 4, 'comment': 'Good'}, format='json')
+        self.client.force_authenticate(user=self.other)
+        self.client.post(f'/api/events/{event.id}/review/', {'rating': 3, 'comment': 'Fine'}, format='json')
+        self.client.force_authenticate(user=self.user)
+
+    def request_context(self, path):
+        request = Request(APIRequestFactory().get(path))
+        request.user = self.user
+        return {'request': request}
+
+    def test_renderer_matches_drf(self):
+        """Test byte-for-byte output against DRF's JSONRenderer"""
+        data = {
+            'when': timezone.now(),
+            'day': timezone.now().date(),
+            'price': Decimal('12.50'),
+            'text': 'line\u2028break\u2029 ünïcode',
+            'nested': [{1: None, 'ok': True}, (1.5, 'x')],
+            'big': 2 ** 70,
+        }
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+        self.assertEqual(
+            FastJSONRenderer().render(data, 'application/json; indent=4'),
+            JSONRenderer().render(data, 'application/json; indent=4')
+        )
+        self.assertEqual(FastJSONRenderer().render(None), b'')
+
+    def test_renderer_rejects_non_finite_floats(self):
+        """Test NaN and Infinity raise like DRF's strict renderer instead of becoming null"""
+        for value in (float('nan'), float('inf'), float('-inf')):
+            data = {'ok': None, 'nested': [{'score': value}]}
+            with self.assertRaises(ValueError) as drf:
+                JSONRenderer().render(data)
+            with self.assertRaises(ValueError) as fast:
+                FastJSONRenderer().render(data)
+            self.assertEqual(str(fast.exception), str(drf.exception))
+        data = {'ok': None, 'score': 1.5}
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_parser_matches_drf(self):
+        """Test parsing and parse errors match DRF's JSONParser"""
+        body = json.dumps({'status': 'going', 'items': [1, 2.5, None, 'ü']}).encode()
+        self.assertEqual(FastJSONParser().parse(BytesIO(body)), JSONParser().parse(BytesIO(body)))
+        for bad in (b'{"a": ', b'{"a": NaN}'):
+            with self.assertRaises(ParseError):
+                FastJSONParser().parse(BytesIO(bad))
+
+    def test_event_list_matches_serializer(self):
+        """Test the fast event list renders exactly like EventSerializer"""
+        response = self.client.get('/api/events/')
+        events = Event.objects.visible_to(self.user).with_user_rsvp_status(self.user)
+        expected = EventSerializer(events, many=True, context=self.request_context('/api/events/')).data
+        self.assertEqual(len(expected), 3)
+        self.assertEqual(JSONRenderer().render(response.data['results']), JSONRenderer().render(expected))
+        # Warm fragments give the same bytes
+        self.assertEqual(self.client.get('/api/events/').content, response.content)
+
+    def test_review_list_matches_serializer(self):
+        """Test the fast review list renders exactly like ReviewSerializer"""
+        for params in ({}, {'pagination': 'cursor', 'page_size': 1}):
+            response = self.client.get('/api/reviews/', params)
+            reviews = Review.objects.select_related('user').prefetch_related(
+                Prefetch('event', queryset=Event.objects.with_user_rsvp_status(self.user))
+            )[:params.get('page_size', 10)]
+            expected = ReviewSerializer(reviews, many=True, context=self.request_context('/api/reviews/')).data
+            self.assertEqual(JSONRenderer().render(response.data['results']), JSONRenderer().render(expected))
+        self.assertIsNotNone(response.data['next'])
+        self.assertEqual(len(self.client.get(response.data['next']).data['results']), 1)
+
+
+class AsyncViewsTest(APITestCase):
+    """Test the async endpoints return the same bodies as the DRF views"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.other = User.objects.create_user(username='other', password='testpass123')
+        UserProfile.objects.create(user=self.user, full_name='Test User')
+        self.events = []
+        for i in range(3):
+            event = Event.objects.create(
+                title=f'Event {i}',
+                description='Description',
+                organizer=self.other,
+                location='Location',
+                start_time=timezone.now() + timedelta(days=i + 1),
+                end_time=timezone.now() + timedelta(days=i + 1, hours=2),
+                is_public=i != 0
+            )
+            self.events.append(event)
+        self.secret = self.events[0]
+        self.token = f'Bearer {AccessToken.for_user(self.user)}'
+        self.auth = {'HTTP_AUTHORIZATION': self.token}
+        self.client.post(f'/api/events/{self.events[1].id}/rsvp/', {'status': 'going'}, format='json', **self.auth)
+        self.client.post(
+            f'/api/events/{self.events[1].id}/review/', {'rating': 5, 'comment': 'Great'}, format='json', **self.auth
+        )
+
+    async def test_matches_sync_responses(self):
+        """Test list, detail, reviews and me against the sync endpoints"""
+        event = self.events[1]
+        for path in (
+            '/events/', '/events/?is_public=true&ordering=title', '/events/?fields=id,title',
+            f'/events/{event.id}/', f'/events/{event.id}/reviews/', '/auth/me/',
+        ):
+            for token in (None, self.token):
+                headers = {'Authorization': token} if token else {}
+                sync = await sync_to_async(self.client.get)(f'/api{path}', headers=headers)
+                response = await self.async_client.get(f'/api/async{path}', headers=headers)
+                self.assertEqual(response.status_code, sync.status_code, path)
+                self.assertEqual(response.content, sync.content, path)
+
+    async def test_cursor_pages_and_conditional_get(self):
+        """Test cursor pagination and 304s on the async list"""
+        first = await self.async_client.get('/api/async/events/', {'pagination': 'cursor', 'page_size': 1})
+        self.assertEqual(len(first.json()['results']), 1)
+        second = await self.async_client.get(first.json()['next'])
+        self.assertNotEqual(second.json()['results'], first.json()['results'])
+        repeat = await self.async_client.get('/api/async/events/', headers={'If-None-Match': first['ETag']})
+        self.assertEqual(repeat.status_code, status.HTTP_200_OK)
+        etag = (await self.async_client.get('/api/async/events/'))['ETag']
+        repeat = await self.async_client.get('/api/async/events/', headers={'If-None-Match': etag})
+        self.assertEqual(repeat.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    async def test_errors(self):
+        """Test bad tokens, hidden events and unsafe methods"""
+        response = await self.async_client.get('/api/async/auth/me/', headers={'Authorization': 'Bearer nope'})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertIn('WWW-Authenticate', response)
+        headers = {'Authorization': self.token}
+        response = await self.async_client.get(f'/api/async/events/{self.secret.id}/', headers=headers)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        response = await self.async_client.post('/api/async/events/', headers=headers)
+        self.assertEqual(response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+
+
+class EventStreamTest(APITestCase):
+    """Test the server-sent event stream and the pub/sub brokers"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.event = Event.objects.create(
+            title='Live Event',
+            description='Description',
+            organizer=self.user,
+            location='Location',
+            start_time=timezone.now() + timedelta(days=1),
+            end_time=timezone.now() + timedelta(days=1, hours=2),
+            is_public=False
+        )
+        self.token = str(AccessToken.for_user(self.user))
+        self.client.force_authenticate(user=self.user)
+
+    def write(self, path, data):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(path, data, format='json')
+
+    async def test_stream_sends_snapshot_and_deltas(self):
+        """Test counts and new reviews reach a connected client"""
+        url = (await sync_to_async(self.client.get)(f'/api/events/{self.event.id}/stream/token/')).data['url']
+        self.assertNotIn(self.token, url)
+        response = await self.async_client.get(url)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        stream = aiter(response.streaming_content)
+        snapshot = (await anext(stream)).decode()
+        self.assertIn('event: counts', snapshot)
+        self.assertIn('"rsvp_count":0', snapshot)
+
+        await sync_to_async(self.write)(f'/api/events/{self.event.id}/rsvp/', {'status': 'going'})
+        self.assertIn('"rsvp_count":1', (await anext(stream)).decode())
+
+        await sync_to_async(self.write)(f'/api/events/{self.event.id}/review/', {'rating': 4, 'comment': 'Nice'})
+        messages = [(await anext(stream)).decode() for _ in range(2)]
+        review_id = await Review.objects.values_list('id', flat=True).aget()
+        self.assertTrue(any('event: review' in m and f'"id":{review_id}' in m for m in messages))
+        self.assertTrue(any('"average_rating":4.0' in m for m in messages))
+
+    def test_unwatched_writes_are_not_published(self):
+        """Test counts and reviews for events nobody streams never reach the broker"""
+        broker = mock.Mock()
+        broker.has_subscribers.return_value = False
+        with mock.patch('api.pubsub.get_broker', return_value=broker):
+            self.write(f'/api/events/{self.event.id}/rsvp/', {'status': 'going'})
+            self.write(f'/api/events/{self.event.id}/review/', {'rating': 4, 'comment': 'Nice'})
+        self.assertEqual(broker.has_subscribers.call_count, 3)
+        broker.publish.assert_not_called()
+
+    async def test_private_stream_needs_access(self):
+        """Test anonymous clients cannot stream a private event"""
+        response = await self.async_client.get(f'/api/events/{self.event.id}/stream/')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    async def test_stream_tokens_are_scoped_and_expire(self):
+        """Test access tokens, other events' tokens and expired tokens do not open a stream"""
+        url = f'/api/events/{self.event.id}/stream/'
+        response = await self.async_client.get(url, {'token': self.token})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        other = await sync_to_async(make_stream_token)(self.user, self.event.id + 1)
+        response = await self.async_client.get(url, {'token': other})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        token = await sync_to_async(make_stream_token)(self.user, self.event.id)
+        with override_settings(EVENT_STREAM_TOKEN_MAX_AGE=-1):
+            response = await self.async_client.get(url, {'token': token})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    async def test_file_broker_fans_out(self):
+        """Test messages go through the spool file to local subscribers"""
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        broker = FileBroker(path=os.path.join(directory, 'updates.log'), poll_interval=0.01)
+        subscription = broker.subscribe('event:1')
+        await asyncio.sleep(0.05)
+        broker.publish('event:2', {'type': 'counts', 'n': 0})
+        broker.publish('event:1', {'type': 'counts', 'n': 1})
+        self.assertEqual(await asyncio.wait_for(subscription.get(), timeout=5), {'type': 'counts', 'n': 1})
+        subscription.close()
+
+    async def test_file_broker_tracks_subscribers_and_rotates(self):
+        """Test writers see other processes' subscribers and the spool stays bounded"""
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, 'updates.log')
+        reader = FileBroker(path=path, poll_interval=0.01, max_bytes=300)
+        # A second instance stands in for another worker process
+        writer = FileBroker(path=path, poll_interval=0, max_bytes=300)
+        self.assertFalse(writer.has_subscribers('event:1'))
+
+        subscription = reader.subscribe('event:1')
+        self.assertTrue(writer.has_subscribers('event:1'))
+        self.assertFalse(writer.has_subscribers('event:2'))
+        await asyncio.sleep(0.05)
+        for n in range(20):
+            writer.publish('event:1', {'type': 'counts', 'n': n})
+            await asyncio.sleep(0.02)
+        received = [await asyncio.wait_for(subscription.get(), timeout=5) for _ in range(20)]
+        self.assertEqual([message['n'] for message in received], list(range(20)))
+        self.assertLessEqual(os.path.getsize(path), 400)
+        self.assertTrue(os.path.exists(path + '.1'))
+
+        subscription.close()
+        self.assertFalse(writer.has_subscribers('event:1'))
+
+
+class CachedAuthenticationTest(APITestCase):
+    """Test JWT user resolution and /auth/me/ from the in-process user cache"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123', first_name='Test')
+        self.profile = UserProfile.objects.create(user=self.user, full_name='Test User', bio='Bio')
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.user)}')
+
+    def test_warm_me_runs_no_queries(self):
+        """Test a repeat /auth/me/ is served without touching the database"""
+        first = self.client.get('/api/auth/me/')
+        self.assertEqual(first.data['profile']['full_name'], 'Test User')
+        with self.assertNumQueries(0):
+            second = self.client.get('/api/auth/me/')
+        self.assertEqual(second.content, first.content)
+
+    def test_saves_invalidate(self):
+        """Test user and profile edits show up at once"""
+        self.client.get('/api/auth/me/')
+        self.client.patch(f'/api/profiles/{self.profile.id}/', {'bio': 'New bio'}, format='json')
+        self.assertEqual(self.client.get('/api/auth/me/').data['profile']['bio'], 'New bio')
+
+        self.user.first_name = 'Renamed'
+        self.user.save()
+        self.assertEqual(self.client.get('/api/auth/me/').data['user']['first_name'], 'Renamed')
+
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get('/api/auth/me/').status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_other_processes_changes_are_seen(self):
+        """Test a save elsewhere moves the shared version and drops this process's entry"""
+        self.client.get('/api/auth/me/')
+        # Another process deactivates the user: no signal here, only the shared token moves
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        bump_user_stamps([self.user.pk])
+        self.assertEqual(self.client.get('/api/auth/me/').status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_requests_get_their_own_user_object(self):
+        """Test cached users are copied, so request-level changes do not leak"""
+        token = AccessToken.for_user(self.user)
+        authentication = CachedJWTAuthentication()
+        first = authentication.get_user(token)
+        first.first_name = 'Mutated'
+        with self.assertNumQueries(0):
+            second = authentication.get_user(token)
+        self.assertEqual(second.first_name, 'Test')
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class ProvisionUsersTest(APITestCase):
+    """Test bulk user provisioning through the endpoint, command and process pool"""
+
+    def setUp(self):
+        self.admin = User.objects.create_user(username='admin', email='admin@example.com',
+                                              password='testpass123', is_staff=True)
+        self.records = [
+            {'username': f'member{i}', 'email': f'member{i}@example.com', 'password': f'secret{i}!',
+             'full_name': f'Member {i}', 'location': 'Lab'}
+            for i in range(5)
+        ]
+
+    def test_endpoint_creates_users_and_profiles(self):
+        """Test users are created with hashed passwords and profiles, skipping taken names"""
+        self.client.force_authenticate(user=self.admin)
+        records = self.records + [
+            {'username': 'admin', 'full_name': 'Taken username'},
+            {'username': 'other', 'email': 'admin@example.com', 'full_name': 'Taken email'},
+            {'username': 'member0', 'full_name': 'Repeated'},
+            {'username': 'bad name', 'full_name': 'Invalid'},
+            {'username': 'nopassword', 'full_name': 'No Password'},
+        ]
+        response = self.client.post('/api/auth/provision/', {'users': records}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['created'], 6)
+        self.assertEqual(sorted(response.data['existing']), ['admin', 'other'])
+        self.assertEqual(response.data['duplicates'], ['member0'])
+        self.assertEqual([problem['index'] for problem in response.data['invalid']], [8])
+
+        member = User.objects.get(username='member3')
+        self.assertTrue(member.check_password('secret3!'))
+        self.assertEqual(member.profile.full_name, 'Member 3')
+        self.assertFalse(User.objects.get(username='nopassword').has_usable_password())
+
+    @override_settings(PROVISION_MAX_USERS=3)
+    def test_endpoint_is_capped(self):
+        """Test requests above the in-process cap are refused before hashing"""
+        self.client.force_authenticate(user=self.admin)
+        response = self.client.post('/api/auth/provision/', self.records, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(User.objects.filter(username__startswith='member').exists())
+
+    def test_endpoint_is_admin_only(self):
+        """Test regular users cannot provision"""
+        user = User.objects.create_user(username='regular', password='testpass123')
+        self.client.force_authenticate(user=user)
+        response = self.client.post('/api/auth/provision/', self.records, format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_existing_users_are_found_per_batch(self):
+        """Test skip checks run one query per batch, not per user"""
+        # One lookup plus two inserts for each of the two batches, plus savepoints
+        with self.assertNumQueries(10):
+            report = provision_users(self.records, batch_size=3, workers=1)
+        self.assertEqual(report['created'], 5)
+        self.assertEqual(UserProfile.objects.filter(user__username__startswith='member').count(), 5)
+
+    def test_process_pool_hashing(self):
+        """Test passwords hashed in worker processes verify"""
+        report = provision_users(self.records, batch_size=2, workers=2,
+                                 mp_context=multiprocessing.get_context('fork'))
+        self.assertEqual(report['created'], 5)
+        self.assertTrue(User.objects.get(username='member4').check_password('secret4!'))
+
+    def test_command_reads_file(self):
+        """Test the management command provisions from NDJSON"""
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, 'users.ndjson')
+        with open(path, 'w') as handle:
+            handle.write('\n'.join(json.dumps(record) for record in self.records))
+        out = StringIO()
+        call_command('provision_users', path, workers=1, stdout=out)
+        self.assertIn('users: 5 created', out.getvalue())
+        call_command('provision_users', path, workers=1, stdout=out)
+        self.assertIn('5 existing', out.getvalue())
+
+
+class BenchmarkEndpointsTest(TransactionTestCase):
+    """Test the seeded endpoint benchmark and its baseline comparison"""
+
+    def test_seed_is_deterministic(self):
+        """Test the same seed produces the same events"""
+        seed_dataset(users=10, events=20, seed=7, prefix='a')
+        titles = list(Event.objects.order_by('id').values_list('title', 'location', 'is_public', 'going_count'))
+        Event.objects.all().delete()
+        seed_dataset(users=10, events=20, seed=7, prefix='b')
+        again = list(Event.objects.order_by('id').values_list('title', 'location', 'is_public', 'going_count'))
+        self.assertEqual([(t.replace('[a]', '[b]'), *rest) for t, *rest in titles], again)
+
+    def test_seed_scale_counters_are_consistent(self):
+        """Test generated counters match the generated RSVPs and reviews"""
+        out = StringIO()
+        call_command('seed_scale', users=30, events=60, days_past=30, days_future=30, batch_size=50,
+                     check_constraints=True, json=True, stdout=out)
+        report = json.loads(out.getvalue())
+        self.assertEqual(report['api_event'], 60)
+        self.assertEqual(report['api_rsvp'], RSVP.objects.count())
+        self.assertGreater(report['api_review'], 0)
+        self.assertGreater(report['api_event_invited_users'], 0)
+        self.assertTrue(User.objects.get(username='seed_user_3').check_password('seedpass123'))
+
+        out = StringIO()
+        call_command('reconcile_event_counters', stdout=out)
+        self.assertIn('Repaired 0 with drifted counters and 0 with drifted rating summaries', out.getvalue())
+        rollup_fields = ['event_id', 'organizer_id', 'day', 'going', 'maybe', 'not_going', 'reviews_written',
+                         'review_count', 'rating_sum']
+        seeded = list(EventDailyStats.objects.order_by('event_id', 'day').values_list(*rollup_fields))
+        self.assertTrue(seeded)
+        call_command('backfill_rollups', stdout=StringIO())
+        self.assertEqual(list(EventDailyStats.objects.order_by('event_id', 'day').values_list(*rollup_fields)),
+                         seeded)
+        with self.assertRaises(CommandError):
+            call_command('seed_scale', users=5, events=5, stdout=StringIO())
+
+    def test_benchmark_report(self):
+        """Test a small in-place run reports every requested route without errors"""
+        # One client thread: the in-memory test database fails concurrent writers
+        out = StringIO()
+        routes = ['events_list', 'event_detail', 'event_rsvp', 'event_review', 'auth_me']
+        call_command('benchmark_endpoints', in_place=True, json=True, requests=4, warmup=1, concurrency=1,
+                     users=10, events=20, routes=routes, stdout=out)
+        report = json.loads(out.getvalue())
+        self.assertEqual(list(report['routes']), routes)
+        for stats in report['routes'].values():
+            self.assertEqual(stats['requests'], 4)
+            self.assertEqual(stats['errors'], 0)
+        self.assertGreater(report['routes']['events_list']['queries_per_request'], 0)
+
+    def test_compare_reports(self):
+        """Test regressions are flagged past the tolerance and for any extra query"""
+        baseline = {'routes': {'events_list': {'requests': 10, 'p95_ms': 10.0, 'throughput_rps': 100.0,
+                                               'queries_per_request': 3.0}}}
+        report = {'routes': {'events_list': {'requests': 10, 'p95_ms': 11.0, 'throughput_rps': 70.0,
+                                             'queries_per_request': 4.0},
+                             'auth_me': {'requests': 10, 'p95_ms': 1.0}}}
+        rows, regressions = compare_reports(report, baseline, tolerance=0.2)
+        self.assertEqual(len(rows), 3)
+        self.assertEqual({row['metric'] for row in regressions}, {'throughput_rps', 'queries_per_request'})
+        self.assertEqual(percentile([5, 1, 4, 2, 3], 50), 3)
+
+
+class RequestMetricsTest(APITestCase):
+    """Test Server-Timing, N+1 flagging and the Prometheus endpoint"""
+
+    def setUp(self):
+        registry.reset()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        Event.objects.create(
+            title='Event', description='Description', organizer=self.user, location='Location',
+            start_time=timezone.now() + timedelta(days=1), end_time=timezone.now() + timedelta(days=1, hours=2),
+        )
+
+    def test_server_timing_header(self):
+        """Test responses carry db, serialize, render and total timings"""
+        response = self.client.get('/api/events/')
+        timing = response['Server-Timing']
+        for phase in ('db;dur=', 'serialize;dur=', 'render;dur=', 'total;dur='):
+            self.assertIn(phase, timing)
+        self.assertRegex(timing, r'db;dur=[\d.]+;desc="[1-9]\d* queries"')
+
+    def test_serialization_is_timed_once_per_response(self):
+        """Test a list is measured where the view reads .data, not once per row"""
+        for n in range(3):
+            event = Event.objects.create(
+                title=f'Event {n}', description='Description', organizer=self.user, location='Location',
+                start_time=timezone.now() + timedelta(days=2), end_time=timezone.now() + timedelta(days=2, hours=1),
+            )
+            RSVP.objects.create(event=event, user=self.user, status='going')
+        self.client.force_authenticate(user=self.user)
+        with mock.patch('api.metrics.timed', wraps=metrics.timed) as timed:
+            response = self.client.get('/api/rsvps/')
+        self.assertEqual(len(response.data['results']), 3)
+        self.assertEqual([c.args for c in timed.call_args_list], [('serialize',)])
+
+    def test_repeated_sql_is_flagged(self):
+        """Test one statement run per row is logged as a possible N+1"""
+        def view(request):
+            for user_id in range(6):
+                User.objects.filter(pk=user_id).first()
+            return HttpResponse()
+
+        middleware = RequestMetricsMiddleware(view)
+        with self.assertLogs('api.metrics', 'WARNING') as logs:
+            middleware(RequestFactory().get('/'))
+        self.assertIn('6 x', logs.output[0])
+        self.assertIn('api_request_n_plus_one_total{route="unmatched",method="GET"} 1',
+                      registry.exposition())
+
+    def test_metrics_endpoint(self):
+        """Test per-route histograms are exposed to allowed addresses only"""
+        self.client.get('/api/events/')
+        self.client.get('/api/events/')
+        response = self.client.get('/api/metrics/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        body = response.content.decode()
+        self.assertIn('api_request_duration_seconds_count{route="event-list",method="GET"} 2', body)
+        self.assertIn('api_request_queries_bucket{route="event-list",method="GET",le="+Inf"} 2', body)
+        self.assertIn('api_requests_total{route="event-list",method="GET",status="200"} 2', body)
+        self.assertNotIn('route="metrics"', body)
+
+        response = self.client.get('/api/metrics/', REMOTE_ADDR='203.0.113.9')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class RatingSummaryTest(APITestCase):
+    """Test cases for the incrementally maintained rating summary"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.organizer = User.objects.create_user(username='organizer', password='testpass123')
+        self.users = [User.objects.create_user(username=f'user{i}', password='testpass123') for i in range(3)]
+        self.event = Event.objects.create(
+            title='Test Event',
+            description='Description',
+            organizer=self.organizer,
+            location='Location',
+            start_time=timezone.now() + timedelta(days=1),
+            end_time=timezone.now() + timedelta(days=1, hours=2),
+            is_public=True
+        )
+        self.url = f'/api/events/{self.event.id}/rating-summary/'
+
+    def review(self, user, rating):
+        self.client.force_authenticate(user=user)
+        response = self.client.post(f'/api/events/{self.event.id}/review/', {'rating': rating, 'comment': 'Review'},
+                                    format='json')
+        return response.data['id']
+
+    def test_summary_follows_review_writes(self):
+        """Test creating, editing and deleting reviews moves the histogram and recent ids"""
+        ids = [self.review(user, rating) for user, rating in zip(self.users, [5, 4, 5])]
+        response = self.client.get(self.url)
+        self.assertEqual(response.data['histogram'], {'1': 0, '2': 0, '3': 0, '4': 1, '5': 2})
+        self.assertEqual(response.data['review_count'], 3)
+        self.assertEqual(response.data['average_rating'], 4.67)
+        self.assertEqual(response.data['recent_review_ids'], ids[::-1])
+
+        self.client.patch(f'/api/reviews/{ids[2]}/', {'rating': 1}, format='json')
+        self.client.delete(f'/api/reviews/{ids[2]}/')
+        summary = EventRatingSummary.objects.get(event=self.event)
+        self.assertEqual(summary.histogram, {1: 0, 2: 0, 3: 0, 4: 1, 5: 1})
+        self.assertEqual((summary.review_count, summary.rating_sum), (2, 9))
+        self.assertEqual(summary.recent_review_ids, ids[1::-1])
+
+    def test_summary_is_one_row_read(self):
+        """Test the endpoint answers without touching the reviews table"""
+        self.review(self.users[0], 3)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse([q for q in queries if 'api_review"' in q['sql']])
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag']).status_code,
+                         status.HTTP_304_NOT_MODIFIED)
+
+    def test_unreviewed_event(self):
+        """Test an event without reviews reports an empty summary"""
+        self.client.force_authenticate(user=self.users[0])
+        response = self.client.get(self.url)
+        self.assertEqual(response.data['review_count'], 0)
+        self.assertIsNone(response.data['average_rating'])
+        self.assertEqual(response.data['recent_review_ids'], [])
+
+    def test_reconcile_repairs_summary(self):
+        """Test the reconcile command rebuilds summaries written around the API"""
+        review = Review.objects.create(event=self.event, user=self.users[0], rating=2, comment='Meh')
+        out = StringIO()
+        call_command('reconcile_event_counters', stdout=out)
+        self.assertIn('1 with drifted rating summaries', out.getvalue())
+        summary = EventRatingSummary.objects.get(event=self.event)
+        self.assertEqual((summary.stars_2, summary.review_count, summary.recent_review_ids), (1, 1, [review.id]))
+
+
+class OrganizerStatsTest(APITestCase):
+    """Test cases for the daily rollups and the organizer stats endpoint"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.organizer = User.objects.create_user(username='organizer', password='testpass123')
+        self.users = [User.objects.create_user(username=f'user{i}', password='testpass123') for i in range(2)]
+        self.events = [
+            Event.objects.create(
+                title=f'Event {i}', description='Description', organizer=self.organizer, location='Location',
+                start_time=timezone.now() + timedelta(days=1), end_time=timezone.now() + timedelta(days=1, hours=2),
+            )
+            for i in range(2)
+        ]
+        self.url = f'/api/organizers/{self.organizer.id}/stats/'
+
+    def write_activity(self):
+        first, second = self.events
+        for user, status_value in zip(self.users, ['going', 'maybe']):
+            self.client.force_authenticate(user=user)
+            self.client.post(f'/api/events/{first.id}/rsvp/', {'status': status_value}, format='json')
+        self.client.post(f'/api/events/{first.id}/rsvp/', {'status': 'going'}, format='json')
+        self.client.post(f'/api/events/{second.id}/review/', {'rating': 4, 'comment': 'Good'}, format='json')
+
+    def test_writes_update_todays_rollup(self):
+        """Test RSVP and review writes land as net changes on today's row"""
+        self.write_activity()
+        rollup = EventDailyStats.objects.get(event=self.events[0], day=timezone.localdate())
+        self.assertEqual((rollup.organizer_id, rollup.going, rollup.maybe), (self.organizer.id, 2, 0))
+        rollup = EventDailyStats.objects.get(event=self.events[1])
+        self.assertEqual((rollup.reviews_written, rollup.review_count, rollup.rating_sum), (1, 1, 4))
+
+    def test_stats_endpoint(self):
+        """Test the organizer sees totals, a daily series and per-event activity"""
+        self.write_activity()
+        self.client.force_authenticate(user=self.organizer)
+        response = self.client.get(self.url, {'days': 7})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['events_hosted'], 2)
+        self.assertEqual(response.data['totals']['going'], 2)
+        self.assertEqual(response.data['totals']['average_rating'], 4)
+        self.assertEqual(response.data['daily'], [{
+            'day': timezone.localdate().isoformat(), 'going': 2, 'maybe': 0, 'not_going': 0,
+            'reviews_written': 1, 'review_count': 1, 'rating_sum': 4,
+        }])
+        self.assertEqual([row['event_id'] for row in response.data['events']], [event.id for event in self.events])
+        self.assertEqual(response.data['review_velocity'], round(1 / 7, 3))
+
+    def test_stats_access(self):
+        """Test other users are refused, staff are not, and bad windows are rejected"""
+        self.client.force_authenticate(user=self.users[0])
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_403_FORBIDDEN)
+        self.users[0].is_staff = True
+        self.users[0].save()
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_200_OK)
+        self.assertEqual(self.client.get(self.url, {'days': 0}).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get('/api/organizers/999999/stats/').status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_backfill_rebuilds_rollups(self):
+        """Test the backfill command rebuilds rows for writes made around the API"""
+        RSVP.objects.create(event=self.events[0], user=self.users[0], status='not_going')
+        Review.objects.create(event=self.events[1], user=self.users[1], rating=3, comment='Fine')
+        out = StringIO()
+        call_command('backfill_rollups', stdout=out)
+        self.assertIn('Rebuilt 2 daily rows for 2 events', out.getvalue())
+        self.assertEqual(EventDailyStats.objects.get(event=self.events[0]).not_going, 1)
+        self.assertEqual(EventDailyStats.objects.get(event=self.events[1]).rating_sum, 3)
+
+
+class CalendarFeedTest(APITestCase):
+    """Test cases for the per-user iCalendar feed"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.organizer = User.objects.create_user(username='organizer', password='testpass123')
+
+        def event(title, organizer, is_public=True, days=1):
+            return Event.objects.create(
+                title=title, description='Line one\nLine two, with; punctuation', organizer=organizer,
+                location='Hall', start_time=timezone.now() + timedelta(days=days),
+                end_time=timezone.now() + timedelta(days=days, hours=2), is_public=is_public,
+            )
+
+        self.own = event('Own event', self.user)
+        self.invited = event('Invited event', self.organizer, is_public=False)
+        self.invited.invited_users.add(self.user)
+        self.going = event('Going event', self.organizer, days=2)
+        self.declined = event('Declined event', self.organizer, days=3)
+        self.unrelated = event('Unrelated event', self.organizer, days=4)
+        RSVP.objects.create(event=self.going, user=self.user, status='going')
+        RSVP.objects.create(event=self.declined, user=self.user, status='not_going')
+
+        self.client.force_authenticate(user=self.user)
+        self.feed_url = self.client.get('/api/calendar/token/').data['url']
+        self.client.force_authenticate(user=None)
+
+    def test_feed_contents(self):
+        """Test the feed lists organized, invited and attended events but not declined ones"""
+        response = self.client.get(self.feed_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response['Content-Type'].startswith('text/calendar'))
+        body = b''.join(response.streaming_content).decode()
+        self.assertTrue(body.startswith('BEGIN:VCALENDAR\r\n'))
+        self.assertTrue(body.endswith('END:VCALENDAR\r\n'))
+        for event in (self.own, self.invited, self.going):
+            self.assertIn(f'UID:event-{event.id}@testserver', body)
+        for event in (self.declined, self.unrelated):
+            self.assertNotIn(f'UID:event-{event.id}@', body)
+        self.assertIn('DESCRIPTION:Line one\\nLine two\\, with\\; punctuation', body)
+        self.assertTrue(all(len(line.encode()) <= 75 for line in body.split('\r\n')))
+
+    def test_etag_ignores_counter_updates(self):
+        """Test polls are answered with 304 until the user's calendar changes"""
+        etag = self.client.get(self.feed_url)['ETag']
+        with self.assertNumQueries(1):
+            response = self.client.get(self.feed_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.client.force_authenticate(user=self.organizer)
+        self.client.post(f'/api/events/{self.going.id}/rsvp/', {'status': 'going'}, format='json')
+        self.client.force_authenticate(user=None)
+        self.assertEqual(self.client.get(self.feed_url, HTTP_IF_NONE_MATCH=etag).status_code,
+                         status.HTTP_304_NOT_MODIFIED)
+
+        self.client.force_authenticate(user=self.user)
+        self.client.post(f'/api/events/{self.going.id}/rsvp/', {'status': 'maybe'}, format='json')
+        self.client.force_authenticate(user=None)
+        response = self.client.get(self.feed_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('STATUS:TENTATIVE', b''.join(response.streaming_content).decode())
+
+    def test_times_sequence_and_last_modified(self):
+        """Test times are UTC and edits bump SEQUENCE and LAST-MODIFIED"""
+        body = b''.join(self.client.get(self.feed_url).streaming_content).decode()
+        self.assertNotIn('TZID', body)
+        self.assertIn(f'DTSTART:{self.own.start_time.strftime("%Y%m%dT%H%M%SZ")}', body)
+        self.assertIn('SEQUENCE:0', body)
+
+        self.client.force_authenticate(user=self.user)
+        self.client.patch(f'/api/events/{self.own.id}/', {'is_public': False}, format='json')
+        self.own.refresh_from_db()
+        self.assertEqual(self.own.sequence, 0)
+        self.client.patch(f'/api/events/{self.own.id}/', {'location': 'Annex'}, format='json')
+        self.client.force_authenticate(user=None)
+        self.own.refresh_from_db()
+        self.assertEqual(self.own.sequence, 1)
+        body = b''.join(self.client.get(self.feed_url).streaming_content).decode()
+        self.assertIn('SEQUENCE:1', body)
+        self.assertIn(f'LAST-MODIFIED:{self.own.updated_at.strftime("%Y%m%dT%H%M%SZ")}', body)
+
+    def test_revoked_invitation_leaves_feed(self):
+        """Test a private event drops out once the invitation is withdrawn, RSVP or not"""
+        RSVP.objects.create(event=self.invited, user=self.user, status='going')
+        self.invited.invited_users.remove(self.user)
+        body = b''.join(self.client.get(self.feed_url).streaming_content).decode()
+        self.assertNotIn(f'UID:event-{self.invited.id}@', body)
+
+    def test_invalid_and_revoked_tokens(self):
+        """Test tampered tokens and tokens from before a password change are refused"""
+        self.assertEqual(self.client.get(self.feed_url + 'x').status_code, status.HTTP_403_FORBIDDEN)
+        self.user.set_password('newpass123')
+        self.user.save()
+        self.assertEqual(self.client.get(self.feed_url).status_code, status.HTTP_403_FORBIDDEN)
+
+
+class ScheduleConflictTest(APITestCase):
+    """Test cases for the schedule endpoint and RSVP conflict checks"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.organizer = User.objects.create_user(username='organizer', password='testpass123')
+        self.base = timezone.now().replace(microsecond=0) + timedelta(days=1)
+        self.client.force_authenticate(user=self.user)
+
+    def event(self, start_hour, end_hour):
+        return Event.objects.create(
+            title=f'{start_hour}-{end_hour}', description='Description', organizer=self.organizer,
+            location='Location', start_time=self.base + timedelta(hours=start_hour),
+            end_time=self.base + timedelta(hours=end_hour),
+        )
+
+    def rsvp(self, event, status_value='going', **extra):
+        return self.client.post(f'/api/events/{event.id}/rsvp/', {'status': status_value, **extra}, format='json')
+
+    def test_overlap_groups(self):
+        """Test the sweep joins chained overlaps and keeps touching intervals apart"""
+        intervals = [(6, 9, 'd'), (1, 3, 'a'), (4, 5, 'c'), (2, 4, 'b'), (8, 10, 'f'), (7, 8, 'e'), (11, 12, 'g')]
+        self.assertEqual(overlap_groups(intervals), [['a', 'b'], ['d', 'e', 'f']])
+        self.assertEqual(overlap_groups([]), [])
+
+    def test_schedule_groups_overlaps(self):
+        """Test the schedule lists going events and groups the overlapping ones"""
+        first, second, later, maybe = self.event(0, 2), self.event(1, 3), self.event(5, 6), self.event(2, 4)
+        for event in (first, second, later):
+            self.rsvp(event)
+        self.rsvp(maybe, 'maybe')
+
+        response = self.client.get('/api/rsvps/schedule/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([entry['id'] for entry in response.data['events']], [first.id, second.id, later.id])
+        self.assertEqual([group['event_ids'] for group in response.data['conflicts']], [[first.id, second.id]])
+
+        response = self.client.get('/api/rsvps/schedule/', {'status': 'going,maybe'})
+        self.assertEqual([group['event_ids'] for group in response.data['conflicts']],
+                         [[first.id, second.id, maybe.id]])
+        response = self.client.get('/api/rsvps/schedule/', {'to': (self.base + timedelta(hours=1)).isoformat()})
+        self.assertEqual([entry['id'] for entry in response.data['events']], [first.id])
+        self.assertEqual(self.client.get('/api/rsvps/schedule/', {'from': 'soon'}).status_code,
+                         status.HTTP_400_BAD_REQUEST)
+
+    def test_rsvp_conflict_check(self):
+        """Test going to an overlapping event is refused only when the check is requested"""
+        booked, clashing, touching = self.event(0, 2), self.event(1, 3), self.event(2, 3)
+        self.rsvp(booked)
+
+        response = self.rsvp(clashing, check_conflicts=True)
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual([entry['id'] for entry in response.data['conflicts']], [booked.id])
+        self.assertFalse(RSVP.objects.filter(event=clashing, user=self.user).exists())
+
+        self.assertEqual(self.rsvp(touching, check_conflicts=True).status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.rsvp(clashing, 'maybe', check_conflicts=True).status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.rsvp(clashing).status_code, status.HTTP_200_OK)
+
+    def test_recurring_series_conflicts(self):
+        """Test an RSVP on a series only makes its first occurrence busy"""
+        series = self.event(0, 2)
+        series.recurrence_frequency = 'daily'
+        series.recurrence_count = 5
+        series.save()
+        self.rsvp(series)
+        first, later = self.event(1, 3), self.event(49, 50)  # first and third occurrence
+
+        response = self.rsvp(first, check_conflicts=True)
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual([entry['id'] for entry in response.data['conflicts']], [series.id])
+        self.assertEqual(self.rsvp(later, check_conflicts=True).status_code, status.HTTP_201_CREATED)
+
+        response = self.client.get('/api/rsvps/schedule/', {'to': (self.base + timedelta(days=10)).isoformat()})
+        self.assertEqual([entry['id'] for entry in response.data['events']], [series.id, later.id])
+        self.assertEqual(response.data['conflicts'], [])
+
+
+class RecurringEventTest(APITestCase):
+    """Test cases for recurring events and lazily expanded occurrences"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.organizer = User.objects.create_user(username='organizer', password='testpass123')
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.start = timezone.now().replace(hour=18, minute=0, second=0, microsecond=0) + timedelta(days=1)
+        self.client.force_authenticate(user=self.organizer)
+
+    def create_series(self, frequency='daily', **rule):
+        response = self.client.post('/api/events/', {
+            'title': 'Meetup', 'description': 'Description', 'location': 'Location',
+            'start_time': self.start.isoformat(), 'end_time': (self.start + timedelta(hours=2)).isoformat(),
+            'is_public': True, 'recurrence_frequency': frequency, **rule,
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.data)
+        return Event.objects.get(pk=response.data['id'])
+
+    def window(self, days, **params):
+        return {'from': self.start.isoformat(), 'to': (self.start + timedelta(days=days)).isoformat(), **params}
+
+    def collect(self, params):
+        items, url = [], '/api/events/'
+        while url:
+            response = self.client.get(url, params)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            items += response.data['results']
+            url, params = response.data['next'], None
+        return items
+
+    def test_occurrence_starts(self):
+        """Test counts, month-end skipping and wall-clock times across DST"""
+        event = Event(start_time=self.start, end_time=self.start + timedelta(hours=1),
+                      recurrence_frequency='weekly', recurrence_interval=2, recurrence_count=3)
+        self.assertEqual(list(occurrence_starts(event)),
+                         [self.start, self.start + timedelta(weeks=2), self.start + timedelta(weeks=4)])
+        # Jumping to a late window matches walking from the start
+        event.recurrence_count = None
+        since = self.start + timedelta(days=200)
+        walked = [start for start in occurrence_starts(event, until=since + timedelta(days=60)) if start >= since]
+        self.assertEqual(list(occurrence_starts(event, since, since + timedelta(days=60))), walked)
+
+        with timezone.override('Europe/Berlin'):
+            first = timezone.make_aware(datetime(2026, 1, 31, 19, 0))
+            event = Event(start_time=first, end_time=first + timedelta(hours=1),
+                          recurrence_frequency='monthly', recurrence_interval=1, recurrence_count=4)
+            starts = [timezone.localtime(start) for start in occurrence_starts(event)]
+            self.assertEqual([(start.month, start.day, start.hour) for start in starts],
+                             [(1, 31, 19), (3, 31, 19), (5, 31, 19), (7, 31, 19)])
+
+    def test_year_of_daily_series_is_not_stored(self):
+        """Test listing a year of a daily series pages through computed occurrences"""
+        series = self.create_series()
+        one_off = Event.objects.create(
+            title='One-off', description='Description', organizer=self.organizer, location='Location',
+            start_time=self.start + timedelta(days=10, hours=1), end_time=self.start + timedelta(days=10, hours=3),
+        )
+        items = self.collect(self.window(365, page_size=100))
+        self.assertEqual(len(items), 366)
+        self.assertEqual(Event.objects.count(), 2)
+        occurrences = [item for item in items if item['id'] == series.id]
+        self.assertEqual(len(occurrences), 365)
+        self.assertTrue(all(item['series_id'] == series.id for item in occurrences))
+        self.assertEqual(items[11]['id'], one_off.id)
+        self.assertEqual(items[12]['original_start'], occurrences[11]['original_start'])
+
+        second = self.client.get(self.client.get('/api/events/', self.window(30)).data['next'])
+        previous = self.client.get(second.data['previous'])
+        self.assertEqual(previous.data['results'], self.client.get('/api/events/', self.window(30)).data['results'])
+        self.assertEqual(self.client.get('/api/events/', {'from': 'now', 'to': 'later'}).status_code,
+                         status.HTTP_400_BAD_REQUEST)
+
+    def test_rsvp_stores_one_occurrence(self):
+        """Test an RSVP to an occurrence stores it and it replaces the computed one"""
+        series = self.create_series('weekly')
+        self.client.force_authenticate(user=self.user)
+        slot = self.start + timedelta(weeks=2)
+        response = self.client.post(f'/api/events/{series.id}/rsvp/', {'occurrence': slot.isoformat()}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        stored = Event.objects.get(series=series, original_start=slot)
+        self.assertEqual((stored.start_time, stored.going_count), (slot, 1))
+        self.client.post(f'/api/events/{series.id}/rsvp/', {'occurrence': slot.isoformat()}, format='json')
+        self.assertEqual(Event.objects.filter(series=series).count(), 1)
+
+        items = self.collect(self.window(28))
+        self.assertEqual([item['id'] for item in items], [series.id, series.id, stored.id, series.id])
+        self.assertEqual((items[2]['series_id'], items[2]['user_rsvp_status']), (series.id, 'going'))
+        self.assertIsNone(items[1]['user_rsvp_status'])
+
+        response = self.client.post(f'/api/events/{series.id}/rsvp/',
+                                    {'occurrence': (slot + timedelta(hours=1)).isoformat()}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_later_occurrences_have_their_own_counters(self):
+        """Test computed occurrences after the first do not repeat the series row's counters"""
+        series = self.create_series('weekly')
+        self.client.force_authenticate(user=self.user)
+        self.client.post(f'/api/events/{series.id}/rsvp/', {'status': 'going'}, format='json')
+        for params in (self.window(14), self.window(14, fields='id,rsvp_count,review_count,average_rating')):
+            items = self.collect(params)
+            self.assertEqual([item['rsvp_count'] for item in items], [1, 0])
+            self.assertEqual([item['average_rating'] for item in items], [None, None])
+
+    def test_organizer_overrides_occurrence(self):
+        """Test an occurrence can be stored, moved and edited without touching the series"""
+        series = self.create_series('weekly', recurrence_count=4)
+        slot = self.start + timedelta(weeks=1)
+        self.client.force_authenticate(user=self.user)
+        response = self.client.post(f'/api/events/{series.id}/occurrences/', {'start': slot.isoformat()}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        self.client.force_authenticate(user=self.organizer)
+        response = self.client.post(f'/api/events/{series.id}/occurrences/', {'start': slot.isoformat()}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        moved = slot + timedelta(days=1)
+        self.client.patch(f'/api/events/{response.data["id"]}/', {
+            'title': 'Moved meetup', 'start_time': moved.isoformat(), 'end_time': (moved + timedelta(hours=2)).isoformat(),
+        }, format='json')
+
+        items = self.collect(self.window(60))
+        self.assertEqual([item['title'] for item in items], ['Meetup', 'Moved meetup', 'Meetup', 'Meetup'])
+        self.assertEqual(items[1]['original_start'][:16], slot.isoformat()[:16])
+        series.refresh_from_db()
+        self.assertEqual(series.title, 'Meetup')
+
+    def test_recurrence_end_bounds_windows(self):
+        """Test bounded series store their last occurrence's end and drop out of later windows"""
+        series = self.create_series('weekly', recurrence_count=3)
+        self.assertEqual(series.recurrence_end, self.start + timedelta(weeks=2, hours=2))
+        self.assertIsNone(self.create_series('daily').recurrence_end)
+        after = self.start + timedelta(weeks=3)
+        self.assertFalse(Event.objects.filter(window_filter(after, after + timedelta(days=7)), pk=series.pk).exists())
+
+        self.client.patch(f'/api/events/{series.id}/', {'recurrence_count': 5}, format='json')
+        series.refresh_from_db()
+        self.assertEqual(series.recurrence_end, self.start + timedelta(weeks=4, hours=2))
+        items = self.collect({'from': after.isoformat(), 'to': (after + timedelta(days=7)).isoformat()})
+        self.assertEqual([item['start_time'][:16] for item in items if item['id'] == series.id],
+                         [after.isoformat()[:16]])
+
+    def test_series_edit_prunes_stored_occurrences(self):
+        """Test moving a series deletes the stored occurrences it no longer has"""
+        series = self.create_series('weekly')
+        self.client.force_authenticate(user=self.user)
+        slot = self.start + timedelta(weeks=1)
+        self.client.post(f'/api/events/{series.id}/rsvp/', {'occurrence': slot.isoformat()}, format='json')
+        self.client.force_authenticate(user=self.organizer)
+
+        self.client.patch(f'/api/events/{series.id}/', {'title': 'Renamed'}, format='json')
+        self.assertTrue(Event.objects.filter(series=series, original_start=slot).exists())
+
+        moved = self.start + timedelta(days=1)
+        response = self.client.patch(f'/api/events/{series.id}/', {
+            'start_time': moved.isoformat(), 'end_time': (moved + timedelta(hours=2)).isoformat(),
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(Event.objects.filter(series=series).exists())
+        self.assertFalse(RSVP.objects.filter(user=self.user).exists())
+
+    def test_recurrence_validation(self):
+        """Test rules with both an end date and a count are rejected"""
+        response = self.client.post('/api/events/', {
+            'title': 'Meetup', 'description': 'Description', 'location': 'Location',
+            'start_time': self.start.isoformat(), 'end_time': (self.start + timedelta(hours=2)).isoformat(),
+            'recurrence_frequency': 'weekly', 'recurrence_count': 3,
+            'recurrence_until': (self.start + timedelta(days=30)).isoformat(),
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_calendar_feed_rrule(self):
+        """Test the iCalendar feed carries the rule and stored occurrences as overrides"""
+        series = self.create_series('weekly', recurrence_count=10)
+        slot = self.start + timedelta(weeks=3)
+        self.client.post(f'/api/events/{series.id}/rsvp/', {'occurrence': slot.isoformat()}, format='json')
+        url = self.client.get('/api/calendar/token/').data['url']
+        body = b''.join(self.client.get(url).streaming_content).decode()
+        self.assertIn('RRULE:FREQ=WEEKLY;INTERVAL=1;COUNT=10', body)
+        self.assertEqual(body.count(f'UID:event-{series.id}@'), 2)
+        self.assertIn(f'RECURRENCE-ID:{slot.astimezone(dt_timezone.utc).strftime("%Y%m%dT%H%M%SZ")}', body)
@@ -1,9 +1,11 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
+from . import async_views
+from .metrics import metrics_view
 from .views import (
     UserProfileViewSet, EventViewSet, RSVPViewSet, ReviewViewSet,
-    register, current_user
+    register, current_user, export_table, provision, organizer_stats_view, calendar_feed, calendar_token
 )
 
 router = DefaultRouter()
@@ -18,7 +20,28 @@ urlpatterns = [
     path('auth/login/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
     path('auth/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
     path('auth/me/', current_user, name='current_user'),
+    path('auth/provision/', provision, name='provision_users'),
+
+    # Organizer dashboard, answered from the daily rollups
+    path('organizers/<int:pk>/stats/', organizer_stats_view, name='organizer_stats'),
+
+    # Personal iCalendar feed; the token endpoint hands out the feed URL
+    path('calendar/token/', calendar_token, name='calendar_token'),
+    path('calendar/feed.ics', calendar_feed, name='calendar_feed'),
+
+    # Bulk data export
+    path('export/<str:table>/', export_table, name='export_table'),
     
+    # Prometheus metrics (METRICS_ALLOWED_IPS only)
+    path('metrics/', metrics_view, name='metrics'),
+
+    # Async (ASGI) variants of the read-heavy endpoints
+    path('async/events/', async_views.event_list, name='async_event_list'),
+    path('async/events/<int:pk>/', async_views.event_detail, name='async_event_detail'),
+    path('async/events/<int:pk>/reviews/', async_views.event_reviews, name='async_event_reviews'),
+    path('async/auth/me/', async_views.current_user, name='async_current_user'),
+    path('events/<int:pk>/stream/', async_views.event_stream, name='event_stream'),
+
     # Router URLs
     path('', include(router.urls)),
 ]
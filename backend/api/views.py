@@ -1,24 +1,90 @@
-from django.shortcuts import render
+from collections import defaultdict
+from datetime import timedelta
+
+from django.shortcuts import get_object_or_404, render
+from django.http import HttpResponseForbidden, StreamingHttpResponse
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.dateparse import parse_datetime
+from django.utils.http import quote_etag, urlencode
+from django.views.decorators.http import require_safe
 from rest_framework import viewsets, status, filters
 from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated, AllowAny
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.permissions import IsAuthenticated, AllowAny, IsAdminUser
 from django.contrib.auth.models import User
+from django.db import IntegrityError, connection, transaction
+from django.db.models import F, Prefetch
+from django.conf import settings
 from django_filters.rest_framework import DjangoFilterBackend
 
-from .models import UserProfile, Event, RSVP, Review
+from .models import UserProfile, Event, EventRatingSummary, RSVP, Review
 from .serializers import (
     UserSerializer, UserProfileSerializer, RegisterSerializer,
-    EventSerializer, RSVPSerializer, ReviewSerializer
+    EventSerializer, RSVPSerializer, ReviewSerializer, BulkRSVPItemSerializer,
+    EventRatingSummarySerializer
 )
 from .permissions import IsOrganizerOrReadOnly, IsInvitedToPrivateEvent, IsOwnerOrReadOnly
+from .pagination import KeysetPagination, MergedQuerysets, StandardResultsSetPagination, EventResultsSetPagination
+from .search import EventSearchFilter
+from .authentication import cached_snapshot
+from .cache import cached_event_data, fragment_versions
+from .fastpath import REVIEW_COLUMNS, event_representations, overlay_occurrence, review_representations
+from .conditional import ConditionalGetMixin, make_etag, page_fingerprint, queryset_validators
+from .fieldsets import has_fieldsets, is_requested, model_fields_for
+from .exports import EXPORT_FORMATS, EXPORT_TABLES, stream_export
+from .ical import CALENDAR_FIELDS, feed_body, feed_etag, feed_rows, feed_user, make_feed_token, row_digest, stream_feed
+from .provisioning import provision_users
+from .pubsub import make_stream_token
+from .recurrence import (
+    MAX_WINDOW, RULE_FIELDS, computed_occurrences, materialize_occurrence, prune_occurrences, window_filter
+)
+from .rollups import MAX_DAYS, organizer_stats
+from .scheduling import BUSY_STATUSES, conflicting_events, schedule
+from .counters import COUNTER_FIELDS, apply_rsvp_deltas, record_rsvp_change, record_review_change
+
+
+# Columns every event read needs for permissions, ordering and cursors
+EVENT_BASE_FIELDS = (
+    'id', 'organizer', 'is_public', 'start_time', 'end_time', 'created_at', 'updated_at',
+    # Needed to expand series into occurrences
+    'recurrence_frequency', 'recurrence_interval', 'recurrence_until', 'recurrence_count',
+)
+
+
+def parse_instant(value):
+    """An aware datetime from an ISO 8601 string, or None"""
+    parsed = parse_datetime(value) if isinstance(value, str) else None
+    if parsed is not None and timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
 
 
-class StandardResultsSetPagination(PageNumberPagination):
-    page_size = 10
-    page_size_query_param = 'page_size'
-    max_page_size = 100
+def narrow_events(queryset, request, prefix=()):
+    """Load only what the requested EventSerializer fields read"""
+    queryset = queryset.only(*model_fields_for(request, EventSerializer, prefix, always=EVENT_BASE_FIELDS))
+    if is_requested(request, prefix + ('organizer',)):
+        queryset = queryset.select_related('organizer')
+    if is_requested(request, prefix + ('invited_users',)):
+        invitees = User.objects.only('id').order_by('pk')
+        queryset = queryset.prefetch_related(Prefetch('invited_users', queryset=invitees))
+    if is_requested(request, prefix + ('user_rsvp_status',)) and request.user.is_authenticated:
+        queryset = queryset.with_user_rsvp_status(request.user)
+    return queryset
+
+
+def narrow_event_children(queryset, request, serializer_class):
+    """Load RSVPs/reviews with only the user and nested event data requested"""
+    queryset = queryset.only(*model_fields_for(
+        request, serializer_class, always=('id', 'user', 'event', 'created_at')
+    ))
+    if is_requested(request, ('user',)):
+        queryset = queryset.select_related('user')
+    if is_requested(request, ('event',)):
+        events = narrow_events(Event.objects.all(), request, prefix=('event',))
+        queryset = queryset.prefetch_related(Prefetch('event', queryset=events))
+    return queryset
 
 
 class UserProfileViewSet(viewsets.ModelViewSet):
@@ -30,52 +96,161 @@ class UserProfileViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         # Users can only view their own profile
         if self.request.user.is_staff:
-            return UserProfile.objects.all()
-        return UserProfile.objects.filter(user=self.request.user)
+            queryset = UserProfile.objects.all()
+        else:
+            queryset = UserProfile.objects.filter(user=self.request.user)
+        if self.action in ('list', 'retrieve'):
+            queryset = queryset.only(*model_fields_for(
+                self.request, UserProfileSerializer, always=('id', 'user')
+            ))
+            if any(is_requested(self.request, (name,)) for name in ('user', 'username', 'email')):
+                queryset = queryset.select_related('user')
+        return queryset
 
 
-class EventViewSet(viewsets.ModelViewSet):
+class EventViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     """ViewSet for Event CRUD operations"""
     queryset = Event.objects.all()
     serializer_class = EventSerializer
     permission_classes = [IsOrganizerOrReadOnly, IsInvitedToPrivateEvent]
-    pagination_class = StandardResultsSetPagination
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    pagination_class = EventResultsSetPagination
+    filter_backends = [DjangoFilterBackend, EventSearchFilter, filters.OrderingFilter]
     filterset_fields = ['location', 'is_public', 'organizer']
     search_fields = ['title', 'description', 'location']
     ordering_fields = ['start_time', 'created_at', 'title']
 
     def get_queryset(self):
         """
-        Filter queryset to show:
-        - All public events
-        - Private events where user is organizer or invited
+        Visible events. Read actions only load the columns needed to page and
+        to look up cached fragments; full rows are fetched for cache misses.
+        Sparse fieldset requests bypass the cache and load just their fields.
         """
-        user = self.request.user
-        
-        # If user is staff, show all events
-        if user.is_authenticated and user.is_staff:
-            return Event.objects.all()
-        
-        # If user is not authenticated, show only public events
-        if not user.is_authenticated:
-            return Event.objects.filter(is_public=True)
-        
-        # If user is authenticated, show public events + their private events
-        from django.db.models import Q
-        return Event.objects.filter(
-            Q(is_public=True) | 
-            Q(organizer=user) | 
-            Q(invited_users=user)
-        ).distinct()
+        return self.narrow(Event.objects.visible_to(self.request.user))
+
+    def narrow(self, queryset):
+        """The columns and annotations the action reads"""
+        if self.action == 'rating_summary':
+            return queryset.select_related('rating_summary')
+        if self.action in ('list', 'retrieve'):
+            if has_fieldsets(self.request):
+                return narrow_events(queryset, self.request)
+            queryset = queryset.only(*EVENT_BASE_FIELDS)
+            if self.request.user.is_authenticated:
+                queryset = queryset.with_user_rsvp_status(self.request.user)
+        return queryset
+
+    def serialize_events(self, events):
+        """Serialize events through the versioned fragment cache"""
+        if has_fieldsets(self.request):
+            return self.get_serializer(events, many=True).data
+
+        # Misses are built from values() rows; the per-user status comes from
+        # the page query's annotation
+        events = list(events)
+        data = cached_event_data(events, event_representations)
+        for event, item in zip(events, data):
+            if getattr(event, 'computed_occurrence', False):
+                overlay_occurrence(item, event)
+        return data
+
+    def list(self, request, *args, **kwargs):
+        """
+        Events, newest first. With ?from= and ?to=, the events and occurrences
+        of recurring events in that window instead, earliest first; computed
+        occurrences carry the series' id with their own ``original_start``.
+        """
+        window = None
+        if 'from' in request.query_params or 'to' in request.query_params:
+            window = [parse_instant(request.query_params.get(param)) for param in ('from', 'to')]
+            if None in window or not timedelta(0) < window[1] - window[0] <= MAX_WINDOW:
+                return Response(
+                    {'error': f'from and to must be ISO 8601 datetimes at most {MAX_WINDOW.days} days apart'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+        if window is not None:
+            return self.list_window(self.filter_queryset(self.get_queryset()), *window)
+        if self.paginator.use_keyset(request):
+            queryset = self.filter_queryset(self.get_queryset())
+        else:
+            queryset = self.visible_pages()
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.page_response(self.paginator, page)
+        return Response(self.serialize_events(queryset))
+
+    def visible_pages(self):
+        """
+        The filtered list for page-number pagination. For signed-in users each
+        branch of Event.objects.visible_branches() is filtered and paged on its
+        own index, and the pages are merged.
+        """
+        branches = [
+            self.filter_queryset(self.narrow(branch))
+            for branch in Event.objects.visible_branches(self.request.user)
+        ]
+        if len(branches) == 1:
+            return branches[0]
+        return MergedQuerysets(branches)
+
+    def page_response(self, paginator, page):
+        """The page, or a 304 if the client's copy of it is current"""
+        fingerprint = page_fingerprint(page, paginator.get_paginated_response([]).data)
+        not_modified = self.check_not_modified(make_etag(self.request, fingerprint), None)
+        if not_modified:
+            return not_modified
+        return paginator.get_paginated_response(self.serialize_events(page))
+
+    def list_window(self, queryset, since, until):
+        """
+        One keyset-paginated page of the window: stored rows merged with
+        occurrences computed from the series overlapping it. Nothing is
+        written, however many occurrences the window holds.
+        """
+        queryset = queryset.filter(window_filter(since, until))
+        series = list(queryset.exclude(recurrence_frequency=''))
+        paginator = KeysetPagination(ordering=('start_time', 'id'), page_size=self.paginator.page_size)
+        page = paginator.paginate_merged(
+            queryset.filter(recurrence_frequency=''), computed_occurrences(series, since, until), self.request
+        )
+        return self.page_response(paginator, page)
+
+    def retrieve(self, request, *args, **kwargs):
+        event = self.get_object()
+        not_modified = self.check_not_modified(make_etag(request, *fragment_versions([event]), event.updated_at), event.updated_at)
+        if not_modified:
+            return not_modified
+        return Response(self.serialize_events([event])[0])
 
     def perform_create(self, serializer):
         """Set the organizer to the current user when creating an event"""
         serializer.save(organizer=self.request.user)
 
+    def perform_update(self, serializer):
+        """
+        Bump the event's iCalendar SEQUENCE when calendar clients would see a
+        change, and drop stored occurrences a new start or rule leaves behind
+        """
+        instance = serializer.instance
+        changed = {name for name in CALENDAR_FIELDS
+                   if serializer.validated_data.get(name, getattr(instance, name)) != getattr(instance, name)}
+        with transaction.atomic():
+            if changed:
+                event = serializer.save(sequence=F('sequence') + 1)
+                event.refresh_from_db(fields=['sequence'])
+            else:
+                event = serializer.save()
+            if changed & set(RULE_FIELDS):
+                prune_occurrences(event)
+
     @action(detail=True, methods=['post'], permission_classes=[IsAuthenticated])
     def rsvp(self, request, pk=None):
-        """RSVP to an event"""
+        """
+        RSVP to an event. With "check_conflicts": true, going to an event that
+        overlaps another one the user is going to is refused with 409. For a
+        recurring event, "occurrence" (its start time) picks the occurrence,
+        which is stored on first use.
+        """
         event = self.get_object()
         status_value = request.data.get('status', 'going')
 
@@ -85,20 +260,73 @@ class EventViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        rsvp, created = RSVP.objects.update_or_create(
-            event=event,
-            user=request.user,
-            defaults={'status': status_value}
-        )
+        if request.data.get('occurrence'):
+            event, _ = materialize_occurrence(event, parse_instant(request.data['occurrence']))
+            if event is None:
+                return Response({'error': 'No such occurrence of this event'}, status=status.HTTP_400_BAD_REQUEST)
+
+        if status_value in BUSY_STATUSES and request.data.get('check_conflicts') in (True, 'true', '1'):
+            conflicts = conflicting_events(request.user, event)
+            if conflicts:
+                return Response(
+                    {'error': 'This event overlaps events you are going to', 'conflicts': conflicts},
+                    status=status.HTTP_409_CONFLICT
+                )
+
+        with transaction.atomic():
+            rsvp = RSVP.objects.select_for_update().filter(event=event, user=request.user).first()
+            created = rsvp is None
+            if created:
+                try:
+                    with transaction.atomic():
+                        rsvp = RSVP.objects.create(event=event, user=request.user, status=status_value)
+                except IntegrityError:
+                    # A concurrent first RSVP won the insert; update its row instead
+                    rsvp = RSVP.objects.select_for_update().get(event=event, user=request.user)
+                    created = False
+                else:
+                    record_rsvp_change(new=(event.id, status_value))
+            if not created:
+                old_status = rsvp.status
+                rsvp.status = status_value
+                rsvp.save(update_fields=['status', 'updated_at'])
+                record_rsvp_change(old=(event.id, old_status), new=(event.id, status_value))
+        event.refresh_from_db(fields=COUNTER_FIELDS)
 
         serializer = RSVPSerializer(rsvp, context={'request': request})
         return Response(serializer.data, status=status.HTTP_201_CREATED if created else status.HTTP_200_OK)
 
+    @action(detail=True, methods=['post'])
+    def occurrences(self, request, pk=None):
+        """
+        Store one occurrence of a recurring event ({"start": ...}) so the
+        organizer can edit it on its own; returns the occurrence's event.
+        """
+        series = self.get_object()
+        occurrence, created = materialize_occurrence(series, parse_instant(request.data.get('start')))
+        if occurrence is None:
+            return Response({'error': 'No such occurrence of this event'}, status=status.HTTP_400_BAD_REQUEST)
+        serializer = EventSerializer(occurrence, context={'request': request})
+        return Response(serializer.data, status=status.HTTP_201_CREATED if created else status.HTTP_200_OK)
+
+    @action(detail=True, methods=['get'], url_path='stream/token', permission_classes=[IsAuthenticated])
+    def stream_token(self, request, pk=None):
+        """A short-lived URL for the event's live stream; EventSource cannot send headers"""
+        event = self.get_object()
+        token = make_stream_token(request.user, event.pk)
+        url = f'{request.build_absolute_uri(reverse("event_stream", args=[event.pk]))}?{urlencode({"token": token})}'
+        return Response({'token': token, 'url': url})
+
     @action(detail=True, methods=['get'], permission_classes=[IsAuthenticated])
     def rsvps(self, request, pk=None):
         """Get all RSVPs for an event"""
         event = self.get_object()
-        rsvps = event.rsvps.all()
+        rsvps = narrow_event_children(event.rsvps.all(), request, RSVPSerializer)
+        fingerprint, last_modified = queryset_validators(rsvps)
+        last_modified = max(filter(None, [last_modified, event.updated_at]))
+        not_modified = self.check_not_modified(make_etag(request, fingerprint, event.updated_at), last_modified)
+        if not_modified:
+            return not_modified
         serializer = RSVPSerializer(rsvps, many=True, context={'request': request})
         return Response(serializer.data)
 
@@ -114,9 +342,14 @@ class EventViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        serializer = ReviewSerializer(data=request.data, context={'request': request})
+        data = request.data.copy()
+        data['event_id'] = event.id
+        serializer = ReviewSerializer(data=data, context={'request': request})
         if serializer.is_valid():
-            serializer.save(event=event, user=request.user)
+            with transaction.atomic():
+                review = serializer.save(event=event, user=request.user)
+                record_review_change(new=(event.id, review.rating), review_id=review.pk)
+            event.refresh_from_db(fields=COUNTER_FIELDS)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -124,8 +357,13 @@ class EventViewSet(viewsets.ModelViewSet):
     def reviews(self, request, pk=None):
         """Get all reviews for an event"""
         event = self.get_object()
-        reviews = event.reviews.all()
-        
+        reviews = narrow_event_children(event.reviews.all(), request, ReviewSerializer)
+        fingerprint, last_modified = queryset_validators(reviews)
+        last_modified = max(filter(None, [last_modified, event.updated_at]))
+        not_modified = self.check_not_modified(make_etag(request, fingerprint, event.updated_at), last_modified)
+        if not_modified:
+            return not_modified
+
         # Pagination
         paginator = StandardResultsSetPagination()
         page = paginator.paginate_queryset(reviews, request)
@@ -133,22 +371,163 @@ class EventViewSet(viewsets.ModelViewSet):
         serializer = ReviewSerializer(page, many=True, context={'request': request})
         return paginator.get_paginated_response(serializer.data)
 
+    @action(detail=True, methods=['get'], url_path='rating-summary')
+    def rating_summary(self, request, pk=None):
+        """Rating histogram, average and most recent review ids, read from one row"""
+        event = self.get_object()
+        try:
+            summary = event.rating_summary
+        except EventRatingSummary.DoesNotExist:
+            # No review was ever written through the API
+            summary = EventRatingSummary(event=event)
+        not_modified = self.check_not_modified(
+            make_etag(request, event.pk, summary.updated_at), summary.updated_at
+        )
+        if not_modified:
+            return not_modified
+        return Response(EventRatingSummarySerializer(summary, context={'request': request}).data)
+
 
 class RSVPViewSet(viewsets.ModelViewSet):
     """ViewSet for RSVP CRUD operations"""
     queryset = RSVP.objects.all()
     serializer_class = RSVPSerializer
     permission_classes = [IsAuthenticated, IsOwnerOrReadOnly]
+    pagination_class = StandardResultsSetPagination
+    bulk_max_items = 500
 
     def get_queryset(self):
         """Users can only view their own RSVPs"""
         if self.request.user.is_staff:
-            return RSVP.objects.all()
-        return RSVP.objects.filter(user=self.request.user)
+            queryset = RSVP.objects.all()
+        else:
+            queryset = RSVP.objects.filter(user=self.request.user)
+        if self.action in ('list', 'retrieve'):
+            queryset = narrow_event_children(queryset, self.request, RSVPSerializer)
+        return queryset
+
+    @action(detail=False, methods=['get'])
+    def schedule(self, request):
+        """
+        The user's RSVP'd events from ?from= (default now) to ?to=, and the
+        groups of them that overlap. ?status=going,maybe widens the set.
+        """
+        statuses = request.query_params.get('status', ','.join(BUSY_STATUSES)).split(',')
+        if not set(statuses) <= {'going', 'maybe', 'not_going'}:
+            return Response({'error': 'status must be going, maybe and/or not_going'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        bounds = {}
+        for param in ('from', 'to'):
+            value = request.query_params.get(param)
+            bounds[param] = parse_instant(value)
+            if value and bounds[param] is None:
+                return Response({'error': f'{param} must be an ISO 8601 datetime'},
+                                status=status.HTTP_400_BAD_REQUEST)
+        since = bounds['from'] or timezone.now()
+        return Response(schedule(request.user, statuses, since=since, until=bounds['to']))
 
     def perform_create(self, serializer):
         """Set the user to the current user when creating an RSVP"""
-        serializer.save(user=self.request.user)
+        with transaction.atomic():
+            rsvp = serializer.save(user=self.request.user)
+            record_rsvp_change(new=(rsvp.event_id, rsvp.status))
+
+    def perform_update(self, serializer):
+        with transaction.atomic():
+            # The old status comes from the locked row, not the instance read
+            # before the transaction, so concurrent updates queue up
+            locked = get_object_or_404(RSVP.objects.select_for_update(), pk=serializer.instance.pk)
+            old = (locked.event_id, locked.status)
+            rsvp = serializer.save()
+            record_rsvp_change(old=old, new=(rsvp.event_id, rsvp.status))
+
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            locked = RSVP.objects.select_for_update().filter(pk=instance.pk).first()
+            # Only the request that actually removes the row moves the counters
+            if locked is not None and instance.delete()[0]:
+                record_rsvp_change(old=(locked.event_id, locked.status))
+
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        """
+        RSVP to many events at once.
+
+        Accepts ``{"rsvps": [{"event_id": 1, "status": "going"}, ...]}`` and
+        returns one result per item. Visibility is checked for all events in
+        one query and the RSVPs are written with a single upsert.
+        """
+        items = request.data.get('rsvps') if isinstance(request.data, dict) else request.data
+        if not isinstance(items, list) or not items:
+            return Response(
+                {'error': 'Provide a non-empty "rsvps" list of {event_id, status} items'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(items) > self.bulk_max_items:
+            return Response(
+                {'error': f'At most {self.bulk_max_items} RSVPs per request'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        results = [None] * len(items)
+        wanted = {}
+        for index, item in enumerate(items):
+            item_serializer = BulkRSVPItemSerializer(data=item)
+            if not item_serializer.is_valid():
+                results[index] = {'errors': item_serializer.errors}
+                continue
+            event_id = item_serializer.validated_data['event_id']
+            if event_id in wanted:
+                results[index] = {'event_id': event_id, 'error': 'Duplicate event_id in request'}
+                continue
+            wanted[event_id] = (index, item_serializer.validated_data['status'])
+
+        visible = set(
+            Event.objects.visible_to(request.user)
+            .filter(pk__in=wanted).values_list('pk', flat=True)
+        )
+        for event_id, (index, _) in wanted.items():
+            if event_id not in visible:
+                results[index] = {'event_id': event_id, 'error': 'Event not found'}
+
+        with transaction.atomic():
+            existing = dict(
+                RSVP.objects.select_for_update()
+                .filter(user=request.user, event_id__in=visible)
+                .values_list('event_id', 'status')
+            )
+            to_write = []
+            deltas = defaultdict(lambda: defaultdict(int))
+            for event_id in visible:
+                index, status_value = wanted[event_id]
+                old_status = existing.get(event_id)
+                if old_status is None:
+                    outcome = 'created'
+                elif old_status == status_value:
+                    outcome = 'unchanged'
+                else:
+                    outcome = 'updated'
+                results[index] = {'event_id': event_id, 'status': status_value, 'result': outcome}
+                if outcome == 'unchanged':
+                    continue
+                to_write.append(RSVP(event_id=event_id, user=request.user, status=status_value))
+                if old_status is not None:
+                    deltas[event_id][old_status] -= 1
+                deltas[event_id][status_value] += 1
+
+            if to_write:
+                # MySQL's ON DUPLICATE KEY takes no conflict target (and
+                # Django refuses one); the (event, user) key is the only one hit
+                RSVP.objects.bulk_create(
+                    to_write,
+                    update_conflicts=True,
+                    unique_fields=(['event', 'user']
+                                   if connection.features.supports_update_conflicts_with_target else None),
+                    update_fields=['status', 'updated_at'],
+                )
+                apply_rsvp_deltas(deltas)
+
+        return Response({'results': results})
 
 
 class ReviewViewSet(viewsets.ModelViewSet):
@@ -164,11 +543,44 @@ class ReviewViewSet(viewsets.ModelViewSet):
         event_id = self.request.query_params.get('event_id')
         if event_id:
             queryset = queryset.filter(event_id=event_id)
+        if self.action in ('list', 'retrieve'):
+            queryset = narrow_event_children(queryset, self.request, ReviewSerializer)
         return queryset
 
+    def list(self, request, *args, **kwargs):
+        """
+        Full-representation pages are built from values() rows, with nested
+        events taken from the shared fragment cache.
+        """
+        if has_fieldsets(request):
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        rows = queryset.select_related(None).prefetch_related(None).values(*REVIEW_COLUMNS)
+        page = self.paginate_queryset(rows)
+        data = review_representations(list(rows if page is None else page), request.user)
+        if page is not None:
+            return self.get_paginated_response(data)
+        return Response(data)
+
     def perform_create(self, serializer):
         """Set the user to the current user when creating a review"""
-        serializer.save(user=self.request.user)
+        with transaction.atomic():
+            review = serializer.save(user=self.request.user)
+            record_review_change(new=(review.event_id, review.rating), review_id=review.pk)
+
+    def perform_update(self, serializer):
+        with transaction.atomic():
+            locked = get_object_or_404(Review.objects.select_for_update(), pk=serializer.instance.pk)
+            old = (locked.event_id, locked.rating)
+            review = serializer.save()
+            record_review_change(old=old, new=(review.event_id, review.rating), review_id=review.pk)
+
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            locked = Review.objects.select_for_update().filter(pk=instance.pk).first()
+            if locked is not None and instance.delete()[0]:
+                record_review_change(old=(locked.event_id, locked.rating), review_id=locked.pk)
 
 
 @api_view(['POST'])
@@ -185,15 +597,119 @@ def register(request):
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+@api_view(['POST'])
+@permission_classes([IsAdminUser])
+def provision(request):
+    """
+    Create many users with profiles in one request. Body: a list of
+    register-style objects (no password2), or {"users": [...]}. Existing
+    usernames/emails are skipped and reported, not treated as errors.
+
+    Passwords are hashed in this worker, so requests are capped at
+    PROVISION_MAX_USERS; larger imports belong to the provision_users
+    command, which hashes in a process pool.
+    """
+    records = request.data.get('users') if isinstance(request.data, dict) else request.data
+    limit = getattr(settings, 'PROVISION_MAX_USERS', 50)
+    if not isinstance(records, list) or not records:
+        return Response({'error': 'Send a non-empty list of users'}, status=status.HTTP_400_BAD_REQUEST)
+    if len(records) > limit:
+        return Response(
+            {'error': f'At most {limit} users per request; use the provision_users command for more'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    report = provision_users(records, workers=1)
+    return Response(report, status=status.HTTP_201_CREATED if report['created'] else status.HTTP_200_OK)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def organizer_stats_view(request, pk):
+    """
+    RSVP and review figures for an organizer's events, from the daily rollups.
+    ?days=N (default 30) sets the window. Organizers see their own; staff see all.
+    """
+    if request.user.pk != pk and not request.user.is_staff:
+        return Response({'error': 'You can only view your own stats'}, status=status.HTTP_403_FORBIDDEN)
+    if not User.objects.filter(pk=pk).exists():
+        return Response({'error': 'No such organizer'}, status=status.HTTP_404_NOT_FOUND)
+    try:
+        days = int(request.query_params.get('days', 30))
+    except ValueError:
+        days = 0
+    if not 1 <= days <= MAX_DAYS:
+        return Response({'error': f'days must be between 1 and {MAX_DAYS}'}, status=status.HTTP_400_BAD_REQUEST)
+    return Response(organizer_stats(pk, days))
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def calendar_token(request):
+    """The user's private calendar feed URL; changing the password revokes it"""
+    token = make_feed_token(request.user)
+    url = f'{request.build_absolute_uri(reverse("calendar_feed"))}?{urlencode({"token": token})}'
+    return Response({'token': token, 'url': url})
+
+
+@require_safe
+def calendar_feed(request):
+    """
+    iCalendar feed of the events the token's user organizes, is invited to or
+    is attending. Plain Django view: calendar clients authenticate with the
+    ``token`` query parameter, and the body is text/calendar.
+    """
+    user = feed_user(request.GET.get('token', ''))
+    if user is None:
+        return HttpResponseForbidden()
+    rows = feed_rows(user)
+    domain = request.get_host()
+    digests = [row_digest(row) for row in rows]
+    etag = quote_etag(feed_etag([domain, *digests]))
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        blocks = feed_body(user, rows, digests, domain)
+        response = StreamingHttpResponse(stream_feed(blocks, f'{user.username} events'),
+                                         content_type='text/calendar; charset=utf-8')
+        response['Content-Disposition'] = 'inline; filename="events.ics"'
+    response['ETag'] = etag
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def current_user(request):
     """Get current authenticated user"""
-    serializer = UserSerializer(request.user)
-    profile = UserProfile.objects.filter(user=request.user).first()
-    profile_data = UserProfileSerializer(profile).data if profile else None
-    
-    return Response({
-        'user': serializer.data,
-        'profile': profile_data
-    })
+    def build():
+        serializer = UserSerializer(request.user, context={'request': request})
+        profile = UserProfile.objects.filter(user=request.user).first()
+        if profile is not None:
+            profile.user = request.user
+        profile_data = UserProfileSerializer(profile, context={'request': request}).data if profile else None
+        return {
+            'user': serializer.data,
+            'profile': profile_data
+        }
+
+    # The full body is cached with the authenticated user; sparse ones are not
+    if has_fieldsets(request):
+        return Response(build())
+    return Response(cached_snapshot(request, build))
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def export_table(request, table):
+    """Stream a whole table as NDJSON (default) or CSV (?fmt=csv)"""
+    export_format = request.query_params.get('fmt', 'ndjson')
+    if table not in EXPORT_TABLES or export_format not in EXPORT_FORMATS:
+        return Response(
+            {'error': f'Choose a table from {sorted(EXPORT_TABLES)} and fmt from {sorted(EXPORT_FORMATS)}'},
+            status=status.HTTP_404_NOT_FOUND
+        )
+    response = StreamingHttpResponse(
+        stream_export(table, export_format),
+        content_type=EXPORT_FORMATS[export_format]
+    )
+    response['Content-Disposition'] = f'attachment; filename="{table}.{export_format}"'
+    return response
@@ -49,6 +49,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.metrics.RequestMetricsMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -106,6 +107,71 @@ DATABASES = {
 # }
 
 
+# Caches
+# The event fragment cache is an LRU local-memory cache per process; point
+# EVENT_FRAGMENT_CACHE at a FileBasedCache or shared backend to share it.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'event_fragments': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'event-fragments',
+        'TIMEOUT': 60 * 60,
+        'OPTIONS': {
+            'MAX_ENTRIES': 20000,
+            'CULL_FREQUENCY': 10,
+        },
+    },
+}
+
+EVENT_FRAGMENT_CACHE = 'event_fragments'
+
+# Per-user private event access lists (api.acl). With a per-process cache,
+# revoked invitations can stay visible to other workers for up to this long.
+EVENT_ACL_CACHE = 'default'
+EVENT_ACL_TIMEOUT = 60
+
+# Resolved users and /auth/me/ snapshots cached per process (api.authentication).
+# Entries are checked against a per-user version token in AUTH_USER_VERSION_CACHE:
+# point it at a shared backend (Redis, Memcached) so saves, deactivations and
+# password changes reach every worker at once. With a per-process cache they
+# reach other processes within AUTH_USER_CACHE_TTL seconds.
+AUTH_USER_CACHE_SIZE = 10000
+AUTH_USER_CACHE_TTL = 60
+AUTH_USER_VERSION_CACHE = 'default'
+
+# Live event updates (api.pubsub). LocalBroker only reaches streams served by
+# the same process; with several workers use FileBroker (all workers must
+# see the same path) or another shared backend. FileBroker options: path,
+# poll_interval, heartbeat (subscriber marker refresh) and max_bytes (spool
+# rotation threshold).
+EVENT_PUBSUB_BACKEND = 'api.pubsub.LocalBroker'
+EVENT_PUBSUB_OPTIONS = {}
+# Seconds between keepalive comments on idle event streams
+EVENT_STREAM_KEEPALIVE = 15
+# Lifetime of the signed tokens event streams are opened with; clients fetch
+# a new one when a dropped stream reconnects after this long
+EVENT_STREAM_TOKEN_MAX_AGE = 60
+
+# Users per POST /api/auth/provision/ request, hashed in the web worker
+# (api.provisioning). Use the provision_users command for bulk imports.
+PROVISION_MAX_USERS = 50
+
+# Request metrics (api.metrics): Server-Timing on every response, Prometheus
+# text at /api/metrics/ for these client networks. One SQL statement repeated
+# this many times in a request is logged as a possible N+1.
+METRICS_ALLOWED_IPS = ['127.0.0.1', '::1']
+REQUEST_METRICS_N_PLUS_ONE = 5
+
+# iCalendar feeds (api.ical): rendered VEVENT blocks are cached per user for
+# CALENDAR_FEED_TIMEOUT seconds; events that ended more than
+# CALENDAR_FEED_PAST_DAYS ago are left out.
+CALENDAR_FEED_CACHE = 'event_fragments'
+CALENDAR_FEED_TIMEOUT = 24 * 60 * 60
+CALENDAR_FEED_PAST_DAYS = 90
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -131,11 +197,21 @@ CORS_ALLOW_CREDENTIALS = True
 # REST Framework Configuration
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.CachedJWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticatedOrReadOnly',
     ],
+    # orjson-backed JSON; falls back to DRF's encoder when orjson is missing
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'api.renderers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 10,
     'DEFAULT_FILTER_BACKENDS': [
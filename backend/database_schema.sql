@@ -39,10 +39,24 @@ CREATE TABLE IF NOT EXISTS api_event (
     is_public TINYINT(1) NOT NULL DEFAULT 1,
     created_at DATETIME(6) NOT NULL,
     updated_at DATETIME(6) NOT NULL,
+    going_count INT NOT NULL DEFAULT 0,
+    maybe_count INT NOT NULL DEFAULT 0,
+    not_going_count INT NOT NULL DEFAULT 0,
+    review_count INT NOT NULL DEFAULT 0,
+    rating_sum INT NOT NULL DEFAULT 0,
+    sequence INT UNSIGNED NOT NULL DEFAULT 0,
+    recurrence_frequency VARCHAR(10) NOT NULL DEFAULT '',
+    recurrence_interval SMALLINT UNSIGNED NOT NULL DEFAULT 1,
+    recurrence_until DATETIME(6) NULL,
+    recurrence_count INT UNSIGNED NULL,
+    recurrence_end DATETIME(6) NULL,
+    original_start DATETIME(6) NULL,
+    series_id BIGINT NULL,
     organizer_id INT NOT NULL,
     CONSTRAINT fk_event_organizer FOREIGN KEY (organizer_id) REFERENCES auth_user(id) ON DELETE CASCADE,
+    CONSTRAINT fk_event_series FOREIGN KEY (series_id) REFERENCES api_event(id) ON DELETE CASCADE,
+    UNIQUE KEY uniq_event_series_occurrence (series_id, original_start),
     INDEX idx_event_organizer (organizer_id),
-    INDEX idx_event_start_time (start_time),
     INDEX idx_event_location (location),
     INDEX idx_event_is_public (is_public),
     INDEX idx_event_created (created_at)
@@ -97,14 +111,62 @@ CREATE TABLE IF NOT EXISTS api_review (
     CHECK (rating >= 1 AND rating <= 5)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
+-- Event rating summary (created by migration 0005_event_rating_summary)
+-- Star histogram, totals and the ids of the newest reviews, one row per event
+CREATE TABLE IF NOT EXISTS api_eventratingsummary (
+    event_id BIGINT NOT NULL PRIMARY KEY,
+    stars_1 INT NOT NULL DEFAULT 0,
+    stars_2 INT NOT NULL DEFAULT 0,
+    stars_3 INT NOT NULL DEFAULT 0,
+    stars_4 INT NOT NULL DEFAULT 0,
+    stars_5 INT NOT NULL DEFAULT 0,
+    review_count INT NOT NULL DEFAULT 0,
+    rating_sum INT NOT NULL DEFAULT 0,
+    recent_review_ids JSON NOT NULL,
+    updated_at DATETIME(6) NOT NULL,
+    CONSTRAINT fk_ratingsummary_event FOREIGN KEY (event_id) REFERENCES api_event(id) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- Event daily stats (created by migration 0006_event_daily_stats)
+-- Per-event, per-day RSVP and review rollups behind the organizer stats endpoint
+CREATE TABLE IF NOT EXISTS api_eventdailystats (
+    id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    day DATE NOT NULL,
+    going INT NOT NULL DEFAULT 0,
+    maybe INT NOT NULL DEFAULT 0,
+    not_going INT NOT NULL DEFAULT 0,
+    reviews_written INT NOT NULL DEFAULT 0,
+    review_count INT NOT NULL DEFAULT 0,
+    rating_sum INT NOT NULL DEFAULT 0,
+    event_id BIGINT NOT NULL,
+    organizer_id INT NOT NULL,
+    CONSTRAINT fk_dailystats_event FOREIGN KEY (event_id) REFERENCES api_event(id) ON DELETE CASCADE,
+    CONSTRAINT fk_dailystats_organizer FOREIGN KEY (organizer_id) REFERENCES auth_user(id) ON DELETE CASCADE,
+    UNIQUE KEY unique_dailystats_event_day (event_id, day),
+    INDEX idx_dailystats_organizer_day (organizer_id, day)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
 -- Create a user for the application (OPTIONAL - Update with your credentials)
 -- CREATE USER IF NOT EXISTS 'event_app_user'@'localhost' IDENTIFIED BY 'your_secure_password';
 -- GRANT ALL PRIVILEGES ON event_management_db.* TO 'event_app_user'@'localhost';
 -- FLUSH PRIVILEGES;
 
--- Sample indexes for performance optimization
+-- Composite indexes for the hot access paths (created by migration 0004_composite_indexes)
 CREATE INDEX idx_event_public_start ON api_event(is_public, start_time);
+CREATE INDEX idx_event_organizer_start ON api_event(organizer_id, start_time);
 CREATE INDEX idx_rsvp_event_status ON api_rsvp(event_id, status);
+CREATE INDEX idx_rsvp_event_created ON api_rsvp(event_id, created_at);
+CREATE INDEX idx_rsvp_user_created ON api_rsvp(user_id, created_at);
 CREATE INDEX idx_review_event_rating ON api_review(event_id, rating);
+CREATE INDEX idx_review_event_created ON api_review(event_id, created_at);
+
+-- Event time-range indexes for schedule conflicts and calendar windows
+-- (created by migrations 0007_event_start_end_index, which replaces
+-- idx_event_start_time, and 0010_event_end_start_index)
+CREATE INDEX idx_event_start_end ON api_event(start_time, end_time);
+CREATE INDEX idx_event_end_start ON api_event(end_time, start_time);
+
+-- Full-text index for event search (created by migration 0003_event_search_index)
+ALTER TABLE api_event ADD FULLTEXT INDEX idx_event_fulltext (title, description, location);
 
 -- End of schema   
\ No newline at end of file
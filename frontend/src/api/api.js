@@ -82,6 +82,15 @@ export const eventsAPI = {
   getRSVPs: (id) => api.get(`/events/${id}/rsvps/`),
   addReview: (id, data) => api.post(`/events/${id}/review/`, data),
   getReviews: (id, params) => api.get(`/events/${id}/reviews/`, { params }),
+  // Live updates (server-sent events). EventSource cannot send headers, so
+  // signed-in users open the stream with a short-lived stream token
+  stream: async (id) => {
+    if (!localStorage.getItem('access_token')) {
+      return new EventSource(`${API_BASE_URL}/events/${id}/stream/`);
+    }
+    const response = await api.get(`/events/${id}/stream/token/`);
+    return new EventSource(response.data.url);
+  },
 };
 
 // Reviews API
@@ -96,6 +105,7 @@ export const reviewsAPI = {
 export const rsvpsAPI = {
   getAll: () => api.get('/rsvps/'),
   getById: (id) => api.get(`/rsvps/${id}/`),
+  bulk: (rsvps) => api.post('/rsvps/bulk/', { rsvps }),
   update: (id, data) => api.patch(`/rsvps/${id}/`, data),
   delete: (id) => api.delete(`/rsvps/${id}/`),
 };
@@ -20,6 +20,40 @@ const EventDetail = () => {
     fetchReviews();
   }, [id]);
 
+  // Live RSVP counts and new reviews instead of polling
+  useEffect(() => {
+    let source = null;
+    let cancelled = false;
+    const connect = async () => {
+      try {
+        source = await eventsAPI.stream(id);
+      } catch (err) {
+        console.error('Failed to open live updates:', err);
+        return;
+      }
+      if (cancelled) {
+        source.close();
+        return;
+      }
+      source.addEventListener('counts', (e) => {
+        const { type, event_id, ...counts } = JSON.parse(e.data);
+        setEvent((prev) => (prev ? { ...prev, ...counts } : prev));
+      });
+      source.addEventListener('review', () => fetchReviews());
+      // Stream tokens expire, so a dropped stream reconnects with a new one
+      source.onerror = () => {
+        if (source.readyState === EventSource.CLOSED && !cancelled) {
+          setTimeout(connect, 5000);
+        }
+      };
+    };
+    connect();
+    return () => {
+      cancelled = true;
+      if (source) source.close();
+    };
+  }, [id]);
+
   const fetchEventDetails = async () => {
     try {
       const response = await eventsAPI.getById(id);
@@ -9,23 +9,33 @@ const EventList = () => {
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState('');
   const [searchTerm, setSearchTerm] = useState('');
+  const [debouncedSearch, setDebouncedSearch] = useState('');
   const [filterPublic, setFilterPublic] = useState('all');
   const [page, setPage] = useState(1);
   const [totalPages, setTotalPages] = useState(1);
 
   const { isAuthenticated } = useAuth();
 
+  // Wait for the user to stop typing before hitting the search endpoint
+  useEffect(() => {
+    const timer = setTimeout(() => setDebouncedSearch(searchTerm.trim()), 300);
+    return () => clearTimeout(timer);
+  }, [searchTerm]);
+
   useEffect(() => {
     fetchEvents();
-  }, [page, searchTerm, filterPublic]);
+  }, [page, debouncedSearch, filterPublic]);
 
   const fetchEvents = async () => {
     setLoading(true);
     try {
       const params = {
         page,
-        search: searchTerm,
       };
+
+      if (debouncedSearch) {
+        params.search = debouncedSearch;
+      }
       
       if (filterPublic !== 'all') {
         params.is_public = filterPublic === 'public';